@@ -0,0 +1,53 @@
+# pytetris/benchmarks/__main__.py
+# Command line entry point: python -m benchmarks [--only NAME ...] [--save FILE] [--compare FILE]
+import argparse
+import sys
+
+from .harness import compare_results, format_results, load_results, run_benchmark, save_results
+from .workloads import BENCHMARKS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the pytetris benchmark suite.')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Run only the named benchmarks.')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for every workload (default: 0).')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every operation count by this factor.')
+    parser.add_argument('--save', metavar='FILE', help='Save the results as a JSON baseline.')
+    parser.add_argument('--compare', metavar='FILE', help='Compare the results against a JSON baseline.')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative slowdown that counts as a regression (default: 0.10).')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for benchmark in BENCHMARKS:
+            print(f"{benchmark.name:<14}{benchmark.description}")
+        return 0
+
+    selected = [benchmark for benchmark in BENCHMARKS if not args.only or benchmark.name in args.only]
+    unknown = set(args.only or ()) - {benchmark.name for benchmark in BENCHMARKS}
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for benchmark in selected:
+        results[benchmark.name] = run_benchmark(benchmark, seed=args.seed,
+                                                ops=max(1, int(benchmark.ops * args.scale)),
+                                                warmup=int(benchmark.warmup * args.scale))
+
+    baseline = load_results(args.compare) if args.compare else None
+    print(format_results(results, baseline))
+    if args.save:
+        save_results(results, args.save)
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        for name, metric, before, after, change in regressions:
+            print(f"REGRESSION {name} {metric}: {before:.2f} -> {after:.2f} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
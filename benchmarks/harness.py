@@ -0,0 +1,127 @@
+# pytetris/benchmarks/harness.py
+# Timing, reporting and baseline comparison for the benchmark suite.
+import json
+import platform
+import sys
+import time
+
+
+def percentile(sorted_samples, fraction):
+    """
+    Returns the nearest-rank percentile of already sorted samples.
+    :param sorted_samples: (list) Samples in ascending order.
+    :param fraction: (float) The percentile as a fraction, e.g. 0.99.
+    :return: The sample at that rank.
+    """
+    if not sorted_samples:
+        return 0
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def run_benchmark(benchmark, seed=0, ops=None, warmup=None):
+    """
+    Times each operation of a benchmark individually.
+    :param benchmark: (Benchmark) The workload to run.
+    :param seed: (int) Seed passed to the workload's setup.
+    :param ops: (int) Number of timed operations; defaults to the workload's own count.
+    :param warmup: (int) Number of untimed operations run first; defaults to the workload's own count.
+    :return: (dict) Result with ops, seconds, ops_per_sec, p50_us and p99_us.
+    """
+    ops = benchmark.ops if ops is None else ops
+    warmup = benchmark.warmup if warmup is None else warmup
+    op = benchmark.setup(seed)
+    for _ in range(warmup):
+        op()
+
+    clock = time.perf_counter_ns
+    samples = []
+    record = samples.append
+    for _ in range(ops):
+        start = clock()
+        op()
+        record(clock() - start)
+
+    samples.sort()
+    total = sum(samples) / 1e9
+    return {
+        'ops': ops,
+        'seconds': total,
+        'ops_per_sec': ops / total if total else float('inf'),
+        'p50_us': percentile(samples, 0.50) / 1e3,
+        'p99_us': percentile(samples, 0.99) / 1e3,
+    }
+
+
+def environment_info():
+    """
+    Describes the interpreter and machine the results were taken on.
+    :return: (dict) Environment details.
+    """
+    return {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def save_results(results, path):
+    """
+    Saves results as a JSON baseline.
+    :param results: (dict) Results keyed by benchmark name.
+    :param path: (str) Destination file.
+    :return: None
+    """
+    with open(path, 'w') as file:
+        json.dump({'environment': environment_info(), 'benchmarks': results}, file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+    Loads the results of a JSON baseline.
+    :param path: (str) Baseline file.
+    :return: (dict) Results keyed by benchmark name.
+    """
+    with open(path) as file:
+        return json.load(file)['benchmarks']
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compares results against a baseline.  A benchmark regresses when its throughput drops, or its p99 latency
+    rises, by more than the threshold.
+    :param results: (dict) Current results keyed by benchmark name.
+    :param baseline: (dict) Baseline results keyed by benchmark name.
+    :param threshold: (float) Allowed relative change, e.g. 0.1 for 10%.
+    :return: (list) (name, metric, baseline value, current value, relative change) for each regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        throughput_change = result['ops_per_sec'] / base['ops_per_sec'] - 1
+        if throughput_change < -threshold:
+            regressions.append((name, 'ops_per_sec', base['ops_per_sec'], result['ops_per_sec'], throughput_change))
+        if base['p99_us']:
+            latency_change = result['p99_us'] / base['p99_us'] - 1
+            if latency_change > threshold:
+                regressions.append((name, 'p99_us', base['p99_us'], result['p99_us'], latency_change))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    """
+    Formats results as a text table, with the throughput change against a baseline when one is given.
+    :param results: (dict) Results keyed by benchmark name.
+    :param baseline: (dict) Baseline results keyed by benchmark name, or None.
+    :return: (str) The table.
+    """
+    lines = [f"{'benchmark':<20}{'ops/sec':>14}{'p50 us':>12}{'p99 us':>12}" + (f"{'vs base':>10}" if baseline else '')]
+    for name, result in results.items():
+        line = f"{name:<20}{result['ops_per_sec']:>14.1f}{result['p50_us']:>12.2f}{result['p99_us']:>12.2f}"
+        if baseline and name in baseline:
+            line += f"{result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:>+10.1%}"
+        lines.append(line)
+    return '\n'.join(lines)
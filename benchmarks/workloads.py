@@ -0,0 +1,286 @@
+# pytetris/benchmarks/workloads.py
+# Seeded workloads for the benchmark suite.  Each workload's setup builds its state from the seed and returns the
+# operation to time, so repeated runs perform identical work.
+import os
+import random
+from collections import namedtuple
+from functools import partial
+
+from src.game.bot import PlacementSearch, play_piece
+from src.game.engine import GameEngine, LIST_ROWS, RING_ROWS
+from src.game.tetronimo import Itetronimo
+
+Benchmark = namedtuple('Benchmark', ['name', 'setup', 'ops', 'warmup', 'description'])
+
+ACTIONS = ('left', 'right', 'rotate', 'down')
+
+
+def _new_engine(seed):
+    """
+    Creates a freshly reset engine whose piece sequence is fixed by the seed.
+    :param seed: (int) Seed for the piece sequence.
+    :return: (GameEngine) The engine.
+    """
+    engine = GameEngine()
+    engine.reset_game(seed)
+    return engine
+
+
+def _apply(engine, action, restart=True):
+    """
+    Applies one input to an engine.
+    :param engine: (GameEngine) The engine.
+    :param action: (str) One of ACTIONS.
+    :param restart: (bool) Whether to start a new game after a top-out.
+    :return: None
+    """
+    if action == 'rotate':
+        engine.rotate_piece('right')
+    elif action == 'down':
+        engine.move_piece_down()
+    else:
+        engine.move_piece(action)
+    if restart and engine.is_game_over:
+        engine.reset_game(engine.seed + 1)
+
+
+def setup_moves(seed):
+    """
+    Random move, rotate and gravity inputs, exercising collision checks and locking.
+    """
+    engine = _new_engine(seed)
+    actions = random.Random(seed).choices(ACTIONS, k=4096)
+    state = {'index': 0}
+
+    def op():
+        index = state['index']
+        _apply(engine, actions[index & 4095])
+        state['index'] = index + 1
+
+    return op
+
+
+def setup_collision(seed):
+    """
+    Raw collision probes of the active piece at random positions on a half filled board.
+    """
+    engine = _new_engine(seed)
+    rng = random.Random(seed)
+    for row in range(engine.board_height // 2, engine.board_height):
+        cells = list(engine.grid[row])
+        for col in rng.sample(range(engine.board_width), engine.board_width - 2):
+            cells[col] = 'gray'
+            engine.rows[row] |= 1 << col
+        engine.grid[row] = tuple(cells)
+    probes = [(rng.randrange(-1, engine.board_width), rng.randrange(0, engine.board_height)) for _ in range(4096)]
+    state = {'index': 0}
+
+    def op():
+        index = state['index']
+        engine.check_collision(engine.active_piece.shape, probes[index & 4095])
+        state['index'] = index + 1
+
+    return op
+
+
+def setup_line_clears(seed):
+    """
+    A dense stack with every row but the top four full except for one column; each operation drops a vertical I
+    piece into the gap, clearing four lines, and refills the cleared rows.
+    """
+    engine = _new_engine(seed)
+    width, height = engine.board_width, engine.board_height
+    gap = random.Random(seed).randrange(width)
+    stack_rows = range(4, height)
+
+    row = tuple('gray' if col != gap else None for col in range(width))
+    mask = engine.full_row & ~(1 << gap)
+
+    def fill():
+        for y in stack_rows:
+            if engine.rows[y] == 0:
+                engine.grid[y] = row
+                engine.rows[y] = mask
+        engine.rebuild_heights()
+
+    fill()
+
+    def op():
+        piece = Itetronimo()
+        piece.rotation_state = 1
+        engine.active_piece = piece
+        piece.position = (gap, 0)
+        engine.hard_drop()
+        fill()
+
+    return op
+
+
+def setup_huge_moves(seed, row_storage=LIST_ROWS):
+    """
+    moves on a 100x5000 board, restarting after a top-out.
+    """
+    engine = GameEngine(100, 5000, row_storage=row_storage)
+    engine.reset_game(seed)
+    actions = random.Random(seed).choices(ACTIONS, k=4096)
+    state = {'index': 0}
+
+    def op():
+        index = state['index']
+        _apply(engine, actions[index & 4095])
+        state['index'] = index + 1
+
+    return op
+
+
+def setup_huge_line_clears(seed, row_storage=LIST_ROWS):
+    """
+    line_clears on a 100x5000 board with a 2000 row stack: each vertical I piece clears the four bottom rows and
+    the cleared rows are refilled on top of the stack.
+    """
+    engine = GameEngine(100, 5000, row_storage=row_storage)
+    engine.reset_game(seed)
+    width, height = engine.board_width, engine.board_height
+    gap = random.Random(seed).randrange(width)
+    stack_top = height - 2000
+    row = tuple('gray' if col != gap else None for col in range(width))
+    mask = engine.full_row & ~(1 << gap)
+    for y in range(stack_top, height):
+        engine.grid[y] = row
+        engine.rows[y] = mask
+    engine.rebuild_heights()
+    heights = tuple(engine.heights)
+
+    def op():
+        piece = Itetronimo()
+        piece.rotation_state = 1
+        engine.active_piece = piece
+        piece.position = (gap, stack_top - 4)
+        engine.hard_drop()
+        for y in range(stack_top, stack_top + 4):
+            engine.grid[y] = row
+            engine.rows[y] = mask
+        engine.heights = list(heights)
+
+    return op
+
+
+def setup_full_game(seed):
+    """
+    Complete games of random inputs played until top-out.
+    """
+    rng = random.Random(seed)
+    engine = GameEngine()
+
+    def op():
+        engine.reset_game(rng.getrandbits(63))
+        while not engine.is_game_over:
+            _apply(engine, rng.choice(ACTIONS), restart=False)
+
+    return op
+
+
+def setup_bot_placements(seed):
+    """
+    Bot placements without lookahead, each choosing and playing one piece, restarting after a top-out.
+    """
+    engine = _new_engine(seed)
+    search = PlacementSearch(depth=1)
+
+    def op():
+        play_piece(engine, search)
+        if engine.is_game_over:
+            engine.reset_game(engine.seed + 1)
+
+    return op
+
+
+def setup_batch_step(seed):
+    """
+    One vectorized step of 1024 boards in the NumPy batch engine.
+    """
+    import numpy as np
+    from src.game.batch import BatchEngine
+
+    batch = BatchEngine(1024, seed=seed)
+    actions = np.random.default_rng(seed).integers(0, 7, size=(256, 1024))
+    state = {'index': 0}
+
+    def op():
+        index = state['index']
+        batch.step(actions[index & 255])
+        batch.reset(mask=batch.done)
+        state['index'] = index + 1
+
+    return op
+
+
+def setup_env_placements(seed):
+    """
+    One auto-resetting step of 1024 vectorized environments, each placing its piece directly.
+    """
+    import numpy as np
+    from src.game.env import VectorEnv
+
+    env = VectorEnv(1024, seed=seed)
+    rng = np.random.default_rng(seed)
+    actions = env.placement_action(rng.integers(0, 4, size=(256, 1024)), rng.integers(0, 10, size=(256, 1024)))
+    state = {'index': 0}
+
+    def op():
+        index = state['index']
+        env.step(actions[index & 255])
+        state['index'] = index + 1
+
+    return op
+
+
+def setup_render(seed):
+    """
+    Renders a BoardWidget into a QImage with the offscreen Qt platform after each random input, starting a new game
+    when one ends.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtWidgets import QApplication
+    from src.game.board import BoardWidget
+
+    app = QApplication.instance() or QApplication([])
+    board = BoardWidget()
+    board.reset_game(seed)
+    image = QImage(board.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    actions = random.Random(seed).choices(ACTIONS, k=4096)
+    state = {'index': 0, 'app': app}
+
+    def op():
+        index = state['index']
+        action = actions[index & 4095]
+        if board.engine.is_game_over:
+            board.reset_game(seed + index)
+        if action == 'rotate':
+            board.rotate_piece('right')
+        else:
+            board.move_piece(action)
+        board.render(image)
+        state['index'] = index + 1
+
+    return op
+
+
+BENCHMARKS = (
+    Benchmark('moves', setup_moves, 20000, 2000, setup_moves.__doc__.strip()),
+    Benchmark('collision', setup_collision, 50000, 5000, setup_collision.__doc__.strip()),
+    Benchmark('line_clears', setup_line_clears, 2000, 200, setup_line_clears.__doc__.strip()),
+    Benchmark('huge_moves_list', setup_huge_moves, 20000, 2000, setup_huge_moves.__doc__.strip() + '  List rows.'),
+    Benchmark('huge_moves_ring', partial(setup_huge_moves, row_storage=RING_ROWS), 20000, 2000,
+              setup_huge_moves.__doc__.strip() + '  RowRing rows.'),
+    Benchmark('huge_line_clears_list', setup_huge_line_clears, 2000, 200,
+              setup_huge_line_clears.__doc__.strip() + '  List rows.'),
+    Benchmark('huge_line_clears_ring', partial(setup_huge_line_clears, row_storage=RING_ROWS), 2000, 200,
+              setup_huge_line_clears.__doc__.strip() + '  RowRing rows.'),
+    Benchmark('full_game', setup_full_game, 50, 5, setup_full_game.__doc__.strip()),
+    Benchmark('bot_placements', setup_bot_placements, 2000, 200, setup_bot_placements.__doc__.strip()),
+    Benchmark('batch_step', setup_batch_step, 200, 20, setup_batch_step.__doc__.strip()),
+    Benchmark('env_placements', setup_env_placements, 200, 20, setup_env_placements.__doc__.strip()),
+    Benchmark('render', setup_render, 2000, 200, setup_render.__doc__.strip()),
+)
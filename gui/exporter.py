@@ -0,0 +1,259 @@
+# pytetris/gui/exporter.py
+# Renders replays to image sequences without a window, many times faster than real time.
+#
+# Frames are painted into QImages with the board's own paint functions.  QPainter on a QImage works on any thread,
+# so frames are rendered and encoded on a thread pool while the main thread re-simulates the replay and writes the
+# finished images in order.  On a huge board, --viewport-rows limits the images to that many rows following the
+# active piece, as the game window does.  Output is numbered PNG or raw RGBA files in a directory, or one stream of
+# them on stdout for an encoder, for example:
+#
+#     python -m gui.exporter game.ptr --format rgba -o - | \
+#         ffmpeg -f rawvideo -pix_fmt rgba -s 300x600 -r 30 -i - game.mp4
+#
+# Usage: python -m gui.exporter REPLAY [-o DIR|-] [--format png|rgba] [--fps N] [--cell-size N] [--workers N]
+#                                [--viewport-rows N]
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtGui import QImage, QPainter
+from src.game import replay
+from src.game.board import paint_background, paint_piece, paint_stack
+from src.game.engine import GameEngine
+from src.game.frame import capture, viewport_top
+
+FORMATS = ('png', 'rgba')
+
+
+def follow_piece(engine, top_row=0, rows=None):
+    """
+    Captures a frame of some of an engine's rows, moving them to keep the active piece in view.
+    :param engine: (GameEngine) The engine.
+    :param top_row: (int) The first row captured in the previous frame.
+    :param rows: (int) Number of rows to capture, or None for the whole board.
+    :return: (Frame) The frame, whose top_row is the first row captured.
+    """
+    if rows is None:
+        return capture(engine)
+    top_row = viewport_top(top_row, engine.get_active_piece_coordinates(), rows, engine.board_height)
+    return capture(engine, top_row=top_row, rows=rows)
+
+
+def replay_frames(data, fps=30, viewport_rows=None):
+    """
+    Re-simulates a replay and yields frames of it.
+    :param data: (bytes) The encoded replay.
+    :param fps: (float) Frames per second of recorded time, or 0 for one frame per input.
+    :param viewport_rows: (int) Rows of a taller board to show, following the active piece, or None for every row.
+    :return: Iterator of Frames, starting with the game's first piece and ending with its final state.
+    """
+    board_width, board_height, seed, piece_mode, tick_rate, offset = replay.read_header(data)
+    rows = viewport_rows if viewport_rows is not None and viewport_rows < board_height else None
+    engine = GameEngine(board_width, board_height, piece_mode)
+    if any(code == replay.UNDO for _, code in replay.iter_inputs(data, offset)):
+        engine.enable_history(None)
+    engine.reset_game(seed)
+    frame_ticks = tick_rate / fps if fps else 0
+    elapsed = 0
+    next_frame = 0
+    frame = follow_piece(engine, 0, rows)
+    for delta, code in replay.iter_inputs(data, offset):
+        if engine.is_game_over and code != replay.UNDO:
+            break
+        elapsed += delta
+        if frame_ticks:
+            # Every frame due before this input's tick shows the state it changes.
+            while next_frame <= elapsed:
+                frame = follow_piece(engine, frame.top_row, rows)
+                yield frame
+                next_frame += frame_ticks
+        else:
+            frame = follow_piece(engine, frame.top_row, rows)
+            yield frame
+        replay.apply_input(engine, code)
+    yield follow_piece(engine, frame.top_row, rows)
+
+
+def render_background(board_width, rows, cell_size=30):
+    """
+    Paints an empty board, or the rows of one a frame shows.
+    :param board_width: (int) Width of the board in cells.
+    :param rows: (int) Number of rows to paint.
+    :param cell_size: (int) Size of cells in pixels.
+    :return: (QImage) The board background as an RGBA image.
+    """
+    image = QImage(board_width * cell_size, rows * cell_size, QImage.Format.Format_RGBA8888)
+    painter = QPainter(image)
+    try:
+        paint_background(painter, board_width, rows, cell_size)
+    finally:
+        painter.end()
+    return image
+
+
+def render_frame(frame, cell_size=30, background=None):
+    """
+    Paints the rows a frame holds into a new image.
+    :param frame: (Frame) The frame.
+    :param cell_size: (int) Size of cells in pixels.
+    :param background: (QImage) The board's background from render_background(), copied instead of repainted, or
+        None to paint it.
+    :return: (QImage) The frame as an RGBA image.
+    """
+    if background is None:
+        background = render_background(frame.board_width, len(frame.grid), cell_size)
+    image = background.copy()
+    painter = QPainter(image)
+    try:
+        paint_stack(painter, frame.grid, cell_size)
+        paint_piece(painter, frame, cell_size, frame.top_row)
+    finally:
+        painter.end()
+    return image
+
+
+def encode_image(image, image_format):
+    """
+    Encodes an image.
+    :param image: (QImage) An RGBA8888 image.
+    :param image_format: (str) 'png', or 'rgba' for the raw pixels, row by row.
+    :return: (bytes) The encoded image.
+    """
+    if image_format == 'rgba':
+        pixels = image.constBits()
+        pixels.setsize(image.sizeInBytes())
+        return bytes(pixels)
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, 'PNG')
+    return bytes(buffer.data())
+
+
+class DirectorySink:
+    """
+    Writes each image to its own numbered file.
+
+    Attributes:
+        directory (str): The output directory.
+        extension (str): File extension of the images.
+        count (int): Images written.
+    """
+
+    def __init__(self, directory, extension):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.extension = extension
+        self.count = 0
+
+    def __call__(self, data):
+        path = os.path.join(self.directory, f"frame-{self.count:06d}.{self.extension}")
+        with open(path, 'wb') as file:
+            file.write(data)
+        self.count += 1
+
+
+class StreamSink:
+    """
+    Writes the images back to back to a binary stream, such as an encoder's stdin.
+
+    Attributes:
+        stream: The binary stream.
+        count (int): Images written.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def __call__(self, data):
+        self.stream.write(data)
+        self.count += 1
+
+
+class FrameExporter:
+    """
+    Renders frames to encoded images on a thread pool, delivering them in order.
+
+    At most a few frames per worker are in flight, so memory stays bounded however long the sequence is.  The
+    board background is painted once per image size and copied into every frame.
+
+    Attributes:
+        cell_size (int): Size of cells in pixels.
+        image_format (str): One of FORMATS.
+        workers (int): Rendering threads.
+    """
+
+    def __init__(self, cell_size=30, image_format='png', workers=None):
+        if image_format not in FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        self.cell_size = cell_size
+        self.image_format = image_format
+        self.workers = workers or os.cpu_count() or 1
+        self._backgrounds = {}  # (board_width, rows) -> QImage
+
+    def encode(self, frame, background=None):
+        """
+        Renders and encodes one frame.
+        :param frame: (Frame) The frame.
+        :param background: (QImage) The board's background, or None to paint it.
+        :return: (bytes) The encoded image.
+        """
+        return encode_image(render_frame(frame, self.cell_size, background), self.image_format)
+
+    def export(self, frames, sink):
+        """
+        Renders frames and passes each encoded image to the sink, in order.
+        :param frames: Iterable of Frames.
+        :param sink: Callable taking the bytes of one image.
+        :return: (int) Number of frames exported.
+        """
+        count = 0
+        window = self.workers * 4
+        with ThreadPoolExecutor(self.workers) as pool:
+            pending = deque()
+            for frame in frames:
+                size = (frame.board_width, len(frame.grid))
+                background = self._backgrounds.get(size)
+                if background is None:
+                    background = self._backgrounds[size] = render_background(*size, self.cell_size)
+                pending.append(pool.submit(self.encode, frame, background))
+                if len(pending) >= window:
+                    sink(pending.popleft().result())
+                    count += 1
+            while pending:
+                sink(pending.popleft().result())
+                count += 1
+        return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gui.exporter', description='Render a replay to images.')
+    parser.add_argument('replay', help='Replay file to render.')
+    parser.add_argument('-o', '--output', default='frames',
+                        help='Directory to write numbered images to, or - for stdout (default: frames).')
+    parser.add_argument('--format', choices=FORMATS, default='png', help='Image format (default: png).')
+    parser.add_argument('--fps', type=float, default=30,
+                        help='Frames per second of recorded time, 0 for one frame per input (default: 30).')
+    parser.add_argument('--cell-size', type=int, default=30, help='Cell size in pixels (default: 30).')
+    parser.add_argument('--workers', type=int, default=None, help='Rendering threads (default: one per core).')
+    parser.add_argument('--viewport-rows', type=int, default=None,
+                        help='Rows of a taller board to render, following the active piece (default: every row).')
+    args = parser.parse_args(argv)
+
+    with open(args.replay, 'rb') as file:
+        data = file.read()
+    exporter = FrameExporter(args.cell_size, args.format, args.workers)
+    if args.output == '-':
+        sink = StreamSink(sys.stdout.buffer)
+    else:
+        sink = DirectorySink(args.output, args.format)
+    count = exporter.export(replay_frames(data, args.fps, args.viewport_rows), sink)
+    print(f"Exported {count} frames", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
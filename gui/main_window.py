@@ -1,18 +1,68 @@
 # pytetris/gui/main_window.py
-from PyQt6.QtCore import Qt, QTimer
+import time
+
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, QSpacerItem,
                              QSizePolicy)
-from src.game.board import BoardWidget
+from src.game import replay
+from src.game.clock import GameClock
+from src.game.events import GAME_OVER, LEVEL, LINES, SCORE
+from src.game.history import DEPTH
+from src.profiling import profiler
+from src.tracing import tracer
+from .overlay import ProfilerOverlay
 from .utils import print_layout_info
 
 
 class MainWindow(QMainWindow):
+    """
+    The game window: HUD labels, the start button and, once a game starts, the board and next pieces preview.
+
+    Only the HUD and start button are built up front so the first frame appears quickly.  The board, the preview
+    and the game logic are created the first time they are needed.  The logic runs in an EngineWorker on its own
+    thread: the window forwards keys and commands to it through queued signals and draws the frames it publishes.
+    """
+
+    # Keys that map directly to replay input codes
+    KEY_INPUTS = {
+        Qt.Key.Key_Left: replay.LEFT,
+        Qt.Key.Key_Right: replay.RIGHT,
+        Qt.Key.Key_Up: replay.ROTATE_RIGHT,
+        Qt.Key.Key_Down: replay.DOWN,
+        Qt.Key.Key_Return: replay.HARD_DROP,
+        Qt.Key.Key_Enter: replay.HARD_DROP,
+    }
+
+    # Signals to the worker, delivered on its thread
+    start_requested = pyqtSignal()
+    pause_requested = pyqtSignal(bool)
+    key_pressed = pyqtSignal(int, object)
+    key_released = pyqtSignal(int)
+    inputs_cleared = pyqtSignal()
+    autoplay_requested = pyqtSignal(bool)
+    undo_requested = pyqtSignal()
+    shutdown_requested = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, record_dir=None, practice=False, history_depth=DEPTH, spectate=None, board_width=10,
+                 board_height=20, cell_size=30, viewport_rows=20):
         super().__init__()
-        self.level = None
-        self.lines_cleared = None
-        self.score = None
+        self.board_width = board_width
+        self.board_height = board_height
+        self.cell_size = cell_size
+        self.viewport_rows = viewport_rows
+        self.record_dir = record_dir
+        self.practice = practice
+        self.history_depth = history_depth
+        self.spectate = spectate
+        self.worker = None
+        self.worker_thread = None
+        self.preview = None
+        self.autoplay = False
+        self.is_paused = True
+        self.is_game_over = False
+        self.level = 0
+        self.lines_cleared = 0
+        self.score = 0
         self.btn_brd_spcr = None
         self.right_layout = None
         self.left_layout = None
@@ -23,20 +73,19 @@ class MainWindow(QMainWindow):
         self.level_label = None
         self.score_label = None
         self.elapsed_time = 0
-        self.ui_update_timer = QTimer()
         self.title_label = QLabel("PyTetris")
-        self.board = BoardWidget()
-        self.game_timer = QTimer()
+        self.board = None
+        self.clock = GameClock()
         self.start_button = QPushButton("Start Game")
+        self.overlay = None
         self.setWindowTitle("PyTetris")
         self.setGeometry(100, 100, 400, 800)
         self.initUI()
         self.apply_styles()
         self.setFocus()
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
-        self.ui_update_timer.timeout.connect(self.update_timer_label)  # Call every second
-        self.ui_update_timer.start(1000)  # Fire every 1000 milliseconds (1 second)
-        print(f"MainWindow focus: {self.hasFocus()}")
+        if tracer.layout:
+            tracer.emit('layout', 'main_window_focus', focus=self.hasFocus())
 
     def initUI(self):
         # Create the central widget and set the layout
@@ -82,18 +131,47 @@ class MainWindow(QMainWindow):
         self.btn_brd_spcr = QSpacerItem(20, 20, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Fixed)
         layout.addItem(self.btn_brd_spcr)
 
-        # Board widget (initially hidden, centered)
-        self.board.setVisible(False)
-        layout.addWidget(self.board, alignment=Qt.AlignmentFlag.AlignCenter)
-
         # Set the layout for the central widget
         central_widget.setLayout(layout)
 
-        # Print layout info (debugging only)
-        print_layout_info(self.centralWidget())
+    def build_game_view(self):
+        """
+        Builds the board, the next pieces preview and the worker thread the first time a game starts.  Their
+        modules are imported here too, so none of this costs anything before the player presses Start.
+        :return: None
+        """
+        if self.board is not None:
+            return
+        from src.game.board import BoardView
+        from .preview import NextPiecesWidget
+        from .worker import EngineWorker
 
-        # Connect the game timer to the board's move_piece_down method
-        self.game_timer.timeout.connect(self.board.move_piece_down)
+        layout = self.centralWidget().layout()
+        self.board = BoardView(self.board_width, self.board_height, self.cell_size, viewport_rows=self.viewport_rows)
+
+        # Next pieces preview and board widget (centered, below the start button's spacer)
+        self.preview = NextPiecesWidget()
+        layout.addWidget(self.preview, alignment=Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.board, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        # The game logic lives on its own thread; every connection across it is queued.
+        self.worker = EngineWorker(self.clock, self.record_dir, self.practice, self.history_depth, self.spectate,
+                                   self.board_width, self.board_height, self.viewport_rows)
+        self.worker_thread = QThread()
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.setup)
+        self.worker.frame_ready.connect(self.show_frame)
+        self.worker.spectating.connect(self.show_spectator_address)
+        self.board.viewport_moved.connect(self.worker.set_view_top)
+        self.start_requested.connect(self.worker.start_game)
+        self.pause_requested.connect(self.worker.set_paused)
+        self.key_pressed.connect(self.worker.press)
+        self.key_released.connect(self.worker.release)
+        self.inputs_cleared.connect(self.worker.clear_inputs)
+        self.autoplay_requested.connect(self.worker.set_autoplay)
+        self.undo_requested.connect(self.worker.undo)
+        self.shutdown_requested.connect(self.worker.shutdown, Qt.ConnectionType.BlockingQueuedConnection)
+        self.worker_thread.start()
 
     def update_score_label(self):
         """
@@ -123,76 +201,184 @@ class MainWindow(QMainWindow):
                 font-weight: bold;
                 color: #FFFFFF;
             }
-            BoardWidget {
+            BoardView {
                 background-color: #A9A9A9;
                 border: 2px solid #FFFFFF;
             }
         """)
 
-    def update_timer_label(self):
+    def update_timer_label(self, ticks):
         """
-        Update the timer_label to show elapsed time in MM:SS format.
+        Update the timer_label to show elapsed game time in MM:SS format, as counted in logic ticks.  The label is only
+        touched when the displayed second changed.
+        :param ticks: (int) Logic ticks run in the current game.
         """
-        self.elapsed_time += 1  # Increment elapsed time by 1 second
+        elapsed_time = int(ticks * self.clock.step)
+        if elapsed_time == self.elapsed_time:
+            return
+        self.elapsed_time = elapsed_time
         minutes = self.elapsed_time // 60
         seconds = self.elapsed_time % 60
         self.time_label.setText(f"Time: {minutes:02}:{seconds:02}")  # Format as MM:SS
 
     def keyPressEvent(self, event):
         """
-        Handle key press events for game input.
+        Handle key press events.  Game input keys are sent to the worker for its next logic tick; the operating
+        system's auto-repeated presses are ignored, since the worker's input queue repeats held keys itself.
         :param event: QKeyEvent - key press information.
         :return: None.
         """
-        if event.key() == Qt.Key.Key_Left:
-            self.board.move_piece('left')
-        elif event.key() == Qt.Key.Key_Right:
-            self.board.move_piece('right')
-        elif event.key() == Qt.Key.Key_Up:
-            self.board.rotate_piece('right')
-        elif event.key() == Qt.Key.Key_Down:
-            self.board.move_piece('down')
+        if event.isAutoRepeat():
+            return
+        if event.key() == Qt.Key.Key_F3:
+            self.toggle_overlay()
+            return
+        if event.key() == Qt.Key.Key_F4:
+            self.export_profile()
+            return
+        if self.board is None:  # No game has started yet.
+            return
+        code = self.KEY_INPUTS.get(event.key())
+        if code is not None:
+            if not self.autoplay and not self.is_paused:
+                self.key_pressed.emit(code, time.perf_counter() if profiler.enabled else None)
         elif event.key() == Qt.Key.Key_Space:
             self.toggle_pause()
+        elif event.key() == Qt.Key.Key_A:
+            self.toggle_autoplay()
+        elif event.key() == Qt.Key.Key_Backspace and self.practice:
+            self.undo_requested.emit()
+
+    def keyReleaseEvent(self, event):
+        """
+        Sends the release of a held game input key to the worker.
+        :param event: QKeyEvent - key release information.
+        :return: None.
+        """
+        if event.isAutoRepeat() or self.board is None:
+            return
+        code = self.KEY_INPUTS.get(event.key())
+        if code is not None:
+            self.key_released.emit(code)
+
+    def focusOutEvent(self, event):
+        """
+        Forgets held keys when the window loses focus, since their releases will not arrive.
+        :param event: QFocusEvent - focus change information.
+        :return: None.
+        """
+        if self.board is not None:
+            self.inputs_cleared.emit()
+        super().focusOutEvent(event)
 
-    def start_game_loop(self):
+    def toggle_overlay(self):
         """
-        Start or resume the game loop, moving the active piece down at timed intervals.
+        Shows or hides the profiler overlay, which enables the profiler while it is visible.
         :return: None
         """
-        try:
-            self.game_timer.timeout.disconnect()
-        except TypeError:
-            pass
-        self.board.level = max(self.board.level, 1)
+        if self.overlay is None:
+            self.overlay = ProfilerOverlay(self.clock, self.centralWidget())
+            self.overlay.move(4, 4)
+        self.overlay.toggle()
 
-        self.game_timer.timeout.connect(self.board.move_piece_down)
-        interval = 1000 // self.board.level
-        self.game_timer.start(interval)
+    def export_profile(self):
+        """
+        Writes a profiler snapshot, including the logic clock's jitter, to a JSON file in the current directory.
+        :return: (str) The file written.
+        """
+        path = f"pytetris-profile-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        profiler.export_json(path, {'clock': {'ticks': self.clock.ticks, 'dropped_ticks': self.clock.dropped_ticks,
+                                              'jitter': {key: value * 1000 if key != 'count' else value
+                                                         for key, value in self.clock.jitter().items()}}})
+        self.statusBar().showMessage(f"Profile written to {path}", 5000)
+        return path
 
-    def stop_game_loop(self):
+    def show_spectator_address(self, address):
         """
-        Pauses the game loop.
+        Shows where spectators can watch the game in the status bar.
+        :param address: (str) The spectator server's address.
         :return: None
         """
-        self.game_timer.stop()
+        self.statusBar().addPermanentWidget(QLabel(f"Spectators: {address}"))
+
+    def show_frame(self):
+        """
+        Takes the worker's latest frame and shows it: the board and preview schedule repaints of what changed, which
+        Qt coalesces, and the HUD labels are only touched for the engine changes the frame carries.
+        :return: None
+        """
+        frame = self.worker.take_frame()
+        if frame is None:
+            return
+        if frame.input_at is not None and profiler.enabled:
+            profiler.begin_input(frame.input_at)
+        self.board.show_frame(frame)
+        self.preview.show_pieces(frame.next_pieces)
+        self.flush_hud(frame.changes)
+        self.update_timer_label(frame.ticks)
+
+    def flush_hud(self, changes):
+        """
+        Applies the engine changes coalesced by the worker's ChangeBuffer to the HUD.
+        :param changes: (tuple) Change entries, at most one per kind.
+        :return: None
+        """
+        for kind, value in changes:
+            if kind == SCORE:
+                self.score = value
+                self.update_score_label()
+            elif kind == LINES:
+                self.lines_cleared = value
+                self.update_lines_label()
+            elif kind == LEVEL:
+                self.level = value
+                self.update_level_label()
+            elif kind == GAME_OVER:
+                self.show_game_over(value)
+
+    def show_game_over(self, is_game_over):
+        """
+        Shows or hides the game over state on every change of the engine's game over flag.  Only practice games are
+        seen ending: the worker restarts other games on the tick they end, so their game over and reset cancel out
+        in the frame's changes.  A practice game stays over until the last placement is undone or a new game is
+        started.
+        :param is_game_over: (bool) Whether the game is over.
+        :return: None
+        """
+        self.is_game_over = is_game_over
+        self.start_button.setVisible(is_game_over)
+        if is_game_over:
+            self.statusBar().showMessage("Game over: Backspace to undo, or start a new game")
+        else:
+            self.statusBar().clearMessage()
+            self.setFocus()
+
+    def toggle_autoplay(self):
+        """
+        Toggles autoplay, in which the bot places one piece on each tick that gravity moves the piece.
+        :return: None
+        """
+        self.autoplay = not self.autoplay
+        self.autoplay_requested.emit(self.autoplay)
 
     def start_game(self):
         """
-        Starts a new game by resetting the board and adding the first piece.
+        Starts a new game on the worker and shows the board.
         :return: None.
         """
-        print("start_game called")
-        self.board.reset_game()
-        self.board.is_paused = False
+        if tracer.game:
+            tracer.emit('game', 'start_game')
+        self.build_game_view()
+        self.start_requested.emit()
+        self.is_paused = False
         self.start_button.hide()
         layout = self.centralWidget().layout()
         self.board.setVisible(True)
+        self.preview.setVisible(True)
 
         layout.activate()
         self.update()
         print_layout_info(self.centralWidget())
-        self.start_game_loop()
 
     def pause_game_key(self, event):
         """
@@ -208,9 +394,26 @@ class MainWindow(QMainWindow):
         Toggles game pause.
         :return: None
         """
-        if self.board.is_paused:
-            self.board.is_paused = False
-            self.start_game_loop()
-        else:
-            self.board.is_paused = True
-            self.stop_game_loop()
+        if self.board is None:
+            return
+        self.is_paused = not self.is_paused
+        self.pause_requested.emit(self.is_paused)
+
+    @property
+    def last_replay(self):
+        """
+        Returns the replay of the last finished game, or None.
+        """
+        return None if self.worker is None else self.worker.last_replay
+
+    def closeEvent(self, event):
+        """
+        Stops the worker and waits for its thread to finish when the window closes.
+        :param event: The close event.
+        :return: None
+        """
+        if self.worker_thread is not None:
+            self.shutdown_requested.emit()
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+        super().closeEvent(event)
@@ -0,0 +1,62 @@
+# pytetris/gui/overlay.py
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QLabel
+from src.profiling import profiler
+
+
+class ProfilerOverlay(QLabel):
+    """
+    A small text panel over the window showing the frame rate, p99 frame, paint, tick and input latency and the
+    logic clock's p99 timer jitter, refreshed twice a second while visible.
+
+    Showing the overlay enables the profiler and hiding it disables it again, unless the profiler was already
+    enabled from the environment.
+
+    Attributes:
+        clock (GameClock): The logic clock whose jitter is shown.
+    """
+
+    def __init__(self, clock, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self._was_enabled = profiler.enabled
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("QLabel { background-color: rgba(0, 0, 0, 160); color: #00FF00; font-size: 11px;"
+                           " font-family: monospace; padding: 4px; }")
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        """
+        Shows or hides the overlay.
+        :return: None
+        """
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+            if not self._was_enabled:
+                profiler.disable()
+        else:
+            self._was_enabled = profiler.enabled
+            profiler.enable()
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(500)
+
+    def refresh(self):
+        """
+        Updates the text from the profiler's current window.
+        :return: None
+        """
+        p99 = {name: histogram.merged().percentile(99) * 1000 for name, histogram in profiler.histograms.items()}
+        jitter = self.clock.jitter()['p99'] * 1000
+        self.setText(f"FPS {profiler.fps():>3}\n"
+                     f"frame p99 {p99['frame']:6.1f} ms\n"
+                     f"paint p99 {p99['paint']:6.2f} ms\n"
+                     f"tick  p99 {p99['tick']:6.2f} ms\n"
+                     f"input p99 {p99['input_latency']:6.1f} ms\n"
+                     f"timer jitter p99 {jitter:5.1f} ms")
+        self.adjustSize()
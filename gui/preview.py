@@ -0,0 +1,57 @@
+# pytetris/gui/preview.py
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter
+from src.game.board import qcolor
+
+
+class NextPiecesWidget(QWidget):
+    """
+    Shows the upcoming pieces of a game side by side, as given by show_pieces().
+
+    Attributes:
+        pieces (tuple): Tetronimo subclasses of the upcoming pieces shown.
+        count (int): Number of upcoming pieces shown.
+        cell_size (int): Size of preview cells in pixels.
+    """
+
+    SLOT_CELLS = 5  # Each piece is drawn in a slot 5 cells wide and 3 cells tall.
+
+    def __init__(self, count=3, cell_size=15, parent=None):
+        super().__init__(parent)
+        self.pieces = ()
+        self.count = count
+        self.cell_size = cell_size
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setFixedSize(count * self.SLOT_CELLS * cell_size, 3 * cell_size)
+
+    def show_pieces(self, pieces):
+        """
+        Shows new upcoming pieces, repainting only when they differ from the ones shown.
+        :param pieces: (tuple) Tetronimo subclasses of the upcoming pieces.
+        :return: None
+        """
+        if pieces != self.pieces:
+            self.pieces = pieces
+            self.update()
+
+    def paintEvent(self, event):
+        """
+        Draws each upcoming piece centered in its slot.
+        :param event: (QPaintEvent) The paint event.
+        :return: None
+        """
+        painter = QPainter(self)
+        try:
+            cell_size = self.cell_size
+            for slot, piece_type in enumerate(self.pieces[:self.count]):
+                piece = piece_type()
+                state = piece.state
+                color = qcolor(piece.color)
+                left = slot * self.SLOT_CELLS * cell_size + (self.SLOT_CELLS - state.width) * cell_size // 2
+                top = (3 - state.height) * cell_size // 2
+                for dx, dy in state.cells:
+                    painter.fillRect(left + dx * cell_size, top + dy * cell_size, cell_size - 1, cell_size - 1,
+                                     color)
+        finally:
+            painter.end()
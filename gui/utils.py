@@ -1,11 +1,13 @@
 # pytetris/gui/utils.py
 # Helper functions related to the MainWindow class
+from PyQt6.QtCore import QEvent, QObject
 from PyQt6.QtWidgets import QLayoutItem
+from src.tracing import tracer
 
 
 def recursive_traverse(layout):
     """
-    Recursively traverse the layout to print widget information.
+    Recursively traverse the layout to record widget information as 'layout' trace events.
     :param layout: QLayout to traverse.
     """
     for i in range(layout.count()):
@@ -15,22 +17,12 @@ def recursive_traverse(layout):
             widget = item.widget()
 
             if widget:
-                # Get widget information
-                widget_type = widget.__class__.__name__
-                geometry = widget.geometry()
-                visibility = widget.isVisible()
-
-                # Print out widget information
-                print(f"Widget Type: {widget_type}")
-                print(f"Geometry: {geometry}")
-                print(f"Visible: {visibility}")
-
-                # Check if widget is in the layout (if layout contains the widget)
-                if layout.indexOf(widget) != -1:
-                    print(f"In Layout: Yes")
-                else:
-                    print(f"In Layout: No")
-                print('-' * 40)
+                # Record widget type, geometry, visibility and whether the layout contains the widget
+                tracer.emit('layout', 'widget',
+                            widget_type=widget.__class__.__name__,
+                            geometry=widget.geometry().getRect(),
+                            visible=widget.isVisible(),
+                            in_layout=layout.indexOf(widget) != -1)
 
             # Handle nested layouts (in case there are any sub-layouts)
             if isinstance(item, QLayoutItem) and item.layout():
@@ -39,11 +31,42 @@ def recursive_traverse(layout):
 
 def print_layout_info(central_widget):
     """
-    Prints layout information including geometry and visibility for every widget in the central widget layout.
+    Records layout information including geometry and visibility for every widget in the central widget layout.
+    Does nothing unless the 'layout' trace category is enabled.
     :param central_widget: The central widget of the MainWindow.
     """
+    if not tracer.layout:
+        return
     layout = central_widget.layout()
     if layout is not None:
         recursive_traverse(layout)
     else:
-        print("No layout set for central widget.")
+        tracer.emit('layout', 'no_layout')
+
+
+class _FirstPaintFilter(QObject):
+    """
+    Event filter that calls a callback after the watched widget's first paint event, then removes itself.
+    """
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            self.deleteLater()
+            self.callback()
+        return False
+
+
+def on_first_paint(widget, callback):
+    """
+    Calls a callback when a widget first receives a paint event.
+    :param widget: (QWidget) The widget to watch.
+    :param callback: Callable taking no arguments.
+    :return: None
+    """
+    _FirstPaintFilter(widget, callback)
@@ -0,0 +1,452 @@
+# pytetris/gui/worker.py
+# Runs the game logic on its own thread, so a slow paint, a layout pass or a window being dragged never delays a
+# logic tick, and a heavy tick never delays a paint.
+#
+# The GUI thread only talks to EngineWorker through queued signals: key presses, releases and commands go in, and
+# frame_ready comes out.  Frames are immutable, so the GUI can draw one while the worker keeps changing the engine.
+import os
+import threading
+import time
+
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+from src.game import replay
+from src.game.clock import GameClock, gravity_for_level
+from src.game.engine import GameEngine
+from src.game.events import GAME_OVER, LEVEL, LINES, SCORE, ChangeBuffer
+from src.game.frame import capture, viewport_top
+from src.game.history import DEPTH
+from src.game.input import InputQueue
+from src.game.replay import ReplayRecorder
+from src.profiling import profiler
+from src.tracing import tracer
+
+
+class EngineWorker(QObject):
+    """
+    Owns a game's engine, logic clock, input queue, replay recorder and bot, and runs them on the thread it has been
+    moved to.
+
+    A precise timer on the worker's thread wakes the logic clock every step.  After every wakeup or command that may
+    have changed the game, the worker captures a Frame and leaves it in a one-slot mailbox.  frame_ready is only
+    emitted when the GUI has taken the previous frame with take_frame(), so a GUI thread that was busy for a while
+    catches up by showing the latest frame rather than working through a backlog of queued ones.
+
+    Attributes:
+        engine (GameEngine): The game.
+        clock (GameClock): The logic clock.  Other threads may read its tick counts and jitter.
+        inputs (InputQueue): Key events waiting for the next logic tick.
+        record_dir (str): Directory every finished game's replay is saved to, or None.
+        practice (bool): Whether placements can be undone.
+        spectate (str): Address to stream the game to spectators on, or None.
+        autoplay (bool): Whether the bot places the pieces.
+        last_replay (bytes): The replay of the last finished game, or None.
+        tick (int): Logic tick being run, or None between ticks.
+        viewport_rows (int): Rows the window shows of a taller board, or None when it shows every row.
+        view_top (int): The board row at the top of the window's viewport.
+        hud_changes (ChangeBuffer): The engine's score, lines, level and game over changes, flushed into each frame.
+    """
+
+    frame_ready = pyqtSignal()
+    spectating = pyqtSignal(str)  # The address spectators can watch at, once the server listens
+    NEXT_PIECES = 3  # Upcoming pieces included in each frame for the preview
+
+    def __init__(self, clock=None, record_dir=None, practice=False, history_depth=DEPTH, spectate=None,
+                 board_width=10, board_height=20, viewport_rows=None):
+        super().__init__()
+        self.engine = GameEngine(board_width, board_height)
+        if practice:
+            self.engine.enable_history(history_depth)
+        self.clock = clock if clock is not None else GameClock()
+        self.inputs = InputQueue()
+        self.record_dir = record_dir
+        self.practice = practice
+        self.spectate = spectate
+        self.spectators = None
+        self.recorder = None
+        self.last_replay = None
+        self.autoplay = False
+        self.bot = None
+        self.timer = None
+        self.input_pressed_at = None
+        self.tick = None
+        self.viewport_rows = viewport_rows if viewport_rows is not None and viewport_rows < board_height else None
+        self.view_top = 0
+        # Values the window shows before the first game, so only real changes reach it.
+        self.hud_changes = ChangeBuffer({SCORE: 0, LINES: 0, LEVEL: 0, GAME_OVER: False})
+        self.engine.add_listener(self.hud_changes)
+        self._input_at = None
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_waiting = False
+
+    @pyqtSlot()
+    def setup(self):
+        """
+        Creates the tick timer and starts the spectator server.  Runs on the worker's thread once it has started.
+        :return: None
+        """
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(round(self.clock.step * 1000))
+        self.timer.timeout.connect(self.advance_frame)
+        if self.spectate:
+            from src.spectator import SpectatorServer
+            self.spectators = SpectatorServer(self.spectate)
+            address = self.spectators.start()
+            if tracer.game:
+                tracer.emit('game', 'spectate', address=address)
+            self.spectating.emit(address)
+
+    @pyqtSlot()
+    def shutdown(self):
+        """
+        Stops the game loop and disconnects spectators before the worker's thread quits.
+        :return: None
+        """
+        self.stop_game_loop()
+        if self.spectators is not None:
+            self.spectators.stop()
+
+    def take_frame(self):
+        """
+        Takes the latest frame from the mailbox.  Called from the GUI thread when frame_ready arrives.
+        :return: (Frame) The latest frame, or None before the first.
+        """
+        with self._lock:
+            self._frame_waiting = False
+            return self._frame
+
+    def publish_frame(self):
+        """
+        Leaves a frame of the game in the mailbox, announcing it unless the GUI has yet to take the previous one.
+        A replaced frame's pending input time and HUD changes carry over, so no input latency sample or label update
+        is lost.
+        :return: None
+        """
+        top_row, rows = self.captured_rows()
+        frame = capture(self.engine, self.clock.ticks, self.NEXT_PIECES, self._input_at, self.hud_changes.flush(),
+                        top_row, rows)
+        self._input_at = None
+        with self._lock:
+            waiting = self._frame_waiting
+            if waiting and frame.input_at is None and self._frame.input_at is not None:
+                frame = frame._replace(input_at=self._frame.input_at)
+            if waiting and self._frame.changes:
+                changes = {change.kind: change for change in self._frame.changes}
+                changes.update((change.kind, change) for change in frame.changes)
+                frame = frame._replace(changes=tuple(changes.values()))
+            self._frame = frame
+            self._frame_waiting = True
+        if not waiting:
+            self.frame_ready.emit()
+        if self.spectators is not None:
+            self.spectators.publish(self.engine, self.clock.ticks)
+
+    def captured_rows(self):
+        """
+        Chooses the rows a frame holds: on a board taller than the viewport, the viewport with a viewport's height of
+        margin above and below, so the view can scroll a little or follow the piece before the next frame arrives.
+        The rows move to center on the active piece when it is outside them.
+        :return: (tuple) The first row and the number of rows, or 0 and None for the whole board.
+        """
+        if self.viewport_rows is None:
+            return 0, None
+        engine = self.engine
+        rows = min(3 * self.viewport_rows, engine.board_height)
+        top_row = max(0, min(self.view_top - self.viewport_rows, engine.board_height - rows))
+        return viewport_top(top_row, engine.get_active_piece_coordinates(), rows, engine.board_height), rows
+
+    @pyqtSlot(int)
+    def set_view_top(self, row):
+        """
+        Moves the rows captured in frames along with the window's viewport.
+        :param row: (int) The board row now at the top of the viewport.
+        :return: None
+        """
+        self.view_top = row
+        self.publish_frame()
+
+    @pyqtSlot(int, object)
+    def press(self, code, pressed_at=None):
+        """
+        Queues a game key press for the next logic tick.  Ignored while paused or in autoplay.
+        :param code: (int) Replay input code of the key.
+        :param pressed_at: (float) perf_counter time the GUI received the press, when profiling, or None.
+        :return: None
+        """
+        if self.autoplay or not self.clock.is_running:
+            return
+        self.inputs.press(code)
+        if pressed_at is not None and self.input_pressed_at is None:
+            self.input_pressed_at = pressed_at
+
+    @pyqtSlot(int)
+    def release(self, code):
+        """
+        Queues the release of a held game key.
+        :param code: (int) Replay input code of the key.
+        :return: None
+        """
+        self.inputs.release(code)
+
+    @pyqtSlot()
+    def clear_inputs(self):
+        """
+        Forgets queued and held keys, for example when the window loses focus.
+        :return: None
+        """
+        self.inputs.clear()
+        self.input_pressed_at = None
+
+    def advance_frame(self):
+        """
+        Runs the logic ticks that became due since the timer last fired and publishes the result.
+        :return: None
+        """
+        self.run_ticks(self.clock.advance())
+        self.publish_frame()
+
+    def run_ticks(self, count):
+        """
+        Runs logic ticks, applying gravity on every tick in which the clock's gravity accumulated a whole cell.
+        :param count: (int) Number of logic ticks.
+        :return: None
+        """
+        clock = self.clock
+        # The clock has already counted the due ticks, so number the ticks being run from the first of them.
+        first = clock.ticks - count
+        for index in range(count):
+            if self.engine.is_game_over:  # A practice game waits for an undo or a new game.
+                break
+            self.tick = first + index
+            if profiler.enabled:
+                start = time.perf_counter()
+            self.process_inputs()
+            clock.gravity = gravity_for_level(self.engine.level, clock.step)
+            cells = clock.tick()
+            if cells:
+                self.gravity_tick(cells)
+            if profiler.enabled:
+                profiler.record('tick', time.perf_counter() - start)
+        self.tick = None
+
+    def process_inputs(self):
+        """
+        Applies the input codes the input queue has due this tick.
+        :return: None
+        """
+        if self.inputs.is_idle:
+            return
+        codes = self.inputs.tick()
+        if not codes:
+            return
+        if self.input_pressed_at is not None:
+            before = self.board_state()
+        for code in codes:
+            self.apply_input(code)
+        if self.input_pressed_at is not None:
+            if self.board_state() != before:
+                self._input_at = self.input_pressed_at
+            self.input_pressed_at = None
+
+    def board_state(self):
+        """
+        Returns a value that changes whenever an input changes what the board shows.
+        :return: (tuple) The active piece, its position and rotation, and the stack version.
+        """
+        engine = self.engine
+        piece = engine.active_piece
+        if piece is None:
+            return None, None, None, engine.stack_version
+        return piece, piece.position, piece.rotation_state, engine.stack_version
+
+    def apply_input(self, code):
+        """
+        Records an input in the replay and applies it to the engine.
+        :param code: (int) The replay input code.
+        :return: None
+        """
+        self.record_input(code)
+        engine = self.engine
+        if code == replay.LEFT:
+            engine.move_piece('left')
+        elif code == replay.RIGHT:
+            engine.move_piece('right')
+        elif code == replay.ROTATE_RIGHT:
+            engine.rotate_piece('right')
+        elif code == replay.ROTATE_LEFT:
+            engine.rotate_piece('left')
+        else:
+            if code == replay.HARD_DROP:
+                engine.hard_drop()
+            else:
+                engine.move_piece_down()
+            self.check_game_over()
+
+    def gravity_tick(self, cells=1):
+        """
+        Moves the active piece down by the tick's cells of gravity, or places a whole piece in autoplay.
+        :param cells: (int) Cells of gravity due this tick.
+        :return: None
+        """
+        if self.autoplay:
+            self.play_bot_piece()
+        else:
+            self.apply_gravity(cells)
+
+    def apply_gravity(self, cells):
+        """
+        Drops the active piece several cells in one sweep, recording one gravity input per row moved plus one for
+        the lock, which replays identically.
+        :param cells: (int) Cells of gravity to apply.
+        :return: None
+        """
+        steps = self.engine.fall(cells)
+        for _ in range(steps):
+            self.record_input(replay.GRAVITY)
+        if steps:
+            self.check_game_over()
+
+    @pyqtSlot(bool)
+    def set_autoplay(self, enabled):
+        """
+        Turns autoplay, in which the bot places one piece on each tick that gravity moves the piece, on or off.
+        :param enabled: (bool) Whether the bot plays.
+        :return: None
+        """
+        self.autoplay = enabled
+        self.clear_inputs()
+        if enabled and self.bot is None:
+            from src.game.bot import PlacementSearch
+            self.bot = PlacementSearch()
+
+    def play_bot_piece(self):
+        """
+        Places the active piece where the bot chooses, through recorded inputs.
+        :return: None
+        """
+        from src.game.bot import placement_inputs
+        placement = self.bot.choose(self.engine)
+        if placement is None:
+            self.apply_input(replay.GRAVITY)
+            return
+        for code in placement_inputs(self.engine, placement):
+            self.apply_input(code)
+
+    @pyqtSlot()
+    def undo(self):
+        """
+        Rewinds the last placement in practice mode, recording the undo in the replay when it succeeded.
+        :return: None
+        """
+        if self.practice and self.engine.undo():
+            self.record_input(replay.UNDO)
+            self.clear_inputs()
+            self.publish_frame()
+
+    def check_game_over(self):
+        """
+        Starts a new game, with a new replay, when the last input ended the game.  In practice mode the game stays
+        over instead, with its replay still recording, until the player undoes the last placement or starts a new game.
+        :return: None
+        """
+        engine = self.engine
+        if not engine.is_game_over:
+            return
+        if tracer.game:
+            tracer.emit('game', 'game_over', score=engine.score, lines=engine.lines_cleared, level=engine.level)
+        if self.practice:
+            self.clear_inputs()
+            return
+        engine.reset_game()
+        if tracer.game:
+            tracer.emit('game', 'reset_game', seed=engine.seed)
+        if self.recorder is not None:
+            self.finish_recording()
+            self.start_recording()
+
+    def record_input(self, code):
+        """
+        Records an input about to be applied to the engine in the current game's replay, on the logic tick being
+        run or, between ticks, on the clock's current tick.
+        :param code: (int) The replay input code.
+        :return: None
+        """
+        if self.recorder is not None:
+            self.recorder.record(code, self.clock.ticks if self.tick is None else self.tick)
+
+    def start_recording(self):
+        """
+        Starts recording a replay of the engine's current game.
+        :return: None
+        """
+        engine = self.engine
+        tick = self.clock.ticks if self.tick is None else self.tick
+        self.recorder = ReplayRecorder(engine.seed, engine.board_width, engine.board_height, engine.pieces.mode,
+                                       round(1 / self.clock.step), tick)
+
+    def finish_recording(self):
+        """
+        Finishes the current replay, keeping it in last_replay and writing it to record_dir when one is set.
+        :return: None
+        """
+        if self.recorder is None:
+            return
+        self.last_replay = self.recorder.to_bytes()
+        if self.record_dir is not None:
+            os.makedirs(self.record_dir, exist_ok=True)
+            name = f"replay-{time.strftime('%Y%m%d-%H%M%S')}-{self.recorder.seed}.ptr"
+            self.recorder.save(os.path.join(self.record_dir, name))
+        self.recorder = None
+
+    def start_game_loop(self):
+        """
+        Start or resume the game loop.  The logic clock resumes from where it paused, keeping partial ticks.
+        :return: None
+        """
+        self.engine.level = max(self.engine.level, 1)
+        self.clock.start()
+        self.timer.start()
+
+    def stop_game_loop(self):
+        """
+        Pauses the game loop, first running any ticks that were already due.
+        :return: None
+        """
+        if not self.clock.is_running:
+            return
+        self.run_ticks(self.clock.pause())
+        self.timer.stop()
+        self.clear_inputs()
+        self.publish_frame()
+        if tracer.game:
+            tracer.emit('game', 'tick_jitter', ticks=self.clock.ticks, dropped=self.clock.dropped_ticks,
+                        **self.clock.jitter())
+
+    @pyqtSlot(bool)
+    def set_paused(self, paused):
+        """
+        Pauses or resumes the game.
+        :param paused: (bool) Whether the game should be paused.
+        :return: None
+        """
+        if paused:
+            self.stop_game_loop()
+        else:
+            self.start_game_loop()
+
+    @pyqtSlot()
+    def start_game(self):
+        """
+        Starts a new game: finishes the current replay, resets the engine and clock and starts the game loop.
+        :return: None
+        """
+        self.stop_game_loop()
+        self.finish_recording()
+        self.engine.reset_game()
+        if tracer.game:
+            tracer.emit('game', 'reset_game', seed=self.engine.seed)
+        self.clock.reset()
+        self.start_recording()
+        self.publish_frame()
+        self.start_game_loop()
@@ -0,0 +1,338 @@
+# pytetris/src/game/batch.py
+import numpy as np
+
+from .pieces import BAG, MODES, RANDOM
+from .tetronimo import *
+
+# Board cells hold 0 for empty and ``index + 1`` for a locked cell of type PIECE_TYPES[index].
+PIECE_COLORS = tuple(piece_type().color for piece_type in PIECE_TYPES)
+
+# Actions accepted by BatchEngine.step.
+NOOP, LEFT, RIGHT, ROTATE_RIGHT, ROTATE_LEFT, DOWN, DROP = range(7)
+
+
+def _build_tables():
+    """
+    Packs the rotation tables of every piece type into arrays indexed by [type, rotation].
+    :return: (tuple) Cell x offsets, cell y offsets, widths, clockwise kicks and counterclockwise kicks.
+    """
+    kick_count = max(len(kicks) for piece_type in PIECE_TYPES for state in piece_type().states
+                     for kicks in (state.kicks_right, state.kicks_left))
+    cells_x = np.zeros((len(PIECE_TYPES), 4, 4), dtype=np.int64)
+    cells_y = np.zeros((len(PIECE_TYPES), 4, 4), dtype=np.int64)
+    widths = np.zeros((len(PIECE_TYPES), 4), dtype=np.int64)
+    kicks_right = np.zeros((len(PIECE_TYPES), 4, kick_count, 2), dtype=np.int64)
+    kicks_left = np.zeros((len(PIECE_TYPES), 4, kick_count, 2), dtype=np.int64)
+    for kind, piece_type in enumerate(PIECE_TYPES):
+        for rotation, state in enumerate(piece_type().states):
+            cells_x[kind, rotation] = [dx for dx, _ in state.cells]
+            cells_y[kind, rotation] = [dy for _, dy in state.cells]
+            widths[kind, rotation] = state.width
+            # Pieces with fewer kicks repeat their last one, which is a harmless duplicate probe.
+            for table, kicks in ((kicks_right, state.kicks_right), (kicks_left, state.kicks_left)):
+                padded = list(kicks) + [kicks[-1]] * (kick_count - len(kicks))
+                table[kind, rotation] = padded
+    return cells_x, cells_y, widths, kicks_right, kicks_left
+
+
+CELLS_X, CELLS_Y, WIDTHS, KICKS_RIGHT, KICKS_LEFT = _build_tables()
+
+
+class BatchEngine:
+    """
+    Runs many independent Tetris boards at once with NumPy.
+
+    Boards are held in a single (N, board_height, board_width) uint8 array and the active piece of every board in
+    per-board arrays, so movement, rotation, dropping, collision and line clearing are each one vectorized pass over
+    the batch.  The rules follow GameEngine: gravity moves a piece down one row, a piece that cannot move down locks,
+    full rows are removed scoring 100 points each, and a game ends when the next piece cannot spawn.  As with
+    PieceSource, each board deals its pieces from shuffled 7-bags, or uniformly at random in RANDOM mode, drawing
+    from its own seeded splitmix64 stream.
+
+    Attributes:
+        num_boards (int): Number of boards in the batch.
+        board_width (int): Width of each board in cells.
+        board_height (int): Height of each board in cells.
+        boards (ndarray): (N, board_height, board_width) uint8 cells, 0 empty, otherwise piece code.
+        pieces (ndarray): (N, 4) int64 active piece of each board as (type index, rotation state, column, row).
+        kind (ndarray): Active piece type index per board, a view of a pieces column.
+        rotation (ndarray): Active piece rotation state per board, a view of a pieces column.
+        x (ndarray): Active piece column per board, a view of a pieces column.
+        y (ndarray): Active piece row per board, a view of a pieces column.
+        score (ndarray): Score per board.
+        lines_cleared (ndarray): Lines cleared per board.
+        done (ndarray): Whether each board's game is over.
+        piece_mode (str): BAG or RANDOM.
+        bags (ndarray): (N, 7) shuffled bag of each board in BAG mode; its first bag_size entries are still to deal.
+        bag_size (ndarray): Pieces left in each board's bag.
+    """
+
+    def __init__(self, num_boards, board_width=10, board_height=20, seed=0, piece_mode=BAG):
+        if piece_mode not in MODES:
+            raise ValueError(f"Unknown piece mode: {piece_mode}")
+        self.num_boards = num_boards
+        self.piece_mode = piece_mode
+        self.board_width = board_width
+        self.board_height = board_height
+        self.boards = np.zeros((num_boards, board_height, board_width), dtype=np.uint8)
+        self.pieces = np.zeros((num_boards, 4), dtype=np.int64)
+        self.kind, self.rotation, self.x, self.y = self.pieces.T
+        self.score = np.zeros(num_boards, dtype=np.int64)
+        self.lines_cleared = np.zeros(num_boards, dtype=np.int64)
+        self.done = np.zeros(num_boards, dtype=bool)
+        self.rng_state = np.zeros(num_boards, dtype=np.uint64)
+        self.bags = np.zeros((num_boards, len(PIECE_TYPES)), dtype=np.int64)
+        self.bag_size = np.zeros(num_boards, dtype=np.int64)
+        self.reset(seed)
+
+    def reset(self, seed=None, mask=None):
+        """
+        Clears boards and spawns their first piece.
+        :param seed: (int or array) Base seed, board i uses seed + i; or one seed per selected board.  None keeps the
+            current random streams.
+        :param mask: (ndarray) Boolean mask of boards to reset.  None resets every board.
+        :return: None.
+        """
+        idx = np.arange(self.num_boards) if mask is None else np.flatnonzero(mask)
+        if seed is not None:
+            seeds = np.asarray(seed, dtype=np.uint64)
+            if seeds.ndim == 0:
+                seeds = seeds + idx.astype(np.uint64)
+            self.rng_state[idx] = seeds
+        self.boards[idx] = 0
+        self.score[idx] = 0
+        self.lines_cleared[idx] = 0
+        self.done[idx] = False
+        self.bag_size[idx] = 0
+        self._spawn(idx)
+
+    def _next_random(self, idx):
+        """
+        Advances the splitmix64 stream of each selected board.
+        :param idx: (ndarray) Board indices.
+        :return: (ndarray) One uint64 random value per board.
+        """
+        state = self.rng_state[idx] + np.uint64(0x9E3779B97F4A7C15)
+        self.rng_state[idx] = state
+        z = (state ^ (state >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+    def _deal(self, idx):
+        """
+        Deals the next piece type of each selected board, shuffling a new bag for boards whose bag is empty.
+        :param idx: (ndarray) Board indices.
+        :return: (ndarray) Piece type index per board.
+        """
+        count = len(PIECE_TYPES)
+        if self.piece_mode == RANDOM:
+            return (self._next_random(idx) % np.uint64(count)).astype(np.int64)
+        empty = idx[self.bag_size[idx] == 0]
+        if len(empty):
+            # Sorting one random key per piece type gives a uniform shuffle of each new bag.
+            keys = np.stack([self._next_random(empty) for _ in range(count)], axis=1)
+            self.bags[empty] = np.argsort(keys, axis=1)
+            self.bag_size[empty] = count
+        self.bag_size[idx] -= 1
+        return self.bags[idx, self.bag_size[idx]]
+
+    def _spawn(self, idx):
+        """
+        Spawns a new random piece at the top center of each selected board, ending games where it collides.
+        :param idx: (ndarray) Board indices.
+        :return: None.
+        """
+        if len(idx) == 0:
+            return
+        kind = self._deal(idx)
+        self.kind[idx] = kind
+        self.rotation[idx] = 0
+        self.x[idx] = (self.board_width - WIDTHS[kind, 0]) // 2
+        self.y[idx] = 0
+        blocked = self.collides(idx, kind, self.rotation[idx], self.x[idx], self.y[idx])
+        self.done[idx[blocked]] = True
+
+    def collides(self, idx, kind, rotation, x, y):
+        """
+        Checks pieces against the board edges and locked cells of their boards.
+        :param idx: (ndarray) Board indices.
+        :param kind: (ndarray) Piece type per board.
+        :param rotation: (ndarray) Rotation state per board.
+        :param x: (ndarray) Column of the piece's left edge per board.
+        :param y: (ndarray) Row of the piece's top edge per board.
+        :return: (ndarray) True for every board where the piece collides.
+        """
+        cells_x = x[:, None] + CELLS_X[kind, rotation]
+        cells_y = y[:, None] + CELLS_Y[kind, rotation]
+        outside = (cells_x < 0) | (cells_x >= self.board_width) | (cells_y < 0) | (cells_y >= self.board_height)
+        occupied = self.boards[idx[:, None],
+                               np.clip(cells_y, 0, self.board_height - 1),
+                               np.clip(cells_x, 0, self.board_width - 1)] != 0
+        return (outside | occupied).any(axis=1)
+
+    def _active(self, mask):
+        """
+        Returns the indices of boards that are selected and still playing.
+        :param mask: (ndarray) Boolean mask of boards, None for all boards.
+        :return: (ndarray) Board indices.
+        """
+        if mask is None:
+            return np.flatnonzero(~self.done)
+        return np.flatnonzero(mask & ~self.done)
+
+    def move(self, dx, mask=None):
+        """
+        Shifts pieces horizontally where the destination is free.
+        :param dx: (int or ndarray) Column offset, per board or for every board.
+        :param mask: (ndarray) Boolean mask of boards to move.  None moves every board.
+        :return: (ndarray) Indices of boards whose piece moved.
+        """
+        idx = self._active(mask)
+        dx = np.broadcast_to(np.asarray(dx, dtype=np.int64), (self.num_boards,))[idx]
+        new_x = self.x[idx] + dx
+        free = ~self.collides(idx, self.kind[idx], self.rotation[idx], new_x, self.y[idx])
+        self.x[idx[free]] = new_x[free]
+        return idx[free]
+
+    def rotate(self, direction='right', mask=None):
+        """
+        Rotates pieces, trying each wall kick of their current state in order.
+        :param direction: (str) 'right' for clockwise or 'left' for counterclockwise.
+        :param mask: (ndarray) Boolean mask of boards to rotate.  None rotates every board.
+        :return: (ndarray) Indices of boards whose piece rotated.
+        """
+        idx = self._active(mask)
+        kind = self.kind[idx]
+        rotation = self.rotation[idx]
+        if direction == 'right':
+            target = (rotation + 1) % 4
+            kicks = KICKS_RIGHT[kind, rotation]
+        else:
+            target = (rotation - 1) % 4
+            kicks = KICKS_LEFT[kind, rotation]
+        pending = np.ones(len(idx), dtype=bool)
+        for kick in range(kicks.shape[1]):
+            probe = np.flatnonzero(pending)
+            if len(probe) == 0:
+                break
+            new_x = self.x[idx[probe]] + kicks[probe, kick, 0]
+            new_y = self.y[idx[probe]] + kicks[probe, kick, 1]
+            free = ~self.collides(idx[probe], kind[probe], target[probe], new_x, new_y)
+            rotated = idx[probe[free]]
+            self.rotation[rotated] = target[probe[free]]
+            self.x[rotated] = new_x[free]
+            self.y[rotated] = new_y[free]
+            pending[probe[free]] = False
+        return idx[~pending]
+
+    def move_down(self, mask=None):
+        """
+        Moves pieces down one row.  Pieces that cannot move down are locked in place.
+        :param mask: (ndarray) Boolean mask of boards to step.  None steps every board.
+        :return: (ndarray) Lines cleared on each board by this step.
+        """
+        idx = self._active(mask)
+        blocked = self.collides(idx, self.kind[idx], self.rotation[idx], self.x[idx], self.y[idx] + 1)
+        self.y[idx[~blocked]] += 1
+        return self._lock(idx[blocked])
+
+    def hard_drop(self, mask=None):
+        """
+        Drops pieces straight down as far as they fit and locks them.
+        :param mask: (ndarray) Boolean mask of boards to drop.  None drops every board.
+        :return: (ndarray) Lines cleared on each board by this drop.
+        """
+        idx = self._active(mask)
+        falling = idx
+        while len(falling):
+            blocked = self.collides(falling, self.kind[falling], self.rotation[falling], self.x[falling],
+                                    self.y[falling] + 1)
+            falling = falling[~blocked]
+            self.y[falling] += 1
+        return self._lock(idx)
+
+    def _lock(self, idx):
+        """
+        Writes pieces into their boards, clears full rows and spawns the next pieces.
+        :param idx: (ndarray) Indices of boards whose piece locks.
+        :return: (ndarray) Lines cleared on each board.
+        """
+        cleared = np.zeros(self.num_boards, dtype=np.int64)
+        if len(idx) == 0:
+            return cleared
+        kind = self.kind[idx]
+        cells_x = self.x[idx, None] + CELLS_X[kind, self.rotation[idx]]
+        cells_y = self.y[idx, None] + CELLS_Y[kind, self.rotation[idx]]
+        self.boards[idx[:, None], cells_y, cells_x] = (kind + 1)[:, None].astype(np.uint8)
+        cleared[idx] = self.clear_lines(idx)
+        self._spawn(idx)
+        return cleared
+
+    def clear_lines(self, idx=None):
+        """
+        Removes full rows from the selected boards, shifting the rows above down, and scores 100 points per row.
+        :param idx: (ndarray) Board indices.  None checks every board.
+        :return: (ndarray) Number of rows cleared on each selected board.
+        """
+        if idx is None:
+            idx = np.arange(self.num_boards)
+        full = (self.boards[idx] != 0).all(axis=2)
+        counts = full.sum(axis=1)
+        changed = np.flatnonzero(counts)
+        if len(changed):
+            boards = idx[changed]
+            full = full[changed]
+            # A stable sort on "not full" moves the full rows to the top and keeps the other rows in order; the
+            # moved rows are then emptied.
+            order = np.argsort(~full, axis=1, kind='stable')
+            shifted = np.take_along_axis(self.boards[boards], order[:, :, None], axis=1)
+            shifted[np.arange(self.board_height)[None, :] < counts[changed][:, None]] = 0
+            self.boards[boards] = shifted
+            self.score[boards] += counts[changed] * 100
+            self.lines_cleared[boards] += counts[changed]
+        return counts
+
+    def place(self, rotation, x, mask=None):
+        """
+        Moves pieces to a rotation state and column and hard drops them, through the same rotations and one-column
+        moves a player would use.  Rotations go clockwise, except a single counterclockwise turn for three quarters,
+        and a piece stops short of its column where a move is blocked.
+        :param rotation: (int or ndarray) Target rotation state, per board or for every board.
+        :param x: (int or ndarray) Target column of the piece's left edge, per board or for every board.
+        :param mask: (ndarray) Boolean mask of boards to place.  None places every board.
+        :return: (ndarray) Lines cleared on each board by this placement.
+        """
+        selected = np.zeros(self.num_boards, dtype=bool)
+        selected[self._active(mask)] = True
+        rotation = np.broadcast_to(np.asarray(rotation, dtype=np.int64), (self.num_boards,))
+        x = np.broadcast_to(np.asarray(x, dtype=np.int64), (self.num_boards,))
+        turns = (rotation - self.rotation) % 4
+        self.rotate('left', selected & (turns == 3))
+        self.rotate('right', selected & ((turns == 1) | (turns == 2)))
+        self.rotate('right', selected & (turns == 2))
+        moving = selected & (self.x != x)
+        while moving.any():
+            shift = np.sign(x - self.x)
+            moved = np.zeros(self.num_boards, dtype=bool)
+            moved[self.move(shift, moving)] = True
+            moving &= moved & (self.x != x)
+        return self.hard_drop(selected)
+
+    def step(self, actions, mask=None):
+        """
+        Applies one action per board followed by one row of gravity.  Boards that hard drop skip gravity.
+        :param actions: (ndarray) Action code per board: NOOP, LEFT, RIGHT, ROTATE_RIGHT, ROTATE_LEFT, DOWN or DROP.
+        :param mask: (ndarray) Boolean mask of boards to step.  None steps every board.
+        :return: (ndarray) Lines cleared on each board by this step.
+        """
+        actions = np.asarray(actions)
+        selected = np.ones(self.num_boards, dtype=bool) if mask is None else mask
+        self.move(-1, selected & (actions == LEFT))
+        self.move(1, selected & (actions == RIGHT))
+        self.rotate('right', selected & (actions == ROTATE_RIGHT))
+        self.rotate('left', selected & (actions == ROTATE_LEFT))
+        cleared = self.move_down(selected & (actions == DOWN))
+        drop = actions == DROP
+        cleared += self.hard_drop(selected & drop)
+        cleared += self.move_down(selected & ~drop)
+        return cleared
@@ -0,0 +1,72 @@
+# pytetris/src/game/bitboard.py
+# Helpers for the integer bitmask occupancy layer used by GameEngine.
+#
+# Each board row is stored as an int where bit ``x`` is set when column ``x`` is occupied.  Each piece shape is
+# stored as a tuple of row masks relative to its left edge, so a shape placed at column ``x`` occupies
+# ``mask << x`` in each of its rows.
+
+_mask_cache = {}
+
+
+def full_row_mask(board_width):
+    """
+    Returns the mask of a row with every column occupied.
+    :param board_width: (int) Width of the board in cells.
+    :return: (int) The full row mask.
+    """
+    return (1 << board_width) - 1
+
+
+def column_heights(rows, board_width, board_height):
+    """
+    Computes the height of every column, measured from the bottom of the board to its highest occupied cell.
+    :param rows: Occupancy row masks, top row first.
+    :param board_width: (int) Width of the board in cells.
+    :param board_height: (int) Height of the board in cells.
+    :return: (list) One height per column, 0 for empty columns.
+    """
+    heights = [0] * board_width
+    seen = 0
+    full = full_row_mask(board_width)
+    for index, row in enumerate(rows):
+        new = row & ~seen
+        if new:
+            seen |= new
+            while new:
+                bit = new & -new
+                heights[bit.bit_length() - 1] = board_height - index
+                new ^= bit
+            if seen == full:
+                break
+    return heights
+
+
+def shape_to_masks(shape):
+    """
+    Converts a shape given as rows of 0/1 cells into a tuple of row masks.
+    :param shape: Shape of a piece as a sequence of rows.
+    :return: (tuple) One int mask per row of the shape.
+    """
+    masks = []
+    for row in shape:
+        mask = 0
+        for col, cell in enumerate(row):
+            if cell == 1:
+                mask |= 1 << col
+        masks.append(mask)
+    return tuple(masks)
+
+
+def shape_masks(shape):
+    """
+    Returns the row masks and width of a shape, computing them once per distinct shape.
+    :param shape: Shape of a piece as a sequence of rows.
+    :return: (tuple) A (masks, width) pair.
+    """
+    key = shape if isinstance(shape, tuple) else tuple(tuple(row) for row in shape)
+    entry = _mask_cache.get(key)
+    if entry is None:
+        entry = (shape_to_masks(key), len(key[0]))
+        _mask_cache[key] = entry
+    return entry
+
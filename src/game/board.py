@@ -1,85 +1,292 @@
 # pytetris/src/game/board.py
-from PyQt6.QtCore import Qt
+import time
+
+from PyQt6.QtCore import Qt, QRect, pyqtSignal
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor, QPen
-from .tetronimo import *
+from PyQt6.QtGui import QPainter, QColor, QPen, QPixmap
+from src.profiling import profiler
+from src.tracing import tracer
+from .engine import GameEngine
+from .frame import capture, viewport_top
+
+_colors = {}
+GHOST_ALPHA = 70  # Opacity of the ghost piece, out of 255
 
 
-class BoardWidget(QWidget):
+def qcolor(name):
     """
-    A widget representing the game board.
+    Returns a shared QColor for a color name, constructing it only the first time the name is seen.
+    :param name: (str) A color name or hex string.
+    :return: (QColor) The color.
+    """
+    color = _colors.get(name)
+    if color is None:
+        color = _colors[name] = QColor(name)
+    return color
+
+
+def paint_background(painter, board_width, rows, cell_size):
+    """
+    Paints the board background and gridlines.
+    :param painter: (QPainter) The painter.
+    :param board_width: (int) Width of the board in cells.
+    :param rows: (int) Number of rows to paint.
+    :param cell_size: (int) Size of cells in pixels.
+    :return: None
+    """
+    # Board styles
+    painter.fillRect(0, 0, board_width * cell_size, rows * cell_size, qcolor("#A9A9A9"))
+    # Set the color and pen for gridlines
+    pen = QPen(qcolor("#555555"))  # Dark gray gridlines
+    pen.setWidth(1)
+    painter.setPen(pen)
+
+    # Draw horizontal and vertical gridlines
+    for row in range(rows + 1):  # Draw horizontal lines
+        y = row * cell_size
+        painter.drawLine(0, y, board_width * cell_size, y)
+
+    for col in range(board_width + 1):  # Draw vertical lines
+        x = col * cell_size
+        painter.drawLine(x, 0, x, rows * cell_size)
 
-    Handles rendering the Tetris board, managing the game grid, and rotation, movement, and placement of pieces.
+
+def paint_stack(painter, grid, cell_size, first_row=0):
+    """
+    Paints locked cells, the first given row at the top of the painter unless told otherwise.
+    :param painter: (QPainter) The painter.
+    :param grid: (tuple) Row tuples of cell colors, None for empty cells.
+    :param cell_size: (int) Size of cells in pixels.
+    :param first_row: (int) The painter row, counted in cells, to paint the first given row at.
+    :return: None
+    """
+    for row, cells in enumerate(grid, first_row):
+        if cells.count(None) == len(cells):  # Empty row
+            continue
+        y = row * cell_size
+        for col, color in enumerate(cells):
+            if color is not None:  # Cell is occupied
+                painter.fillRect(col * cell_size, y, cell_size, cell_size, qcolor(color))
+
+
+def paint_piece(painter, frame, cell_size, top_row=0):
+    """
+    Paints a frame's ghost piece at the landing position, then its active piece.
+    :param painter: (QPainter) The painter.
+    :param frame: (Frame) The frame.
+    :param cell_size: (int) Size of cells in pixels.
+    :param top_row: (int) The board row at the top of the painter.
+    :return: None
+    """
+    if frame.piece_color is None:
+        return
+    ghost_offset = frame.ghost_offset
+    if ghost_offset:
+        ghost_color = QColor(qcolor(frame.piece_color))
+        ghost_color.setAlpha(GHOST_ALPHA)
+        for x, y in frame.piece_cells:
+            painter.fillRect(x * cell_size, (y + ghost_offset - top_row) * cell_size, cell_size, cell_size,
+                             ghost_color)
+    color = qcolor(frame.piece_color)
+    for x, y in frame.piece_cells:
+        painter.fillRect(x * cell_size, (y - top_row) * cell_size, cell_size, cell_size, color)
+
+
+def _engine_attribute(name):
+    """
+    Builds a property that forwards reads and writes of an attribute to the widget's GameEngine.
+    :param name: (str) The engine attribute name.
+    :return: property
+    """
+    def getter(self):
+        return getattr(self.engine, name)
+
+    def setter(self, value):
+        setattr(self.engine, name, value)
+
+    return property(getter, setter)
+
+
+class BoardView(QWidget):
+    """
+    A widget that draws Frames of a game.
+
+    The view never reads an engine, so it can show a game running on another thread: show_frame() swaps in the new
+    frame and schedules a repaint of what changed.  The background and gridlines are cached in one pixmap and the
+    locked stack in another, which is only rebuilt when the frame's stack version changes; moving the active piece
+    repaints just the cells it covered and now covers.
+
+    A board taller than viewport_rows is shown through a viewport of that many rows, and only those rows are ever
+    drawn.  The viewport follows the active piece, and the mouse wheel scrolls it until the next piece spawns.
+    Frames may hold only some of the board's rows; viewport_moved tells whoever captures them where the viewport is,
+    and rows the shown frame does not hold are drawn empty.
 
     Attributes:
         board_width (int): Width of game board in cells.
         board_height (int): Height of game board in cells.
         cell_size (int):  Size of cells in pixels.
-        grid (list):  A 2D list representing the current board state.
-        active_piece (Tetronimo): The current piece in play.
-        score (int): Player score for current game.
-        level (int): Current level.
+        viewport_rows (int): Number of rows shown.
+        top_row (int): The board row shown at the top of the viewport.
+        follow_piece (bool): Whether the viewport scrolls to keep the active piece in view.
+        frame (Frame): The frame shown, or None before the first one.
     """
 
-    def __init__(self, board_width=10, board_height=20, cell_size=30, parent=None):
+    viewport_moved = pyqtSignal(int)  # The board row now at the top of the viewport
+
+    def __init__(self, board_width=10, board_height=20, cell_size=30, parent=None, viewport_rows=None):
         super().__init__(parent)
         self.board_width = board_width
         self.board_height = board_height
         self.cell_size = cell_size
-        self.grid = [[None for _ in range(board_width)] for _ in range(board_height)]
-        self.active_piece = None
-        self.score = 0
-        self.level = 0
-        self.is_paused = False
+        self.viewport_rows = board_height if viewport_rows is None else min(viewport_rows, board_height)
+        self.top_row = 0
+        self.follow_piece = True
+        self.frame = None
+        self._background = None
+        self._background_size = None
+        self._stack_layer = None
+        self._stack_version = None
+        self._stack_top_row = None
+        self._stack_frame_top_row = None
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
 
-        self.setFixedSize(self.board_width * self.cell_size, self.board_height * self.cell_size)
+        self.setFixedSize(self.board_width * self.cell_size, self.viewport_rows * self.cell_size)
 
-        print(f"BoardWidget size: {self.size()}")
-        print(f"BoardWidget geometry: {self.geometry()}")
+        if tracer.layout:
+            tracer.emit('layout', 'board_widget', size=(self.width(), self.height()),
+                        geometry=self.geometry().getRect())
+
+    def show_frame(self, frame):
+        """
+        Shows a new frame.  Only the cells the active piece left and entered are repainted unless the locked stack
+        or the captured rows changed, which repaints the whole board.
+        :param frame: (Frame) The frame.
+        :return: None
+        """
+        old = self.frame
+        self.frame = frame
+        if self.viewport_rows < self.board_height and frame.piece_cells:
+            if old is not None and old.piece_count != frame.piece_count:
+                self.follow_piece = True
+            if self.follow_piece and self.scroll_to_piece():
+                return
+        if old is None or old.stack_version != frame.stack_version or old.top_row != frame.top_row:
+            self.update()
+        elif old.piece_cells != frame.piece_cells or old.ghost_offset != frame.ghost_offset:
+            self.update(self.piece_rect(old).united(self.piece_rect(frame)))
+
+    def scroll_to(self, row):
+        """
+        Scrolls the viewport so the given board row is at its top, as far as the board allows.
+        :param row: (int) The board row.
+        :return: (bool) True if the viewport moved.
+        """
+        row = max(0, min(row, self.board_height - self.viewport_rows))
+        if row == self.top_row:
+            return False
+        self.top_row = row
+        self.update()
+        self.viewport_moved.emit(row)
+        return True
+
+    def scroll_to_piece(self):
+        """
+        Centers the viewport on the active piece when the piece is not fully inside it.
+        :return: (bool) True if the viewport moved.
+        """
+        return self.scroll_to(viewport_top(self.top_row, self.frame.piece_cells, self.viewport_rows,
+                                           self.board_height))
+
+    def wheelEvent(self, event):
+        """
+        Scrolls a viewport three rows per wheel step, pausing piece following until the next piece spawns.
+        :param event: (QWheelEvent) The wheel event.
+        :return: None
+        """
+        if self.viewport_rows >= self.board_height:
+            super().wheelEvent(event)
+            return
+        self.follow_piece = False
+        self.scroll_to(self.top_row - event.angleDelta().y() // 40)
+        event.accept()
 
     def paintEvent(self, event):
         """
-        Handles the widget's paint event by rendering the current board state.
+        Handles the widget's paint event by compositing the cached background and stack layers and the active piece
+        inside the requested region.
         :param event: (QPaintEvent) The paint event object containing details about the repaint request.
         :return: None
         """
-        # print("paintEvent called!")
+        if profiler.enabled:
+            start = time.perf_counter()
+        if self._background is None or self._background_size != self.size():
+            self._render_background()
+        if (self._stack_layer is None or self._stack_top_row != self.top_row
+                or (self.frame is not None and (self._stack_version != self.frame.stack_version
+                                                or self._stack_frame_top_row != self.frame.top_row))):
+            self._render_stack_layer()
+
         painter = QPainter(self)
         try:
-            # Board styles
-            painter.fillRect(self.rect(), QColor("#A9A9A9"))
-            # Set the color and pen for gridlines
-            pen = QPen(QColor("#555555"))  # Dark gray gridlines
-            pen.setWidth(1)
-            painter.setPen(pen)
-
-            # Draw horizontal and vertical gridlines
-            for row in range(self.board_height + 1):  # Draw horizontal lines
-                y = row * self.cell_size
-                painter.drawLine(0, y, self.board_width * self.cell_size, y)
-
-            for col in range(self.board_width + 1):  # Draw vertical lines
-                x = col * self.cell_size
-                painter.drawLine(x, 0, x, self.board_height * self.cell_size)
-
-            self.draw_board(painter)
+            dirty = event.rect()
+            painter.drawPixmap(dirty, self._background, dirty)
+            painter.drawPixmap(dirty, self._stack_layer, dirty)
+            self.draw_piece(painter)
         finally:
             painter.end()
+        if profiler.enabled:
+            profiler.frame_painted(start)
 
-    def get_active_piece_coordinates(self):
+    def resizeEvent(self, event):
         """
-        Returns a list of grid coordinates occupied by the current active piece.
-        :return: List of (x, y) coordinates occupied by the active piece.
+        Drops the cached layers so they are rebuilt at the new size.
+        :param event: (QResizeEvent) The resize event.
+        :return: None
+        """
+        self._background = None
+        self._stack_layer = None
+        super().resizeEvent(event)
+
+    def _new_layer(self):
         """
-        coordinates = []
-        for row in range(len(self.active_piece.shape)):
-            for col in range(len(self.active_piece.shape[row])):
-                if self.active_piece.shape[row][col] == 1:
-                    x = self.active_piece.position[0] + col
-                    y = self.active_piece.position[1] + row
-                    coordinates.append((x, y))
-        return coordinates
+        Creates a transparent pixmap covering the widget at the screen's pixel density.
+        :return: (QPixmap) The empty layer.
+        """
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(Qt.GlobalColor.transparent)
+        return layer
+
+    def _render_background(self):
+        """
+        Renders the board background and gridlines into the cached background layer.
+        :return: None
+        """
+        self._background = self._new_layer()
+        self._background_size = self.size()
+        painter = QPainter(self._background)
+        try:
+            paint_background(painter, self.board_width, self.viewport_rows, self.cell_size)
+        finally:
+            painter.end()
+
+    def _render_stack_layer(self):
+        """
+        Renders the locked cells into the cached stack layer.
+        :return: None
+        """
+        self._stack_layer = self._new_layer()
+        self._stack_top_row = self.top_row
+        if self.frame is None:
+            return
+        self._stack_version = self.frame.stack_version
+        self._stack_frame_top_row = self.frame.top_row
+        painter = QPainter(self._stack_layer)
+        try:
+            self.draw_stack(painter)
+        finally:
+            painter.end()
 
     def draw_board(self, painter):
         """
@@ -88,45 +295,103 @@ class BoardWidget(QWidget):
         :param painter: (QPainter) The QPainter object used for drawing the board.
         :return: None.
         """
-        print("Drawing board")
-        # Render grid
-        for row in range(self.board_height):
-            for col in range(self.board_width):
-                if self.grid[row][col] is not None:  # Cell is occupied
-                    print(f"Drawing block at ({row}, {col}) with color {self.grid[row][col]}")
-                    painter.fillRect(col * self.cell_size, row * self.cell_size,
-                                     self.cell_size, self.cell_size,
-                                     QColor(self.grid[row][col]))
-        # render piece
-        piece = self.active_piece
-        if piece is not None:
-            for row in range(len(piece.shape)):
-                for col in range(len(piece.shape[row])):
-                    if piece.shape[row][col] == 1:  # Calculate x and y coordinates and fill the cell.
-                        x = (piece.position[0] + col) * self.cell_size
-                        y = (piece.position[1] + row) * self.cell_size
-                        painter.fillRect(x, y, self.cell_size, self.cell_size, QColor(piece.color))
-        return
+        self.draw_stack(painter)
+        self.draw_piece(painter)
+
+    def draw_stack(self, painter):
+        """
+        Draws the locked cells of the rows in the viewport.
+        :param painter: (QPainter) The QPainter object used for drawing the board.
+        :return: None.
+        """
+        if self.frame is None:
+            return
+        start = self.top_row - self.frame.top_row  # Index of the viewport's top row in the frame's rows
+        visible = self.frame.grid[max(start, 0):max(start + self.viewport_rows, 0)]
+        if tracer.render:
+            tracer.emit('render', 'draw_stack', cells=sum(self.board_width - row.count(None) for row in visible))
+        paint_stack(painter, visible, self.cell_size, max(-start, 0))
+
+    def draw_piece(self, painter):
+        """
+        Draws the ghost piece at the landing position, then the active piece.
+        :param painter: (QPainter) The QPainter object used for drawing the board.
+        :return: None.
+        """
+        if self.frame is not None:
+            paint_piece(painter, self.frame, self.cell_size, self.top_row)
+
+    def piece_rect(self, frame=None):
+        """
+        Returns the widget area covered by a frame's active piece and its ghost below it.
+        :param frame: (Frame) The frame, or None for the one shown.
+        :return: (QRect) The covered area, empty when there is no active piece.
+        """
+        frame = self.frame if frame is None else frame
+        if frame is None or not frame.piece_cells:
+            return QRect()
+        xs = [x for x, _ in frame.piece_cells]
+        ys = [y for _, y in frame.piece_cells]
+        left = min(xs)
+        top = min(ys)
+        cell_size = self.cell_size
+        return QRect(left * cell_size, (top - self.top_row) * cell_size, (max(xs) - left + 1) * cell_size,
+                     (max(ys) - top + 1 + frame.ghost_offset) * cell_size)
+
+
+class BoardWidget(BoardView):
+    """
+    A widget representing the game board.
+
+    A thin view over a GameEngine in the same thread: forwards movement, rotation and placement of pieces to the
+    engine and shows a new frame of it only when the engine reports a change.
+
+    Attributes:
+        engine (GameEngine): The headless game state and rules.
+        grid (list):  A list of row tuples representing the current board state.
+        active_piece (Tetronimo): The current piece in play.
+        score (int): Player score for current game.
+        level (int): Current level.
+    """
+
+    grid = _engine_attribute('grid')
+    active_piece = _engine_attribute('active_piece')
+    score = _engine_attribute('score')
+    lines_cleared = _engine_attribute('lines_cleared')
+    level = _engine_attribute('level')
+    is_paused = _engine_attribute('is_paused')
+
+    def __init__(self, board_width=10, board_height=20, cell_size=30, parent=None, engine=None, viewport_rows=None):
+        self.engine = engine if engine is not None else GameEngine(board_width, board_height)
+        super().__init__(self.engine.board_width, self.engine.board_height, cell_size, parent, viewport_rows)
+        self.sync()
+
+    def sync(self):
+        """
+        Shows a new frame of the engine after it changed.
+        :return: None
+        """
+        self.show_frame(capture(self.engine))
+
+    def get_active_piece_coordinates(self):
+        """
+        Returns a list of grid coordinates occupied by the current active piece.
+        :return: List of (x, y) coordinates occupied by the active piece.
+        """
+        return self.engine.get_active_piece_coordinates()
 
     def print_grid(self):
         """
         Prints the current state of the grid for debugging.
         """
-        print("Current grid state:")
-        for row in range(self.board_height):
-            print([self.grid[row][col] if self.grid[row][col] is not None else "empty" for col in
-                   range(self.board_width)])
+        self.engine.print_grid()
 
     def get_random_piece(self):
         """
-           Generates a random Tetronimo piece.
-           :return: A random Tetronimo object.
-           """
-        import random
-        tetronimoes = [Itetronimo, OTetronimo, TTetronimo, LTetronimo, JTetronimo, STetronimo, ZTetronimo]
-        new_piece = random.choice(tetronimoes)()
-        # print(f"Generated piece: {new_piece}")
-        return new_piece
+        Generates a random Tetronimo piece.
+        :return: A random Tetronimo object.
+        """
+        return self.engine.get_random_piece()
 
     def start_new_piece(self, tetronimo):
         """
@@ -134,27 +399,8 @@ class BoardWidget(QWidget):
         :param tetronimo: (Tetronimo) The game piece to be added at the starting position.
         :return: None
         """
-        x_position = (self.board_width - len(tetronimo.shape[0])) // 2
-        tetronimo.position = (x_position, 0)  # Starts at top center of board.
-
-        for row in range(len(tetronimo.shape)):
-            for col in range(len(tetronimo.shape[row])):
-                if tetronimo.shape[row][col] == 1:
-                    self.grid[row][x_position + col] = tetronimo.color
-        self.active_piece = tetronimo
-
-    def clear_active_piece(self):
-        """
-        Clears the active piece from the grid to allow it to move to a new position without leaving a trail.
-        :return: None.
-        """
-        for row in range(len(self.active_piece.shape)):
-            for col in range(len(self.active_piece.shape[row])):
-                if self.active_piece.shape[row][col] == 1:
-                    x = self.active_piece.position[0] + col
-                    y = self.active_piece.position[1] + row
-                    if 0 <= x < self.board_width and 0 <= y < self.board_height:
-                        self.grid[y][x] = None  # Clear the previous position in the grid
+        self.engine.start_new_piece(tetronimo)
+        self.sync()
 
     def move_piece(self, direction):
         """
@@ -162,53 +408,40 @@ class BoardWidget(QWidget):
         :param direction: (str) The direction to move: 'left', 'right', or 'down'.
         :return: None.
         """
-        if direction == 'left':
-            new_position = (self.active_piece.position[0] - 1, self.active_piece.position[1])
-        elif direction == 'right':
-            new_position = (self.active_piece.position[0] + 1, self.active_piece.position[1])
-        elif direction == 'down':
+        if direction == 'down':
             self.move_piece_down()
             return
-        else:
-            return  # Whatever was passed, it wasn't a valid direction.
-
-        if not self.check_collision(self.active_piece.shape, new_position):
-            self.active_piece.position = new_position
-            self.update()
-        else:
-            if direction == 'down':
-                self.start_new_piece(self.active_piece)
-        self.update()
-        return
+        if self.engine.move_piece(direction):
+            self.sync()
 
     def move_piece_down(self):
         """
         Moves the active piece down one cell.  If a collision is detected, the piece is placed at that point.
+        The game stays over when the next piece cannot be placed, until reset_game() or undo().
         :return: None.
         """
-        # print(f"move_piece_down called! Current position: {self.active_piece.position}")
-        if self.active_piece is None:
-            return
-        self.clear_active_piece()
-        new_position = (self.active_piece.position[0], self.active_piece.position[1] + 1)
-        # Check for collision at new position
-        if not self.check_collision(self.active_piece.shape, new_position):
-
-            self.active_piece.position = new_position
-            # print(f"New position after move: {self.active_piece.position}")
-            # self.update()
-        else:
-            self.add_piece_to_board()
-            self.clear_lines()
-            self.print_grid()
-            new_piece = self.get_random_piece()
-            self.start_new_piece(new_piece)
-            if self.check_collision(new_piece.shape, new_piece.position):
-                print("Game Over: Piece cannot be placed")
-                self.game_over()
-            else:
-                print("New piece placed successfully")
-        self.update()
+        if self.engine.move_piece_down():
+            self.sync()
+
+    def fall(self, cells):
+        """
+        Applies several cells of gravity in one sweep.  The game stays over when the next piece cannot be placed.
+        :param cells: (int) Cells of gravity to apply.
+        :return: (int) The number of move_piece_down() calls this was equivalent to.
+        """
+        steps = self.engine.fall(cells)
+        if steps:
+            self.sync()
+        return steps
+
+    def hard_drop(self):
+        """
+        Drops the active piece to its landing row and locks it.  The game stays over when the next piece cannot be
+        placed.
+        :return: None.
+        """
+        if self.engine.hard_drop():
+            self.sync()
 
     def rotate_piece(self, direction='right'):
         """
@@ -216,22 +449,8 @@ class BoardWidget(QWidget):
         :param direction: (str) The direction to rotate the piece in.
         :return: None.
         """
-        rotated_piece = None
-        if self.active_piece is None:
-            return
-        if direction == 'right':
-            rotated_shape = self.active_piece.rotate_right()
-        elif direction == 'left':
-            rotated_shape = self.active_piece.rotate_left()
-        else:
-            return
-
-        if not self.check_collision(rotated_shape, self.active_piece.position):
-            self.active_piece.shape = rotated_shape
-            self.active_piece.rotate()
-            self.update()
-        else:
-            pass
+        if self.engine.rotate_piece(direction):
+            self.sync()
 
     def check_collision(self, shape, position):
         """
@@ -240,69 +459,60 @@ class BoardWidget(QWidget):
         :param position: The top left position (x, y) to check the shape at.
         :return: True if collision detected, False otherwise.
         """
-        # Get current piece coordinates
-        active_piece_coords = self.get_active_piece_coordinates() if self.active_piece else []
-
-        for row in range(len(shape)):
-            for col in range(len(shape[row])):
-                if shape[row][col] == 1:
-                    x = position[0] + col
-                    y = position[1] + row
-                    # Boundary check
-                    if x < 0 or x >= self.board_width or y >= self.board_height:
-                        print(f"Collision with boundary detected at: ({x}, {y})")
-                        return True
-                    # Piece check
-                    if self.grid[y][x] is not None and (x, y) not in active_piece_coords:
-                        print(f"Collision with another piece at: ({x}, {y})")
-                        return True
-        return False
+        return self.engine.check_collision(shape, position)
 
     def add_piece_to_board(self):
         """
         Adds the current piece to the board when it collides.
         :return: None
         """
-        print("Adding piece to the board")
-        for row in range(len(self.active_piece.shape)):
-            for col in range(len(self.active_piece.shape[row])):
-                if self.active_piece.shape[row][col] == 1:
-                    x = self.active_piece.position[0] + col
-                    y = self.active_piece.position[1] + row
-                    print(f"Adding block to grid at ({x}, {y})")
-                    if 0 <= x < self.board_width and 0 <= y < self.board_height:
-                        self.grid[y][x] = self.active_piece.color
-        self.active_piece = None
-        print("Piece added to the board and active_piece set to None")
+        self.engine.add_piece_to_board()
+        self.sync()
 
     def clear_lines(self):
-        full_rows = []
-        for row in range(self.board_height):
-            if all(self.grid[row][col] is not None for col in range(self.board_width)):
-                full_rows.append(row)
-
-        for row in full_rows:
-            del self.grid[row]
-            self.grid.insert(0, [None for _ in range(self.board_width)])
-
-        self.score += len(full_rows) * 100
-        return
+        """
+        Removes full rows from the board.
+        :return: (int) The number of rows cleared.
+        """
+        cleared = self.engine.clear_lines()
+        if cleared:
+            self.sync()
+        return cleared
 
-    def reset_game(self):
+    def reset_game(self, seed=None):
         """
         Resets the game state, clearing board, level, and score. Adds initial piece and pauses the game.
+        :param seed: (int) Seed for the piece sequence, or None for a new random seed.
         :return: None.
         """
-        print("reset_game called")
-        self.grid = [[None for _ in range(self.board_width)] for _ in range(self.board_height)]
-        self.active_piece = None
-        self.score = 0
-        self.level = 1
-        self.is_paused = True
+        self.engine.reset_game(seed)
+        if tracer.game:
+            tracer.emit('game', 'reset_game', seed=self.engine.seed)
+        self.sync()
 
-        self.start_new_piece(self.get_random_piece())
-        self.update()
+    def snapshot(self):
+        """
+        Captures the engine's game state.
+        :return: (Snapshot) The snapshot.
+        """
+        return self.engine.snapshot()
 
-    def game_over(self):
-        self.reset_game()
-        return
+    def restore(self, saved):
+        """
+        Returns the engine to a saved state and repaints the board.
+        :param saved: (Snapshot) The snapshot.
+        :return: None
+        """
+        self.engine.restore(saved)
+        self.sync()
+
+    def undo(self, placements=1):
+        """
+        Rewinds placements when the engine keeps history, and repaints the board.
+        :param placements: (int) Number of placements to undo.
+        :return: (bool) True if the game was rewound.
+        """
+        if not self.engine.undo(placements):
+            return False
+        self.sync()
+        return True
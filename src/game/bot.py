@@ -0,0 +1,346 @@
+# pytetris/src/game/bot.py
+import time
+from collections import namedtuple
+
+from . import replay
+from .tetronimo import PIECE_TYPES
+
+Weights = namedtuple('Weights', ['lines', 'aggregate_height', 'holes', 'bumpiness'])
+Weights.__doc__ = """
+Heuristic weights applied to a board after a placement.  Positive weights reward, negative weights penalize.
+"""
+DEFAULT_WEIGHTS = Weights(lines=0.76, aggregate_height=-0.51, holes=-0.36, bumpiness=-0.18)
+
+Placement = namedtuple('Placement', ['rotation', 'x', 'y', 'lines', 'rows', 'score'])
+Placement.__doc__ = """
+A final resting position of a piece.
+
+Attributes:
+    rotation (int): Rotation state of the piece.
+    x (int): Column of the piece's left edge.
+    y (int): Row of the piece's top edge after dropping.
+    lines (int): Lines cleared by the placement.
+    rows (tuple): Occupancy row masks of the board after the placement and line clears.
+    score (float): Heuristic value of the placement, including any lookahead.
+"""
+
+# Rotations that turn a piece by a quarter, half and three quarter turn clockwise.
+_TURNS = ((), ('right',), ('right', 'right'), ('left',))
+_TURN_INPUTS = {'right': replay.ROTATE_RIGHT, 'left': replay.ROTATE_LEFT}
+
+
+def _distinct_rotations(states, start=0):
+    """
+    Returns the rotation states with distinct shapes, preferring the one reached from start with the fewest
+    rotations.
+    :param states: (tuple) The four PieceState entries of a piece type.
+    :param start: (int) Rotation state the piece starts in.
+    :return: (tuple) Rotation state indexes.
+    """
+    seen = {}
+    for turns in (0, 1, 3, 2):
+        rotation = (start + turns) % 4
+        seen.setdefault(states[rotation].shape, rotation)
+    return tuple(sorted(seen.values()))
+
+
+_PIECE_STATES = tuple(piece_type().states for piece_type in PIECE_TYPES)
+# Distinct rotation states of each piece type, indexed by [type, starting rotation state].
+_PIECE_ROTATIONS = tuple(tuple(_distinct_rotations(states, start) for start in range(4)) for states in _PIECE_STATES)
+
+
+class _OutOfTime(Exception):
+    """
+    Raised inside the lookahead when the decision's time budget has run out.
+    """
+
+
+def _fits(rows, masks, width, x, y, board_width, board_height):
+    """
+    Checks whether a shape given as row masks fits at a position.
+    """
+    if x < 0 or y < 0 or x + width > board_width or y + len(masks) > board_height:
+        return False
+    for row, mask in enumerate(masks):
+        if rows[y + row] & (mask << x):
+            return False
+    return True
+
+
+def _rotate(rows, states, rotation, direction, x, y, board_width, board_height):
+    """
+    Rotates a piece the way GameEngine.rotate_piece does, trying each wall kick of its state in order.
+    :return: (tuple) The new rotation state and (x, y) position, or None when every kick collides.
+    """
+    if direction == 'right':
+        target = (rotation + 1) % 4
+        kicks = states[rotation].kicks_right
+    else:
+        target = (rotation - 1) % 4
+        kicks = states[rotation].kicks_left
+    state = states[target]
+    for dx, dy in kicks:
+        if _fits(rows, state.masks, state.width, x + dx, y + dy, board_width, board_height):
+            return target, x + dx, y + dy
+    return None
+
+
+def _turn(rows, states, rotation, target, x, y, board_width, board_height):
+    """
+    Turns a piece to a rotation state through the rotations in _TURNS, following its wall kicks.
+    :return: (tuple) The (x, y) position after the last rotation, or None when a rotation is blocked.
+    """
+    for direction in _TURNS[(target - rotation) % 4]:
+        rotated = _rotate(rows, states, rotation, direction, x, y, board_width, board_height)
+        if rotated is None:
+            return None
+        rotation, x, y = rotated
+    return x, y
+
+
+class PlacementSearch:
+    """
+    Chooses piece placements by enumerating every reachable final position and scoring the resulting boards.
+
+    A placement is reachable when the piece can rotate where it is, wall kicks included, slide along the row it
+    rotated to until its column and then drop straight down.  The active piece starts from its current position,
+    which gravity may have moved below the spawn row, and lookahead pieces from their spawn position.  Boards are
+    scored with a weighted sum of cleared lines, aggregate column height, holes and bumpiness.  With a depth above
+    one, each candidate is also scored by the best placement of the following pieces from the engine's lookahead
+    queue, within a per-decision time budget that is checked at every level of the lookahead; candidates the
+    budget does not reach keep their one-piece score.  Board evaluations and lookahead results are cached by board
+    state so repeated positions are not evaluated again.
+
+    Attributes:
+        weights (Weights): Heuristic weights.
+        depth (int): Number of pieces searched, the current piece included.
+        time_budget (float): Seconds allowed per decision for the lookahead.
+        max_cache_entries (int): Cache size at which the caches are cleared.
+        cache_hits (int): Number of evaluations answered from the cache.
+    """
+
+    def __init__(self, weights=DEFAULT_WEIGHTS, depth=2, time_budget=0.05, max_cache_entries=200000):
+        self.weights = weights
+        self.depth = depth
+        self.time_budget = time_budget
+        self.max_cache_entries = max_cache_entries
+        self.cache_hits = 0
+        self._evaluations = {}
+        self._searches = {}
+
+    def clear_cache(self):
+        """
+        Discards every cached evaluation.
+        :return: None
+        """
+        self._evaluations.clear()
+        self._searches.clear()
+
+    def evaluate(self, rows, board_width, board_height):
+        """
+        Scores a board without its line clear bonus.
+        :param rows: (tuple) Occupancy row masks, top row first.
+        :param board_width: (int) Width of the board in cells.
+        :param board_height: (int) Height of the board in cells.
+        :return: (float) The weighted aggregate height, holes and bumpiness.
+        """
+        score = self._evaluations.get(rows)
+        if score is not None:
+            self.cache_hits += 1
+            return score
+        heights = [0] * board_width
+        seen = 0
+        holes = 0
+        for index, row in enumerate(rows):
+            holes += (seen & ~row).bit_count()
+            new = row & ~seen
+            if new:
+                seen |= new
+                height = board_height - index
+                while new:
+                    bit = new & -new
+                    heights[bit.bit_length() - 1] = height
+                    new ^= bit
+        bumpiness = 0
+        for col in range(board_width - 1):
+            bumpiness += abs(heights[col] - heights[col + 1])
+        weights = self.weights
+        score = weights.aggregate_height * sum(heights) + weights.holes * holes + weights.bumpiness * bumpiness
+        if len(self._evaluations) >= self.max_cache_entries:
+            self._evaluations.clear()
+        self._evaluations[rows] = score
+        return score
+
+    def placements(self, rows, piece_index, board_width, board_height, start=None):
+        """
+        Enumerates every reachable final placement of a piece.
+        :param rows: (tuple) Occupancy row masks, top row first.
+        :param piece_index: (int) Index of the piece type in PIECE_TYPES.
+        :param board_width: (int) Width of the board in cells.
+        :param board_height: (int) Height of the board in cells.
+        :param start: (tuple) Rotation state, x and y the piece starts from, or None for its spawn position.
+        :return: (list) Placement entries scored with the one-piece heuristic.
+        """
+        states = _PIECE_STATES[piece_index]
+        if start is None:
+            start = (0, (board_width - states[0].width) // 2, 0)
+        start_rotation, piece_x, piece_y = start
+        state = states[start_rotation]
+        if not _fits(rows, state.masks, state.width, piece_x, piece_y, board_width, board_height):
+            return []
+        full_row = (1 << board_width) - 1
+        weights = self.weights
+        result = []
+        for rotation in _PIECE_ROTATIONS[piece_index][start_rotation]:
+            turned = _turn(rows, states, start_rotation, rotation, piece_x, piece_y, board_width, board_height)
+            if turned is None:
+                continue
+            start_x, start_y = turned
+            state = states[rotation]
+            masks = state.masks
+            width = state.width
+            for direction in (-1, 1):
+                x = start_x if direction == -1 else start_x + 1
+                while _fits(rows, masks, width, x, start_y, board_width, board_height):
+                    y = start_y
+                    while _fits(rows, masks, width, x, y + 1, board_width, board_height):
+                        y += 1
+                    placed = list(rows)
+                    for offset, mask in enumerate(masks):
+                        placed[y + offset] |= mask << x
+                    lines = 0
+                    for offset in range(len(masks)):
+                        if placed[y + offset] == full_row:
+                            lines += 1
+                    if lines:
+                        kept = [row for row in placed if row != full_row]
+                        placed = [0] * lines + kept
+                    placed = tuple(placed)
+                    score = weights.lines * lines + self.evaluate(placed, board_width, board_height)
+                    result.append(Placement(rotation, x, y, lines, placed, score))
+                    x += direction
+        return result
+
+    def _lookahead(self, rows, pieces, board_width, board_height, deadline):
+        """
+        Returns the best score reachable by placing each of the given pieces in turn.
+        :param rows: (tuple) Occupancy row masks, top row first.
+        :param pieces: (tuple) Upcoming piece type indexes.
+        :param deadline: (float) perf_counter time the search must stop by.
+        :return: (float) The best score, or -inf when the first piece cannot be placed.
+        :raises _OutOfTime: When the deadline passed before the search finished.  Nothing unfinished is cached.
+        """
+        key = (rows, pieces)
+        score = self._searches.get(key)
+        if score is not None:
+            self.cache_hits += 1
+            return score
+        if time.perf_counter() > deadline:
+            raise _OutOfTime()
+        candidates = self.placements(rows, pieces[0], board_width, board_height)
+        if not candidates:
+            score = float('-inf')
+        elif len(pieces) == 1:
+            score = max(candidate.score for candidate in candidates)
+        else:
+            score = max(candidate.score - self.evaluate(candidate.rows, board_width, board_height)
+                        + self._lookahead(candidate.rows, pieces[1:], board_width, board_height, deadline)
+                        for candidate in candidates)
+        if len(self._searches) >= self.max_cache_entries:
+            self._searches.clear()
+        self._searches[key] = score
+        return score
+
+    def best_placement(self, rows, piece_index, upcoming, board_width, board_height, start=None):
+        """
+        Chooses the best placement for a piece.
+        :param rows: (tuple) Occupancy row masks, top row first.
+        :param piece_index: (int) Index of the piece type to place.
+        :param upcoming: (tuple) Indexes of the following pieces, used for lookahead up to depth - 1 of them.
+        :param board_width: (int) Width of the board in cells.
+        :param board_height: (int) Height of the board in cells.
+        :param start: (tuple) Rotation state, x and y the piece starts from, or None for its spawn position.
+        :return: (Placement) The best placement, or None when the piece cannot be placed anywhere.
+        """
+        candidates = self.placements(rows, piece_index, board_width, board_height, start)
+        if not candidates:
+            return None
+        lookahead = tuple(upcoming[:self.depth - 1])
+        if lookahead:
+            deadline = time.perf_counter() + self.time_budget
+            candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+            for index, candidate in enumerate(candidates):
+                line_bonus = self.weights.lines * candidate.lines
+                try:
+                    score = self._lookahead(candidate.rows, lookahead, board_width, board_height, deadline)
+                except _OutOfTime:
+                    break
+                candidates[index] = candidate._replace(score=line_bonus + score)
+        return max(candidates, key=lambda candidate: candidate.score)
+
+    def choose(self, engine):
+        """
+        Chooses the best placement for the engine's active piece.
+        :param engine: (GameEngine) The engine.
+        :return: (Placement) The best placement, or None when there is no active piece or no placement.
+        """
+        piece = engine.active_piece
+        if piece is None:
+            return None
+        piece_index = PIECE_TYPES.index(type(piece))
+        upcoming = tuple(engine.pieces.peek(self.depth - 1))
+        return self.best_placement(tuple(engine.rows), piece_index, upcoming, engine.board_width,
+                                   engine.board_height, (piece.rotation_state,) + piece.position)
+
+
+def placement_inputs(engine, placement):
+    """
+    Returns the replay input codes that move the engine's freshly spawned active piece into a placement and lock it.
+    :param engine: (GameEngine) The engine.
+    :param placement: (Placement) The target placement.
+    :return: (list) Replay input codes.
+    """
+    piece = engine.active_piece
+    turns = _TURNS[(placement.rotation - piece.rotation_state) % 4]
+    inputs = [_TURN_INPUTS[direction] for direction in turns]
+    x, y = piece.position
+    turned = _turn(engine.rows, piece.states, piece.rotation_state, placement.rotation, x, y, engine.board_width,
+                   engine.board_height)
+    if turned is not None:
+        x = turned[0]
+    shift = placement.x - x
+    inputs.extend([replay.RIGHT if shift > 0 else replay.LEFT] * abs(shift))
+    inputs.append(replay.HARD_DROP)
+    return inputs
+
+
+def play_piece(engine, search):
+    """
+    Places the engine's active piece where the search chooses, through the same inputs a player would use.
+    :param engine: (GameEngine) The engine.
+    :param search: (PlacementSearch) The placement search.
+    :return: (list) The replay input codes applied, empty when no placement was possible.
+    """
+    placement = search.choose(engine)
+    if placement is None:
+        return []
+    inputs = placement_inputs(engine, placement)
+    for code in inputs:
+        replay.apply_input(engine, code)
+    return inputs
+
+
+def play_game(engine, search, max_pieces=None):
+    """
+    Plays the engine's current game with the bot until top-out or a piece limit.
+    :param engine: (GameEngine) A reset engine.
+    :param search: (PlacementSearch) The placement search.
+    :param max_pieces: (int) Maximum number of pieces to place, or None for no limit.
+    :return: (int) The number of pieces placed.
+    """
+    placed = 0
+    while not engine.is_game_over and (max_pieces is None or placed < max_pieces):
+        if not play_piece(engine, search):
+            break
+        placed += 1
+    return placed
@@ -0,0 +1,156 @@
+# pytetris/src/game/clock.py
+import time
+from collections import deque
+
+LOGIC_RATE = 60  # Logic ticks per second
+MAX_GRAVITY = 20  # Cells per tick at the top speed, enough to drop a piece across a standard board instantly (20G)
+
+
+def _build_gravity_table(levels=20):
+    """
+    Precomputes the gravity of each level in cells per 60 Hz tick, following the guideline speed curve in which a
+    row takes (0.8 - (level - 1) * 0.007) ** (level - 1) seconds.  The last level is instant drop.
+    :param levels: (int) Number of levels in the table.
+    :return: (tuple) Gravity of levels 1 to levels, in cells per tick.
+    """
+    table = []
+    for level in range(1, levels):
+        seconds_per_row = (0.8 - (level - 1) * 0.007) ** (level - 1)
+        table.append(min(1 / (seconds_per_row * LOGIC_RATE), MAX_GRAVITY))
+    table.append(MAX_GRAVITY)
+    return tuple(table)
+
+
+GRAVITY_TABLE = _build_gravity_table()
+
+
+def gravity_for_level(level, step=1 / LOGIC_RATE):
+    """
+    Returns the gravity of a level in cells per logic tick.  Levels past the end of the table stay at 20G.
+    :param level: (int) The level, at least 1.
+    :param step: (float) Length of a logic tick in seconds, when it differs from the table's 1 / LOGIC_RATE.
+    :return: (float) Cells fallen per tick.
+    """
+    gravity = GRAVITY_TABLE[min(max(level, 1), len(GRAVITY_TABLE)) - 1]
+    if gravity == MAX_GRAVITY:
+        return gravity
+    return min(gravity * step * LOGIC_RATE, MAX_GRAVITY)
+
+
+class GameClock:
+    """
+    A fixed timestep clock that turns irregular wakeups from a UI timer into whole logic ticks.
+
+    The driver calls advance() whenever it wakes; the wall time since the previous call, measured with
+    time.perf_counter, is added to an accumulator and every whole step in it becomes one logic tick.  The remainder
+    carries over, so ticks neither drift nor double up however late the driver wakes.  Each tick adds the gravity,
+    in cells per tick, to a second accumulator that tick() drains in whole cells, several at once at high levels.
+    Pausing keeps both remainders and resuming restarts the measurement, so the paused time is never turned into
+    ticks.
+
+    Attributes:
+        step (float): Length of a logic tick in seconds.
+        gravity (float): Cells the active piece falls per logic tick.
+        max_catch_up (int): Most ticks run by one advance(); time beyond that is dropped rather than replayed, so
+            a long stall does not freeze the UI while logic catches up.
+        ticks (int): Logic ticks run since the clock was reset.
+        dropped_ticks (int): Ticks discarded by the catch-up limit.
+        is_running (bool): Whether the clock is measuring time.
+    """
+
+    def __init__(self, step=1 / LOGIC_RATE, gravity=0.0, max_catch_up=10, jitter_samples=600,
+                 time_source=time.perf_counter):
+        self.step = step
+        self.gravity = gravity
+        self.max_catch_up = max_catch_up
+        self.time_source = time_source
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.is_running = False
+        self._last = None
+        self._accumulator = 0.0
+        self._gravity_accumulator = 0.0
+        self._deviations = deque(maxlen=jitter_samples)
+
+    def reset(self):
+        """
+        Stops the clock and clears the tick count, accumulators and jitter samples.
+        :return: None
+        """
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.is_running = False
+        self._last = None
+        self._accumulator = 0.0
+        self._gravity_accumulator = 0.0
+        self._deviations.clear()
+
+    def start(self):
+        """
+        Starts or resumes measuring time from now.  Accumulated fractions of a tick and of a cell are kept.
+        :return: None
+        """
+        self._last = self.time_source()
+        self.is_running = True
+
+    def pause(self):
+        """
+        Stops measuring time.  Time up to now is credited first, so ticks already due are not lost.
+        :return: (int) Logic ticks that became due before the pause.
+        """
+        due = self.advance()
+        self.is_running = False
+        self._last = None
+        return due
+
+    def advance(self, now=None):
+        """
+        Credits the wall time since the previous call and returns how many logic ticks are now due.
+        :param now: (float) The current time from time_source, or None to read it.
+        :return: (int) The number of ticks to run.
+        """
+        if not self.is_running:
+            return 0
+        if now is None:
+            now = self.time_source()
+        elapsed = now - self._last
+        self._last = now
+        self._deviations.append(elapsed - self.step)
+        self._accumulator += elapsed
+        due = int(self._accumulator / self.step)
+        self._accumulator -= due * self.step
+        if due > self.max_catch_up:
+            self.dropped_ticks += due - self.max_catch_up
+            due = self.max_catch_up
+        self.ticks += due
+        return due
+
+    def tick(self):
+        """
+        Applies one logic tick of gravity.
+        :return: (int) Whole cells the active piece should fall this tick.
+        """
+        self._gravity_accumulator += self.gravity
+        cells = int(self._gravity_accumulator)
+        self._gravity_accumulator -= cells
+        return cells
+
+    @property
+    def elapsed(self):
+        """
+        Returns the game time in seconds, counted in logic ticks, so it excludes pauses.
+        """
+        return self.ticks * self.step
+
+    def jitter(self):
+        """
+        Summarizes how far the driver's wakeup intervals deviated from the logic step over the recent samples.  Safe
+        to call from another thread than the one advancing the clock.
+        :return: (dict) Sample count, mean absolute, p99 absolute and maximum absolute deviation in seconds.
+        """
+        samples = sorted(map(abs, tuple(self._deviations)))
+        count = len(samples)
+        if count == 0:
+            return {'count': 0, 'mean': 0.0, 'p99': 0.0, 'max': 0.0}
+        return {'count': count, 'mean': sum(samples) / count, 'p99': samples[min(count - 1, int(count * 0.99))],
+                'max': samples[-1]}
@@ -0,0 +1,548 @@
+# pytetris/src/game/engine.py
+import random
+
+from src.tracing import tracer
+from .bitboard import column_heights, full_row_mask, shape_masks
+from . import snapshot
+from .events import GAME_OVER, LEVEL, LINES, SCORE, Change
+from .history import DEPTH, History
+from .pieces import BAG, PieceSource
+from .rowring import RowRing
+from .tetronimo import *
+
+LINES_PER_LEVEL = 10
+LIST_ROWS = 'list'  # Rows in plain lists, the default, as they are the fastest to index
+RING_ROWS = 'ring'  # Rows in RowRings, whose line clears move fewer rows; compare with the huge_* benchmarks
+SEED_MODULUS = 1 << 64  # Seeds are kept in 64 bits, as snapshots and replays store them
+
+
+class GameEngine:
+    """
+    Headless Tetris game state and rules.
+
+    Owns the grid, the active piece and scoring, and implements movement, rotation, collision and line clearing
+    without any dependency on Qt, so games can be stepped in plain Python.  Movement methods return whether the
+    visible state changed so that a view only needs to repaint when something actually happened.  Changes of the
+    score, lines, level and game over state are also sent as Change entries to the registered listeners.
+
+    Attributes:
+        board_width (int): Width of game board in cells.
+        board_height (int): Height of game board in cells.
+        grid (list):  A list of row tuples of locked cell colors, None for empty cells.  Rows are immutable and
+            replaced when they change, so copies of the list share unchanged rows.  The active piece is never
+            written here.  A RowRing instead of a list with RING_ROWS storage.
+        rows (list): Occupancy of each grid row as an int bitmask, bit x set when column x is occupied.  A RowRing
+            instead of a list with RING_ROWS storage.
+        row_storage (str): LIST_ROWS or RING_ROWS.
+        heights (list): Height of each column's highest locked cell above the floor, kept up to date as pieces lock
+            and lines clear.
+        active_piece (Tetronimo): The current piece in play.
+        score (int): Player score for current game.
+        lines_cleared (int): Lines cleared in the current game.
+        level (int): Current level, rising by one every LINES_PER_LEVEL lines.
+        is_paused (bool): Whether the game is paused.
+        is_game_over (bool): Set when a new piece cannot be placed.
+        seed (int): Seed of the current game's piece sequence, from 0 to SEED_MODULUS - 1.
+        pieces (PieceSource): The seeded piece sequence, with lookahead for previews and search.
+        piece_count (int): Number of pieces spawned in the current game.
+        stack_version (int): Incremented whenever locked cells change, so views can cache the locked stack.
+        listeners (list): Callables receiving a Change whenever the score, lines, level or game over state change.
+        history (History): Checkpoints for undoing placements, or None when undo is not enabled.
+    """
+
+    def __init__(self, board_width=10, board_height=20, piece_mode=BAG, row_storage=LIST_ROWS):
+        if row_storage not in (LIST_ROWS, RING_ROWS):
+            raise ValueError(f"Unknown row storage: {row_storage}")
+        self.board_width = board_width
+        self.board_height = board_height
+        self.row_storage = row_storage
+        self.full_row = full_row_mask(board_width)
+        self.empty_row = (None,) * board_width
+        self.set_rows([self.empty_row] * board_height, [0] * board_height)
+        self.heights = [0] * board_width
+        self.active_piece = None
+        self.score = 0
+        self.lines_cleared = 0
+        self.level = 0
+        self.is_paused = False
+        self.is_game_over = False
+        self.stack_version = 0
+        self.seed = None
+        self.pieces = PieceSource(piece_mode)
+        self.piece_count = 0
+        self.listeners = []
+        self.history = None
+
+    def add_listener(self, listener):
+        """
+        Registers a callable to receive a Change whenever the score, lines, level or game over state change.
+        :param listener: Callable taking a Change.
+        :return: None
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregisters a listener added with add_listener().
+        :param listener: The listener.
+        :return: None
+        """
+        self.listeners.remove(listener)
+
+    def notify(self, kind, value):
+        """
+        Sends a change to every listener.
+        :param kind: (str) SCORE, LINES, LEVEL or GAME_OVER.
+        :param value: The new value.
+        :return: None
+        """
+        change = Change(kind, value)
+        for listener in self.listeners:
+            listener(change)
+
+    def get_active_piece_coordinates(self):
+        """
+        Returns a list of grid coordinates occupied by the current active piece.
+        :return: List of (x, y) coordinates occupied by the active piece.
+        """
+        if self.active_piece is None:
+            return []
+        x, y = self.active_piece.position
+        return [(x + dx, y + dy) for dx, dy in self.active_piece.state.cells]
+
+    def print_grid(self):
+        """
+        Prints the current state of the grid for debugging.
+        """
+        print("Current grid state:")
+        for row in range(self.board_height):
+            print([self.grid[row][col] if self.grid[row][col] is not None else "empty" for col in
+                   range(self.board_width)])
+
+    def get_random_piece(self):
+        """
+        Takes the next Tetronimo piece from the engine's seeded piece source.
+        :return: A random Tetronimo object.
+        """
+        return PIECE_TYPES[self.pieces.next()]()
+
+    def next_pieces(self, count):
+        """
+        Returns the types of the upcoming pieces without consuming them.
+        :param count: (int) Number of upcoming pieces.
+        :return: Iterator over Tetronimo subclasses.
+        """
+        return (PIECE_TYPES[index] for index in self.pieces.peek(count))
+
+    def start_new_piece(self, tetronimo):
+        """
+        Makes the given piece the active piece at the starting position.
+        :param tetronimo: (Tetronimo) The game piece to be added at the starting position.
+        :return: None
+        """
+        x_position = (self.board_width - tetronimo.state.width) // 2
+        tetronimo.position = (x_position, 0)  # Starts at top center of board.
+        self.active_piece = tetronimo
+        self.piece_count += 1
+
+    def move_piece(self, direction):
+        """
+        Moves the active piece in the specified direction.
+        :param direction: (str) The direction to move: 'left', 'right', or 'down'.
+        :return: True if the board changed, False otherwise.
+        """
+        piece = self.active_piece
+        if piece is None:
+            return False
+        x, y = piece.position
+        if direction == 'left':
+            x -= 1
+        elif direction == 'right':
+            x += 1
+        elif direction == 'down':
+            return self.move_piece_down()
+        else:
+            return False  # Whatever was passed, it wasn't a valid direction.
+
+        state = piece.state
+        if self.collides(state.masks, state.width, x, y):
+            return False
+        piece.position = (x, y)
+        return True
+
+    def move_piece_down(self):
+        """
+        Moves the active piece down one cell.  If a collision is detected, the piece is placed at that point.
+        :return: True if the board changed, False otherwise.
+        """
+        piece = self.active_piece
+        if piece is None:
+            return False
+        x, y = piece.position
+        state = piece.state
+        # Check for collision at new position
+        if not self.collides(state.masks, state.width, x, y + 1):
+            piece.position = (x, y + 1)
+        else:
+            self.lock_piece()
+        return True
+
+    def fall(self, cells):
+        """
+        Applies several cells of gravity in one sweep.  The result is the same as calling move_piece_down() until
+        either the cells are used up or the piece locks, but the landing row is found once instead of testing every
+        row on the way down.
+        :param cells: (int) Cells of gravity to apply.
+        :return: (int) The number of move_piece_down() calls this was equivalent to, 0 when nothing changed.
+        """
+        piece = self.active_piece
+        if piece is None or cells <= 0:
+            return 0
+        x, y = piece.position
+        distance = self.drop_distance()
+        if cells <= distance:
+            piece.position = (x, y + cells)
+            return cells
+        piece.position = (x, y + distance)
+        self.lock_piece()
+        return distance + 1
+
+    def drop_distance(self):
+        """
+        Returns how many rows the active piece can fall before it lands.  Uses the column heights, so it costs one
+        step per column of the piece unless the piece is tucked under an overhang.
+        :return: (int) The number of free rows below the piece.
+        """
+        piece = self.active_piece
+        if piece is None:
+            return 0
+        x, y = piece.position
+        state = piece.state
+        heights = self.heights
+        limit = self.board_height - 1
+        landing = limit
+        for col, bottom in enumerate(state.bottoms):
+            candidate = limit - heights[x + col] - bottom
+            if candidate < landing:
+                landing = candidate
+        if landing >= y:
+            return landing - y
+        # Part of the piece is below a column's highest cell, so step down through the occupancy layer instead.
+        distance = 0
+        while not self.collides(state.masks, state.width, x, y + distance + 1):
+            distance += 1
+        return distance
+
+    def ghost_position(self):
+        """
+        Returns where the active piece would land if hard dropped.
+        :return: (tuple) The landing (x, y), or None when there is no active piece.
+        """
+        if self.active_piece is None:
+            return None
+        x, y = self.active_piece.position
+        return x, y + self.drop_distance()
+
+    def hard_drop(self):
+        """
+        Drops the active piece straight to its landing row and locks it.
+        :return: True if the board changed, False otherwise.
+        """
+        piece = self.active_piece
+        if piece is None:
+            return False
+        x, y = piece.position
+        piece.position = (x, y + self.drop_distance())
+        self.lock_piece()
+        return True
+
+    def lock_piece(self):
+        """
+        Locks the active piece in place, clears any full lines and spawns the next piece.
+        :return: None.
+        """
+        if self.history is not None:
+            self.history.lock(self)
+        self.clear_lines(self.add_piece_to_board())
+        if tracer.lock:
+            tracer.emit('lock', 'grid', rows=list(self.rows))
+        new_piece = self.get_random_piece()
+        self.start_new_piece(new_piece)
+        state = new_piece.state
+        if self.collides(state.masks, state.width, new_piece.position[0], new_piece.position[1]):
+            if tracer.lock:
+                tracer.emit('lock', 'game_over', piece=new_piece.color, score=self.score)
+            self.game_over()
+            return
+        if self.history is not None:
+            self.history.record(self)
+        if tracer.lock:
+            tracer.emit('lock', 'spawn', piece=new_piece.color, position=new_piece.position)
+
+    def rotate_piece(self, direction='right'):
+        """
+        Rotates the active piece in the indicated direction, trying each of the state's wall kicks in order.
+        :param direction: (str) The direction to rotate the piece in.
+        :return: True if the piece rotated, False otherwise.
+        """
+        piece = self.active_piece
+        if piece is None:
+            return False
+        if direction == 'right':
+            target = (piece.rotation_state + 1) % 4
+            kicks = piece.state.kicks_right
+        elif direction == 'left':
+            target = (piece.rotation_state - 1) % 4
+            kicks = piece.state.kicks_left
+        else:
+            return False
+
+        new_state = piece.states[target]
+        masks = new_state.masks
+        width = new_state.width
+        x, y = piece.position
+        for dx, dy in kicks:
+            if not self.collides(masks, width, x + dx, y + dy):
+                piece.rotation_state = target
+                piece.position = (x + dx, y + dy)
+                return True
+        return False
+
+    def check_collision(self, shape, position):
+        """
+        Checks for collision between a shape and locked pieces or board edges.
+        :param shape: Shape of the piece to test.
+        :param position: The top left position (x, y) to check the shape at.
+        :return: True if collision detected, False otherwise.
+        """
+        masks, width = shape_masks(shape)
+        return self.collides(masks, width, position[0], position[1])
+
+    def collides(self, masks, width, x, y):
+        """
+        Checks a shape given as row masks against the board edges and the occupancy layer.
+        :param masks: (tuple) Row masks of the shape relative to its left edge.
+        :param width: (int) Width of the shape in cells.
+        :param x: (int) Column of the shape's left edge.
+        :param y: (int) Row of the shape's top edge.
+        :return: True if collision detected, False otherwise.
+        """
+        if x < 0 or y < 0 or x + width > self.board_width or y + len(masks) > self.board_height:
+            if tracer.collision:
+                tracer.emit('collision', 'boundary', x=x, y=y)
+            return True
+        rows = self.rows
+        for row, mask in enumerate(masks):
+            if rows[y + row] & (mask << x):
+                if tracer.collision:
+                    tracer.emit('collision', 'piece', x=x, y=y)
+                return True
+        return False
+
+    def add_piece_to_board(self):
+        """
+        Adds the current piece to the board when it collides.
+        :return: (list) The rows the piece was written to, top first.
+        """
+        piece = self.active_piece
+        cells = self.get_active_piece_coordinates()
+        if tracer.lock:
+            tracer.emit('lock', 'add_piece', piece=piece.color, cells=cells)
+        heights = self.heights
+        changed = {}
+        for x, y in cells:
+            if 0 <= x < self.board_width and 0 <= y < self.board_height:
+                row = changed.get(y)
+                if row is None:
+                    row = changed[y] = list(self.grid[y])
+                row[x] = piece.color
+                self.rows[y] |= 1 << x
+                if self.board_height - y > heights[x]:
+                    heights[x] = self.board_height - y
+        # Replace only the rows the piece touched, leaving the others shared with any saved copies of the grid.
+        for y, row in changed.items():
+            self.grid[y] = tuple(row)
+        self.stack_version += 1
+        self.active_piece = None
+        return sorted(changed)
+
+    def clear_lines(self, candidates=None):
+        """
+        Removes full rows, shifting the rows above down, and scores 100 points per row.  The remaining rows are
+        reused as they are, so only the shared empty row fills the top.
+        :param candidates: (list) The only rows that can be full, in ascending order, such as the rows a piece was
+            just locked into, or None to check every row.
+        :return: (int) The number of rows cleared.
+        """
+        full_row = self.full_row
+        rows = self.rows
+        if candidates is None:
+            candidates = range(self.board_height)
+        full_rows = [row for row in candidates if rows[row] == full_row]
+        if not full_rows:
+            return 0
+
+        cleared = len(full_rows)
+        if self.row_storage == RING_ROWS:
+            top = self.board_height - max(self.heights)
+            self.grid.remove(full_rows, self.empty_row, top)
+            rows.remove(full_rows, 0, top)
+        else:
+            grid = self.grid
+            for row in reversed(full_rows):
+                del grid[row]
+                del rows[row]
+            grid[:0] = [self.empty_row] * cleared
+            rows[:0] = [0] * cleared
+        self.stack_version += 1
+        self._lower_heights(full_rows)
+        self.score += cleared * 100
+        self.lines_cleared += cleared
+        level = max(self.level, 1 + self.lines_cleared // LINES_PER_LEVEL)
+        level_changed = level != self.level
+        self.level = level
+        if self.listeners:
+            self.notify(SCORE, self.score)
+            self.notify(LINES, self.lines_cleared)
+            if level_changed:
+                self.notify(LEVEL, level)
+        return cleared
+
+    def _lower_heights(self, full_rows):
+        """
+        Updates the column heights after full rows were removed.  A column only needs to be searched when its
+        highest cell was in a removed row; otherwise it simply drops by the number of removed rows.
+        :param full_rows: (list) Indexes the removed rows had before removal.
+        :return: None
+        """
+        cleared = len(full_rows)
+        board_height = self.board_height
+        rows = self.rows
+        removed = set(full_rows)
+        for col, height in enumerate(self.heights):
+            if height == 0:
+                continue
+            if board_height - height not in removed:
+                self.heights[col] = height - cleared
+                continue
+            bit = 1 << col
+            new_height = 0
+            for row in range(board_height - height + cleared, board_height):
+                if rows[row] & bit:
+                    new_height = board_height - row
+                    break
+            self.heights[col] = new_height
+
+    def set_rows(self, grid, rows):
+        """
+        Replaces the locked cells wholesale, stored as the engine's row storage.  The caller updates the column
+        heights.
+        :param grid: Row tuples of cell colors, top row first.
+        :param rows: Occupancy masks of the same rows.
+        :return: None
+        """
+        if self.row_storage == RING_ROWS:
+            self.grid = RowRing(grid)
+            self.rows = RowRing(rows)
+        else:
+            self.grid = list(grid)
+            self.rows = list(rows)
+
+    def rebuild_heights(self):
+        """
+        Recomputes every column height from the occupancy layer, for use after the rows were replaced wholesale.
+        :return: None
+        """
+        self.heights = column_heights(self.rows, self.board_width, self.board_height)
+
+    def snapshot(self):
+        """
+        Captures the game state: locked cells, active piece, score, lines, level and the piece sequence.
+        :return: (Snapshot) An immutable, hashable snapshot for restore().
+        """
+        return snapshot.take(self)
+
+    def restore(self, saved):
+        """
+        Returns the game to a state captured by snapshot().
+        :param saved: (Snapshot) The snapshot.
+        :return: None
+        """
+        snapshot.restore(self, saved)
+        if self.history is not None:
+            # Checkpoints only hold the placements between them, which no longer lead to the restored board.
+            self.history.clear()
+            if self.active_piece is not None and not self.is_game_over:
+                self.history.record(self)
+        if self.listeners:
+            self.notify(SCORE, self.score)
+            self.notify(LINES, self.lines_cleared)
+            self.notify(LEVEL, self.level)
+            self.notify(GAME_OVER, self.is_game_over)
+
+    def enable_history(self, depth=DEPTH):
+        """
+        Starts keeping a checkpoint at every spawn so placements can be undone.
+        :param depth: (int) Most placements that can be undone, or None for no limit.
+        :return: None
+        """
+        self.history = History(depth)
+        if self.active_piece is not None and not self.is_game_over:
+            self.history.record(self)
+
+    def undo(self, placements=1):
+        """
+        Rewinds the game to the spawn of the piece placed the given number of placements ago, or to the current
+        piece's spawn point when placements is 0.
+        :param placements: (int) Number of placements to undo.
+        :return: (bool) True if the game was rewound, False when history is disabled or too short.
+        """
+        if self.history is None or not self.history.rewind(self, placements):
+            return False
+        if self.listeners:
+            self.notify(SCORE, self.score)
+            self.notify(LINES, self.lines_cleared)
+            self.notify(LEVEL, self.level)
+            self.notify(GAME_OVER, False)
+        return True
+
+    def reset_game(self, seed=None):
+        """
+        Resets the game state, clearing board, level, and score. Adds initial piece and pauses the game.
+        :param seed: (int) Seed for the piece sequence, taken modulo SEED_MODULUS.  A new seed is drawn when None, and
+            kept in self.seed so the game can be reproduced.
+        :return: None.
+        """
+        self.seed = random.getrandbits(63) if seed is None else seed % SEED_MODULUS
+        self.pieces.seed(self.seed)
+        self.piece_count = 0
+        self.set_rows([self.empty_row] * self.board_height, [0] * self.board_height)
+        self.heights = [0] * self.board_width
+        self.active_piece = None
+        self.score = 0
+        self.lines_cleared = 0
+        self.level = 1
+        self.is_paused = True
+        self.is_game_over = False
+        self.stack_version += 1
+        if self.listeners:
+            self.notify(SCORE, 0)
+            self.notify(LINES, 0)
+            self.notify(LEVEL, 1)
+            self.notify(GAME_OVER, False)
+
+        self.start_new_piece(self.get_random_piece())
+        if self.history is not None:
+            self.history.clear()
+            self.history.record(self)
+
+    def game_over(self):
+        """
+        Ends the current game.  The blocked spawn piece is discarded and the game stays over until reset.
+        :return: None.
+        """
+        self.active_piece = None
+        self.is_paused = True
+        self.is_game_over = True
+        if self.listeners:
+            self.notify(GAME_OVER, True)
@@ -0,0 +1,189 @@
+# pytetris/src/game/env.py
+# Reinforcement-learning environments over the NumPy batch engine.
+#
+# Observations are views of the BatchEngine's own arrays, not copies: the board is a slice of its uint8 boards array
+# and the piece a row of its pieces array, so taking an observation costs nothing and it always shows the current
+# state.  Copy an observation to keep it past the next step or reset.
+#
+# Actions are integers.  NOOP, LEFT, RIGHT, ROTATE_RIGHT, ROTATE_LEFT, DOWN and DROP are single inputs followed by a
+# row of gravity, as in BatchEngine.step.  Actions from PLACE on place the active piece directly: action
+# PLACE + rotation * board_width + x rotates the piece to that state, moves its left edge to column x and hard drops
+# it, see placement_action().  The reward of a step is the number of lines it cleared.
+from collections import namedtuple
+
+import numpy as np
+
+from .batch import BatchEngine
+from .pieces import BAG
+from .batch import NOOP, LEFT, RIGHT, ROTATE_RIGHT, ROTATE_LEFT, DOWN, DROP  # The input actions
+
+PLACE = DROP + 1  # First placement action
+
+Observation = namedtuple('Observation', ['board', 'piece'])
+Observation.__doc__ = """
+What an agent sees of a game, as views of the batch engine's arrays.  For a VectorEnv each field has a leading
+axis of one entry per environment.
+
+Attributes:
+    board (ndarray): (board_height, board_width) uint8 locked cells, 0 empty, otherwise piece type index + 1.
+    piece (ndarray): (4,) int64 active piece as (type index, rotation state, column, row).
+"""
+
+
+def _apply_actions(batch, actions, mask=None):
+    """
+    Applies one action to each selected board.
+    :param batch: (BatchEngine) The boards.
+    :param actions: (ndarray) Action per board, an input code below PLACE or a placement action.
+    :param mask: (ndarray) Boolean mask of boards to act on.  None acts on every board.
+    :return: (ndarray) Lines cleared on each board.
+    """
+    actions = np.asarray(actions, dtype=np.int64)
+    if ((actions < 0) | (actions >= PLACE + 4 * batch.board_width)).any():
+        raise ValueError(f"Action out of range: {actions}")
+    selected = np.ones(batch.num_boards, dtype=bool) if mask is None else mask
+    placing = actions >= PLACE
+    cleared = np.zeros(batch.num_boards, dtype=np.int64)
+    if (selected & ~placing).any():
+        cleared += batch.step(actions, selected & ~placing)
+    if (selected & placing).any():
+        placement = actions - PLACE
+        cleared += batch.place(placement // batch.board_width, placement % batch.board_width, selected & placing)
+    return cleared
+
+
+class TetrisEnv:
+    """
+    A single game with reset(), step() and step_batch(), backed by a one-board BatchEngine.
+
+    A finished game stays finished, ignoring further actions, until reset() is called.
+
+    Attributes:
+        batch (BatchEngine): The game's engine.
+        board_width (int): Width of the board in cells.
+        board_height (int): Height of the board in cells.
+        num_actions (int): Number of distinct actions: the inputs below PLACE and four rotations for every column.
+        observation (Observation): Views of the board and active piece.
+    """
+
+    def __init__(self, board_width=10, board_height=20, seed=0, piece_mode=BAG):
+        self.batch = BatchEngine(1, board_width, board_height, seed, piece_mode)
+        self.board_width = board_width
+        self.board_height = board_height
+        self.num_actions = PLACE + 4 * board_width
+        self.observation = Observation(self.batch.boards[0], self.batch.pieces[0])
+
+    def placement_action(self, rotation, x):
+        """
+        Returns the action that places the active piece at a rotation state and column.
+        :param rotation: (int) Rotation state.
+        :param x: (int) Column of the piece's left edge.
+        :return: (int) The action.
+        """
+        return PLACE + rotation * self.board_width + x
+
+    def info(self):
+        """
+        :return: (dict) The game's score and lines cleared.
+        """
+        return {'score': int(self.batch.score[0]), 'lines_cleared': int(self.batch.lines_cleared[0])}
+
+    def reset(self, seed=None):
+        """
+        Starts a new game.
+        :param seed: (int) Seed of the piece sequence, or None to continue the current random stream.
+        :return: (Observation) The first observation.
+        """
+        self.batch.reset(seed)
+        return self.observation
+
+    def step(self, action):
+        """
+        Applies one action.
+        :param action: (int) The action.
+        :return: (tuple) The observation, the reward, whether the game is over and info().
+        """
+        cleared = _apply_actions(self.batch, (action,))
+        return self.observation, int(cleared[0]), bool(self.batch.done[0]), self.info()
+
+    def step_batch(self, actions):
+        """
+        Applies a sequence of actions in order, stopping early when the game ends.
+        :param actions: (iterable) The actions.
+        :return: (tuple) The observation, the total reward, whether the game is over and info() with the number of
+            actions applied under 'steps'.
+        """
+        batch = self.batch
+        reward = 0
+        steps = 0
+        for action in actions:
+            if batch.done[0]:
+                break
+            reward += int(_apply_actions(batch, (action,))[0])
+            steps += 1
+        info = self.info()
+        info['steps'] = steps
+        return self.observation, reward, bool(batch.done[0]), info
+
+
+class VectorEnv:
+    """
+    N independent games stepped together, one action each per step, that reset automatically when they end.
+
+    Each step is one vectorized pass over the batch.  A game that ends during a step is reset before the step
+    returns, so its observation already shows the next game; its final board and score are reported in the info.
+
+    Attributes:
+        batch (BatchEngine): The games' engine.
+        num_envs (int): Number of games.
+        board_width (int): Width of each board in cells.
+        board_height (int): Height of each board in cells.
+        num_actions (int): Number of distinct actions per game.
+        observation (Observation): Views of every board and active piece, with a leading game axis.
+    """
+
+    def __init__(self, num_envs, board_width=10, board_height=20, seed=0, piece_mode=BAG):
+        self.batch = BatchEngine(num_envs, board_width, board_height, seed, piece_mode)
+        self.num_envs = num_envs
+        self.board_width = board_width
+        self.board_height = board_height
+        self.num_actions = PLACE + 4 * board_width
+        self.observation = Observation(self.batch.boards, self.batch.pieces)
+
+    def placement_action(self, rotation, x):
+        """
+        Returns the action that places the active piece at a rotation state and column.
+        :param rotation: (int or ndarray) Rotation state.
+        :param x: (int or ndarray) Column of the piece's left edge.
+        :return: (int or ndarray) The action.
+        """
+        return PLACE + rotation * self.board_width + x
+
+    def reset(self, seed=None):
+        """
+        Starts a new game in every environment.
+        :param seed: (int) Base seed, environment i uses seed + i, or None to continue the current random streams.
+        :return: (Observation) The first observations.
+        """
+        self.batch.reset(seed)
+        return self.observation
+
+    def step(self, actions):
+        """
+        Applies one action in every environment and resets the games that ended.
+        :param actions: (ndarray) One action per environment.
+        :return: (tuple) The observations, the rewards, whether each game ended and an info dict.  The info holds
+            views of every game's 'score' and 'lines_cleared', and for the games that ended, in index order,
+            'final_board' copies of their last boards and their 'final_score' and 'final_lines_cleared'.
+        """
+        batch = self.batch
+        rewards = _apply_actions(batch, actions)
+        dones = batch.done.copy()
+        info = {'score': batch.score, 'lines_cleared': batch.lines_cleared}
+        if dones.any():
+            info['final_board'] = batch.boards[dones]
+            info['final_score'] = batch.score[dones]
+            info['final_lines_cleared'] = batch.lines_cleared[dones]
+            batch.reset(mask=dones)
+        return self.observation, rewards, dones, info
+
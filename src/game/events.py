@@ -0,0 +1,55 @@
+# pytetris/src/game/events.py
+from collections import namedtuple
+
+SCORE = 'score'
+LINES = 'lines_cleared'
+LEVEL = 'level'
+GAME_OVER = 'game_over'
+KINDS = (SCORE, LINES, LEVEL, GAME_OVER)
+
+_UNSET = object()
+
+Change = namedtuple('Change', ['kind', 'value'])
+Change.__doc__ = """
+A change of one game value, sent by GameEngine to its listeners.
+
+Attributes:
+    kind (str): SCORE, LINES, LEVEL or GAME_OVER.
+    value: The new value; for GAME_OVER, whether the game is over.
+"""
+
+
+class ChangeBuffer:
+    """
+    Coalesces engine changes between flushes.
+
+    Registered as an engine listener, it only remembers the latest value of each kind, so any number of changes
+    between two frames costs one dict store each.  flush() then returns at most one change per kind, and only for
+    values that differ from what the previous flush returned, so a consumer can update its display once per frame
+    and not at all when nothing changed.
+    """
+
+    def __init__(self, displayed=None):
+        """
+        :param displayed: (dict) Values the consumer already shows, keyed by kind, so they are not sent again.
+        """
+        self._pending = {}
+        self._flushed = dict(displayed or {})
+
+    def __call__(self, change):
+        self._pending[change.kind] = change.value
+
+    def flush(self):
+        """
+        Returns the changes since the previous flush, skipping values that ended up unchanged.
+        :return: (list) Change entries, at most one per kind.
+        """
+        if not self._pending:
+            return []
+        changes = []
+        for kind, value in self._pending.items():
+            if self._flushed.get(kind, _UNSET) != value:
+                self._flushed[kind] = value
+                changes.append(Change(kind, value))
+        self._pending.clear()
+        return changes
@@ -0,0 +1,78 @@
+# pytetris/src/game/frame.py
+# Immutable pictures of a GameEngine for views that must not read the engine directly, such as the board widget
+# when the engine runs on another thread.
+from collections import namedtuple
+
+Frame = namedtuple('Frame', ['board_width', 'board_height', 'grid', 'stack_version', 'piece_color', 'piece_cells',
+                             'ghost_offset', 'next_pieces', 'score', 'lines_cleared', 'level', 'piece_count', 'seed',
+                             'is_game_over', 'ticks', 'input_at', 'changes', 'top_row'])
+Frame.__doc__ = """
+What a view needs to draw one moment of a game.  Frames share the engine's immutable row tuples, so capturing one
+copies a single list of row references, and on a huge board only the references of the rows around the viewport.
+
+Attributes:
+    board_width (int): Width of the board in cells.
+    board_height (int): Height of the board in cells.
+    grid (tuple): The locked cells of the captured rows as row tuples of colors, None for empty cells.
+    stack_version (int): The engine's stack version, which changes whenever the locked cells do.
+    piece_color (str): Color of the active piece, or None when there is none.
+    piece_cells (tuple): (x, y) board cells of the active piece.
+    ghost_offset (int): Rows between the active piece and where it would land.
+    next_pieces (tuple): Tetronimo subclasses of the upcoming pieces.
+    score (int): Player score.
+    lines_cleared (int): Lines cleared.
+    level (int): Current level.
+    piece_count (int): Number of pieces spawned.
+    seed (int): Seed of the game's piece sequence.
+    is_game_over (bool): Whether the game is over.
+    ticks (int): Logic ticks run when the frame was captured.
+    input_at (float): perf_counter time of the key press this frame first shows the effect of, or None.
+    changes (tuple): Change entries for the HUD values that changed since the previous frame, at most one per kind.
+    top_row (int): The board row of the first captured row.  Piece cells are board coordinates.
+"""
+
+
+def viewport_top(top_row, cells, viewport_rows, board_height):
+    """
+    Returns where a viewport of some rows must start to keep a piece in view: where it is when the piece is fully
+    inside it, otherwise centered on the piece, as far as the board allows.
+    :param top_row: (int) The board row at the top of the viewport.
+    :param cells: (iterable) (x, y) board cells of the piece, which may be empty.
+    :param viewport_rows: (int) Number of rows in the viewport.
+    :param board_height: (int) Height of the board in cells.
+    :return: (int) The board row for the top of the viewport.
+    """
+    rows = [y for _, y in cells]
+    if rows and not (top_row <= min(rows) and max(rows) < top_row + viewport_rows):
+        top_row = (min(rows) + max(rows)) // 2 - viewport_rows // 2
+    return max(0, min(top_row, board_height - viewport_rows))
+
+
+def capture(engine, ticks=0, next_count=0, input_at=None, changes=(), top_row=0, rows=None):
+    """
+    Captures an engine's visible state, with the locked cells of some or all of its rows.
+    :param engine: (GameEngine) The engine.
+    :param ticks: (int) The game's logic tick.
+    :param next_count: (int) Number of upcoming pieces to include.
+    :param input_at: (float) perf_counter time of the key press whose effect the frame shows, or None.
+    :param changes: (iterable) Change entries since the previous frame, such as a ChangeBuffer's flush().
+    :param top_row: (int) First board row to capture.
+    :param rows: (int) Number of rows to capture, or None for every row from top_row down.
+    :return: (Frame) The frame.
+    """
+    piece = engine.active_piece
+    if piece is None:
+        color, cells, ghost_offset = None, (), 0
+    else:
+        x, y = piece.position
+        color = piece.color
+        cells = tuple((x + dx, y + dy) for dx, dy in piece.state.cells)
+        ghost_offset = engine.drop_distance()
+    next_pieces = tuple(engine.next_pieces(next_count)) if next_count else ()
+    if top_row == 0 and rows is None:
+        grid = tuple(engine.grid)
+    else:
+        grid = tuple(engine.grid[top_row:engine.board_height if rows is None else top_row + rows])
+    return Frame(engine.board_width, engine.board_height, grid, engine.stack_version, color, cells, ghost_offset,
+                 next_pieces, engine.score, engine.lines_cleared, engine.level, engine.piece_count, engine.seed,
+                 engine.is_game_over, ticks, input_at, tuple(changes), top_row)
@@ -0,0 +1,160 @@
+# pytetris/src/game/history.py
+from collections import deque, namedtuple
+
+from .tetronimo import PIECE_TYPES
+
+Lock = namedtuple('Lock', ['piece', 'rotation', 'x', 'y', 'rows'])
+Lock.__doc__ = """
+What undoing one placement needs: the piece that locked and the board rows it locked into, as they were before.
+The rows it filled and the rows it cleared are rebuilt from these when the placement is undone.
+
+Attributes:
+    piece (int): PIECE_TYPES index of the locked piece.
+    rotation (int): Its rotation state.
+    x (int): Column of its left edge.
+    y (int): Row of its top edge.
+    rows (tuple): (y, row tuple, occupancy mask) of each board row the piece covered, before it locked.
+"""
+
+Checkpoint = namedtuple('Checkpoint', ['lock', 'piece', 'score', 'lines_cleared', 'level', 'piece_count', 'pieces'])
+Checkpoint.__doc__ = """
+The game state just after a piece spawned.  The board itself is not copied: each checkpoint only keeps the Lock
+that led to it from the checkpoint before, and rewinding undoes those locks in turn.
+
+Attributes:
+    lock (Lock): The placement since the previous checkpoint, or None for a game's first piece.
+    piece (int): PIECE_TYPES index of the spawned piece.
+    score (int): Player score.
+    lines_cleared (int): Lines cleared.
+    level (int): Current level.
+    piece_count (int): Number of pieces spawned.
+    pieces (tuple): The piece source's state from PieceSource.getstate().
+"""
+
+DEPTH = 100  # Default number of placements that can be undone
+
+
+def _unlock(engine, lock, grid, rows):
+    """
+    Undoes one placement on a copy of the board: puts back the rows it cleared, then the rows it locked into.
+    :param engine: (GameEngine) The engine, for the board size.
+    :param lock: (Lock) The placement.
+    :param grid: (list) Row tuples, updated in place.
+    :param rows: (list) Occupancy masks, updated in place.
+    :return: None
+    """
+    piece = PIECE_TYPES[lock.piece]()
+    state = piece.states[lock.rotation]
+    full = []
+    for y, row, mask in lock.rows:
+        offset = y - lock.y
+        if offset < len(state.masks):
+            mask |= state.masks[offset] << lock.x
+        if mask == engine.full_row:
+            cells = list(row)
+            for dx, dy in state.cells:
+                if dy == offset:
+                    cells[lock.x + dx] = piece.color
+            full.append((y, tuple(cells), mask))
+    if full:
+        del grid[:len(full)]
+        del rows[:len(full)]
+        for y, row, mask in full:  # Ascending, so every earlier row is back in place when a row is inserted.
+            grid.insert(y, row)
+            rows.insert(y, mask)
+    for y, row, mask in lock.rows:
+        grid[y] = row
+        rows[y] = mask
+
+
+class History:
+    """
+    A bounded stack of checkpoints, one per spawned piece, for rewinding placements.
+
+    A placement costs the few rows its piece covered, however tall the board: lock() saves them before the piece
+    locks and the next record() files them in the new checkpoint.  Rewinding rebuilds the board by undoing the
+    locks since the target checkpoint, at a cost of one board copy.  A lock that ended the game has no checkpoint
+    after it but can still be undone.  When the stack is full the oldest checkpoint is evicted.
+
+    Attributes:
+        depth (int): Most checkpoints kept, or None for no limit.
+    """
+
+    def __init__(self, depth=DEPTH):
+        self.depth = depth
+        self._checkpoints = deque(maxlen=None if depth is None else depth + 1)
+        self._lock = None  # Lock not yet followed by a checkpoint
+
+    def __len__(self):
+        return len(self._checkpoints)
+
+    @property
+    def available(self):
+        """
+        Returns how many placements can currently be undone.
+        """
+        return max(len(self._checkpoints) - 1, 0)
+
+    def clear(self):
+        """
+        Discards every checkpoint.
+        :return: None
+        """
+        self._checkpoints.clear()
+        self._lock = None
+
+    def lock(self, engine):
+        """
+        Saves the board rows under the engine's active piece just before it locks.
+        :param engine: (GameEngine) The engine.
+        :return: None
+        """
+        piece = engine.active_piece
+        x, y = piece.position
+        covered = range(max(y, 0), min(y + piece.state.height, engine.board_height))
+        self._lock = Lock(PIECE_TYPES.index(type(piece)), piece.rotation_state, x, y,
+                          tuple((row, engine.grid[row], engine.rows[row]) for row in covered))
+
+    def record(self, engine):
+        """
+        Saves the engine's state after its active piece spawned.
+        :param engine: (GameEngine) The engine.
+        :return: None
+        """
+        self._checkpoints.append(Checkpoint(self._lock, PIECE_TYPES.index(type(engine.active_piece)), engine.score,
+                                            engine.lines_cleared, engine.level, engine.piece_count,
+                                            engine.pieces.getstate()))
+        self._lock = None
+
+    def rewind(self, engine, placements=1):
+        """
+        Returns the engine to the spawn of the piece placed the given number of placements ago, or to the current
+        piece's spawn when placements is 0.  After a game over, the piece that ended the game counts as the last
+        placement.
+        :param engine: (GameEngine) The engine.
+        :param placements: (int) Number of placements to undo.
+        :return: (bool) True if the engine was rewound, False when not enough history is kept.
+        """
+        checkpoints = self._checkpoints
+        pops = placements - 1 if self._lock is not None else placements
+        if placements < 0 or pops < 0 or pops >= len(checkpoints):
+            return False
+        grid = list(engine.grid)
+        rows = list(engine.rows)
+        if self._lock is not None:
+            _unlock(engine, self._lock, grid, rows)
+            self._lock = None
+        for _ in range(pops):
+            _unlock(engine, checkpoints.pop().lock, grid, rows)
+        checkpoint = checkpoints[-1]
+        engine.set_rows(grid, rows)
+        engine.rebuild_heights()
+        engine.stack_version += 1
+        engine.start_new_piece(PIECE_TYPES[checkpoint.piece]())
+        engine.score = checkpoint.score
+        engine.lines_cleared = checkpoint.lines_cleared
+        engine.level = checkpoint.level
+        engine.piece_count = checkpoint.piece_count
+        engine.is_game_over = False
+        engine.pieces.setstate(checkpoint.pieces)
+        return True
@@ -0,0 +1,111 @@
+# pytetris/src/game/input.py
+from collections import deque
+
+from . import replay
+
+DAS = 10  # Ticks a direction must be held before it starts repeating (delayed auto shift)
+ARR = 2  # Ticks between repeats once repeating (auto repeat rate)
+SOFT_DROP_ARR = 2  # Ticks between soft drop repeats while down is held
+
+_PRESS = 0
+_RELEASE = 1
+
+
+class InputQueue:
+    """
+    Buffers key presses and releases between logic ticks and turns held keys into repeats on the tick clock.
+
+    Key events are only queued when they arrive.  Each logic tick, tick() applies the queued events in order and
+    returns the input codes due that tick: one for every press, plus the repeats of held keys.  Left and right
+    repeat after DAS ticks and then every ARR ticks, with the most recently pressed direction winning while both are
+    held; soft drop repeats every SOFT_DROP_ARR ticks from the press.  Rotations and hard drops never repeat.  As
+    repeats are counted in ticks, they do not depend on the operating system's key repeat settings, so callers should
+    ignore the OS's auto-repeated key events.
+
+    Attributes:
+        das (int): Ticks before left and right start repeating.
+        arr (int): Ticks between left and right repeats.
+        soft_drop_arr (int): Ticks between soft drop repeats.
+    """
+
+    def __init__(self, das=DAS, arr=ARR, soft_drop_arr=SOFT_DROP_ARR):
+        if arr < 1 or soft_drop_arr < 1:
+            raise ValueError("Repeat intervals must be at least one tick")
+        self.das = das
+        self.arr = arr
+        self.soft_drop_arr = soft_drop_arr
+        self._events = deque()
+        self._held = {}  # Repeating code -> ticks held
+        self._horizontal = None  # The held direction that repeats, LEFT or RIGHT
+
+    def press(self, code):
+        """
+        Queues a key press.
+        :param code: (int) Replay input code of the key.
+        :return: None
+        """
+        self._events.append((_PRESS, code))
+
+    def release(self, code):
+        """
+        Queues a key release.
+        :param code: (int) Replay input code of the key.
+        :return: None
+        """
+        self._events.append((_RELEASE, code))
+
+    def clear(self):
+        """
+        Drops queued events and forgets every held key, for example when the game pauses or the window loses focus.
+        :return: None
+        """
+        self._events.clear()
+        self._held.clear()
+        self._horizontal = None
+
+    @property
+    def is_idle(self):
+        """
+        Returns whether no events are queued and no key is held, so tick() would return nothing.
+        """
+        return not self._events and not self._held
+
+    def tick(self):
+        """
+        Applies the queued events and advances held keys by one tick.
+        :return: (list) Input codes to apply this tick, in order.
+        """
+        codes = []
+        held = self._held
+        pressed = set()
+        events = self._events
+        while events:
+            kind, code = events.popleft()
+            if kind == _PRESS:
+                if code in held:
+                    continue  # Already held; a press without a release in between is an OS repeat.
+                codes.append(code)
+                if code in (replay.LEFT, replay.RIGHT):
+                    held[code] = 0
+                    self._horizontal = code
+                    pressed.add(code)
+                elif code == replay.DOWN:
+                    held[code] = 0
+                    pressed.add(code)
+            elif held.pop(code, None) is not None and code == self._horizontal:
+                # Fall back to the other direction if it is still held, restarting its delay.
+                other = replay.RIGHT if code == replay.LEFT else replay.LEFT
+                self._horizontal = other if other in held else None
+                if other in held:
+                    held[other] = 0
+        for code, ticks in held.items():
+            if code in pressed:
+                continue
+            ticks += 1
+            held[code] = ticks
+            if code == replay.DOWN:
+                if ticks % self.soft_drop_arr == 0:
+                    codes.append(code)
+            elif code == self._horizontal and ticks >= self.das and (ticks - self.das) % self.arr == 0:
+                codes.append(code)
+        return codes
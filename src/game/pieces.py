@@ -0,0 +1,110 @@
+# pytetris/src/game/pieces.py
+import random
+from collections import deque
+from itertools import islice
+
+from .tetronimo import PIECE_TYPES
+
+BAG = 'bag'
+RANDOM = 'random'
+MODES = (BAG, RANDOM)
+
+
+class PieceSource:
+    """
+    A seedable stream of piece types with a lookahead queue.
+
+    Pieces are produced by a generator, either as shuffled 7-bags (every type once per bag) or uniformly at random.
+    Generated pieces wait in a queue, so any number of upcoming pieces can be inspected with peek() without
+    consuming or regenerating them, and the whole source can be saved and restored with getstate()/setstate().
+    Piece types are returned as indexes into PIECE_TYPES.
+
+    Attributes:
+        mode (str): BAG or RANDOM.
+        random (Random): The source's own random number generator.
+    """
+
+    def __init__(self, mode=BAG, seed=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown piece mode: {mode}")
+        self.mode = mode
+        self.random = random.Random()
+        self._bag = []
+        self._queue = deque()
+        self._random_state = None  # Cached self.random.getstate(), None once the generator has been used
+        self._stream = self._generate()
+        self.seed(seed)
+
+    def _generate(self):
+        """
+        Yields piece type indexes forever.  All state lives on the instance so it can be saved and restored.
+        """
+        count = len(PIECE_TYPES)
+        while True:
+            if self.mode == BAG:
+                if not self._bag:
+                    self._random_state = None
+                    self._bag = list(range(count))
+                    self.random.shuffle(self._bag)
+                yield self._bag.pop()
+            else:
+                self._random_state = None
+                yield self.random.randrange(count)
+
+    def seed(self, seed):
+        """
+        Restarts the sequence from a seed, discarding the current bag and lookahead queue.
+        :param seed: (int) The seed.
+        :return: None
+        """
+        self.random.seed(seed)
+        self._random_state = None
+        self._bag = []
+        self._queue.clear()
+
+    def next(self):
+        """
+        Removes and returns the next piece type.
+        :return: (int) Index into PIECE_TYPES.
+        """
+        if self._queue:
+            return self._queue.popleft()
+        return next(self._stream)
+
+    def peek(self, count):
+        """
+        Returns the upcoming piece types without consuming them, generating only as many as are missing from the
+        queue.
+        :param count: (int) Number of upcoming pieces.
+        :return: Iterator over the next count piece type indexes.
+        """
+        queue = self._queue
+        stream = self._stream
+        while len(queue) < count:
+            queue.append(next(stream))
+        return islice(queue, count)
+
+    def getstate(self):
+        """
+        Captures the source's state.  The random generator's state is only copied again after it has been used, so
+        repeated captures between bags are cheap.
+        :return: (tuple) A hashable state for setstate().
+        """
+        if self._random_state is None:
+            self._random_state = self.random.getstate()
+        return self.mode, self._random_state, tuple(self._bag), tuple(self._queue)
+
+    def setstate(self, state):
+        """
+        Restores a state captured by getstate().
+        :param state: (tuple) The saved state.
+        :return: None
+        """
+        mode, random_state, bag, queue = state
+        self.mode = mode
+        if random_state is not self._random_state:  # Restoring the state it already has is common in search.
+            self.random.setstate(random_state)
+            self._random_state = random_state
+        self._bag = list(bag)
+        self._queue.clear()
+        self._queue.extend(queue)
@@ -0,0 +1,222 @@
+# pytetris/src/game/replay.py
+# Compact binary replays of seeded games, and headless playback.
+#
+# A replay is the header
+#
+#     b'PTRP', version byte, piece mode byte, varint board_width, varint board_height, varint seed, varint tick_rate
+#
+# followed by one varint per input, holding ``(delta << 3) | code`` where delta is the number of logic ticks since
+# the previous input, or since the game started for the first one, and code is one of the 3-bit input codes below.
+# tick_rate is the number of logic ticks per second.  Because the piece sequence is fixed by the seed and gravity
+# steps are recorded as inputs, playback re-simulates the game exactly without any timing; the tick deltas place
+# every input on the fixed-timestep clock it was applied on.
+#
+# Usage: python -m src.game.replay FILE [FILE ...]
+import sys
+import time
+
+from .clock import LOGIC_RATE
+from .engine import GameEngine
+from .pieces import MODES
+
+MAGIC = b'PTRP'
+VERSION = 4
+
+# 3-bit input codes.  UNDO rewinds one placement in practice mode and is only recorded when it succeeded.
+LEFT, RIGHT, ROTATE_RIGHT, ROTATE_LEFT, DOWN, GRAVITY, HARD_DROP, UNDO = range(8)
+INPUT_NAMES = ('left', 'right', 'rotate_right', 'rotate_left', 'down', 'gravity', 'hard_drop', 'undo')
+
+
+def write_varint(buffer, value):
+    """
+    Appends an unsigned LEB128 varint.
+    :param buffer: (bytearray) Destination buffer.
+    :param value: (int) Non-negative value.
+    :return: None
+    """
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset):
+    """
+    Reads an unsigned LEB128 varint.
+    :param data: (bytes) Source data.
+    :param offset: (int) Position of the varint's first byte.
+    :return: (tuple) The value and the offset just past it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def apply_input(engine, code):
+    """
+    Applies one input code to an engine.
+    :param engine: (GameEngine) The engine to drive.
+    :param code: (int) The input code.
+    :return: True if the board changed, False otherwise.
+    """
+    if code == LEFT:
+        return engine.move_piece('left')
+    if code == RIGHT:
+        return engine.move_piece('right')
+    if code == ROTATE_RIGHT:
+        return engine.rotate_piece('right')
+    if code == ROTATE_LEFT:
+        return engine.rotate_piece('left')
+    if code == DOWN or code == GRAVITY:
+        return engine.move_piece_down()
+    if code == HARD_DROP:
+        return engine.hard_drop()
+    if code == UNDO:
+        return engine.undo()
+    raise ValueError(f"Unknown input code: {code}")
+
+
+class ReplayRecorder:
+    """
+    Records the inputs of one game into the binary replay format.
+
+    Attributes:
+        seed (int): Seed of the recorded game.
+        tick_rate (int): Logic ticks per second of the clock the game runs on.
+        inputs (int): Number of inputs recorded.
+    """
+
+    def __init__(self, seed, board_width=10, board_height=20, piece_mode=MODES[0], tick_rate=LOGIC_RATE,
+                 start_tick=0):
+        """
+        :param start_tick: (int) Logic tick the game started on, which the first input's delta is counted from.
+        """
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.inputs = 0
+        self._last_tick = start_tick
+        self._buffer = bytearray(MAGIC)
+        self._buffer.append(VERSION)
+        self._buffer.append(MODES.index(piece_mode))
+        write_varint(self._buffer, board_width)
+        write_varint(self._buffer, board_height)
+        write_varint(self._buffer, seed)
+        write_varint(self._buffer, tick_rate)
+
+    def record(self, code, tick):
+        """
+        Appends an input with the logic ticks elapsed since the previous one.
+        :param code: (int) The input code.
+        :param tick: (int) Logic tick the input is applied on.
+        :return: None
+        """
+        delta = tick - self._last_tick
+        if delta < 0:
+            raise ValueError(f"Input at tick {tick} recorded after tick {self._last_tick}")
+        self._last_tick = tick
+        write_varint(self._buffer, (delta << 3) | code)
+        self.inputs += 1
+
+    def to_bytes(self):
+        """
+        Returns the replay recorded so far.
+        :return: (bytes) The encoded replay.
+        """
+        return bytes(self._buffer)
+
+    def save(self, path):
+        """
+        Writes the replay recorded so far to a file.
+        :param path: (str) Destination file.
+        :return: None
+        """
+        with open(path, 'wb') as file:
+            file.write(self._buffer)
+
+
+def read_header(data):
+    """
+    Decodes a replay header.
+    :param data: (bytes) The encoded replay.
+    :return: (tuple) board_width, board_height, seed, piece mode, tick rate and the offset of the first input.
+    """
+    if len(data) < len(MAGIC) + 2 or data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a pytetris replay")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported replay version: {data[len(MAGIC)]}")
+    mode = data[len(MAGIC) + 1]
+    if mode >= len(MODES):
+        raise ValueError(f"Unknown piece mode in replay: {mode}")
+    offset = len(MAGIC) + 2
+    try:
+        board_width, offset = read_varint(data, offset)
+        board_height, offset = read_varint(data, offset)
+        seed, offset = read_varint(data, offset)
+        tick_rate, offset = read_varint(data, offset)
+    except IndexError:
+        raise ValueError("Truncated replay header") from None
+    return board_width, board_height, seed, MODES[mode], tick_rate, offset
+
+
+def iter_inputs(data, offset):
+    """
+    Decodes the inputs of a replay.
+    :param data: (bytes) The encoded replay.
+    :param offset: (int) Offset of the first input, as returned by read_header.
+    :return: Iterator of (delta, code) pairs, delta in logic ticks.
+    """
+    end = len(data)
+    while offset < end:
+        value, offset = read_varint(data, offset)
+        yield value >> 3, value & 7
+
+
+def play_replay(data, engine=None):
+    """
+    Re-simulates a replay headlessly, as fast as possible.
+    :param data: (bytes) The encoded replay.
+    :param engine: (GameEngine) Engine to play on, or None to create one of the recorded size.
+    :return: (GameEngine) The engine in the state reached at the end of the replay.
+    """
+    board_width, board_height, seed, piece_mode, _, offset = read_header(data)
+    if engine is None:
+        engine = GameEngine(board_width, board_height, piece_mode)
+    if any(code == UNDO for _, code in iter_inputs(data, offset)):
+        engine.enable_history(None)  # Every undo in the recording succeeded, so keep the whole game.
+    engine.reset_game(seed)
+    engine.is_paused = False
+    for _, code in iter_inputs(data, offset):
+        if engine.is_game_over and code != UNDO:  # A practice game can be undone after it ended.
+            break
+        apply_input(engine, code)
+    return engine
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("usage: python -m src.game.replay FILE [FILE ...]", file=sys.stderr)
+        return 2
+    for path in paths:
+        with open(path, 'rb') as file:
+            data = file.read()
+        _, _, seed, _, tick_rate, offset = read_header(data)
+        recorded = sum(delta for delta, _ in iter_inputs(data, offset)) / tick_rate
+        start = time.perf_counter()
+        engine = play_replay(data)
+        elapsed = time.perf_counter() - start
+        speedup = recorded / elapsed if elapsed else float('inf')
+        print(f"{path}: seed={seed} score={engine.score} lines={engine.lines_cleared} "
+              f"game_over={engine.is_game_over} recorded={recorded:.1f}s "
+              f"replayed={elapsed * 1000:.2f}ms ({speedup:.0f}x real time)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
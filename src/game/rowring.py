@@ -0,0 +1,92 @@
+# pytetris/src/game/rowring.py
+# Row storage for huge boards.
+#
+# A RowRing keeps a board's rows in a circular buffer: logical row y lives at physical slot (start + y) % length.
+# Clearing a row then moves only the rows on the cheaper side of it.  Rows above it move down one slot, or rows
+# below it move up one slot and the ring rotates so the freed slot becomes the new top row.  On a tall board with
+# the stack at the bottom, the rows below a clear are few, and the empty rows above the stack never move.
+#
+# Removing a row is therefore not O(1): it costs the smaller of the number of stack rows above it and the number of
+# rows below it, which depends on the stack but not on the board height.  Constant-time removal at any index would
+# need a linked or tree structure, and would make every row read, which the engine does far more often, slower.
+from itertools import chain, islice
+
+
+class RowRing:
+    """
+    A fixed-length sequence of board rows, top row first, with cheap removal of rows anywhere in it.
+
+    Supports the list operations the engine uses on its rows: len(), iteration and reading and replacing a row by
+    index.  remove() deletes rows and fills the top with empty rows, keeping the length.
+    """
+
+    __slots__ = ('_data', '_start')
+
+    def __init__(self, rows):
+        self._data = list(rows)
+        self._start = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def _slot(self, index):
+        length = len(self._data)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("RowRing index out of range")
+        return (self._start + index) % length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._data)))]
+        return self._data[self._slot(index)]
+
+    def __setitem__(self, index, row):
+        self._data[self._slot(index)] = row
+
+    def __iter__(self):
+        data = self._data
+        return chain(islice(data, self._start, None), islice(data, 0, self._start))
+
+    def __eq__(self, other):
+        if isinstance(other, RowRing):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self):
+        return f"RowRing({list(self)!r})"
+
+    def remove(self, indexes, fill, top=0):
+        """
+        Removes rows, shifting the rows above them down, and fills the top with empty rows.  Each removal moves
+        min(index - top, len(self) - 1 - index) rows.
+        :param indexes: (list) Logical indexes of the rows to remove, in ascending order.
+        :param fill: The empty row to fill the top with.
+        :param top: (int) Index of the highest row that may be non-empty.  Every row above it must equal fill,
+            which lets those rows stay where they are.
+        :return: None
+        """
+        data = self._data
+        length = len(data)
+        for index in indexes:
+            top = min(top, index)
+            # Rows below a removed row keep their index, so later indexes in ascending order are still valid.
+            if index - top <= length - 1 - index:
+                # Move the rows between top and the removed row down one slot.
+                slot = (self._start + index) % length
+                for _ in range(index - top):
+                    previous = slot - 1 if slot else length - 1
+                    data[slot] = data[previous]
+                    slot = previous
+                data[slot] = fill
+            else:
+                # Move the rows below the removed row up one slot, then rotate the freed bottom slot to the top.
+                slot = (self._start + index) % length
+                for _ in range(length - 1 - index):
+                    following = slot + 1 if slot + 1 < length else 0
+                    data[slot] = data[following]
+                    slot = following
+                self._start = self._start - 1 if self._start else length - 1
+                data[self._start] = fill
+            top += 1
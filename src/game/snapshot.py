@@ -0,0 +1,214 @@
+# pytetris/src/game/snapshot.py
+# Compact, hashable snapshots of a GameEngine's game state.
+#
+# The locked cells are packed as 3-bit codes, 0 for an empty cell and 1 + the PIECE_TYPES index of the piece that
+# filled it, one little-endian int per row of (3 * board_width + 7) // 8 bytes.  Rows are encoded and decoded through
+# caches keyed by their contents, so the mostly empty or repeated rows of a real board cost one dict lookup each.
+#
+# Snapshots can also be serialized for save files and crash recovery:
+#
+#     b'PTSS', version byte, struct of the scalar fields, packed cells, piece source state
+import struct
+from collections import namedtuple
+
+from .pieces import MODES
+from .tetronimo import PIECE_TYPES
+
+MAGIC = b'PTSS'
+VERSION = 1
+
+Snapshot = namedtuple('Snapshot', ['board_width', 'board_height', 'cells', 'piece', 'rotation', 'x', 'y', 'score',
+                                   'lines_cleared', 'level', 'piece_count', 'seed', 'is_game_over', 'pieces'])
+Snapshot.__doc__ = """
+An immutable, hashable copy of a game's state.
+
+Attributes:
+    board_width (int): Width of the board in cells.
+    board_height (int): Height of the board in cells.
+    cells (bytes): The locked cells as packed 3-bit piece codes, top row first.
+    piece (int): PIECE_TYPES index of the active piece, or -1 when there is none.
+    rotation (int): Rotation state of the active piece.
+    x (int): Column of the active piece's left edge.
+    y (int): Row of the active piece's top edge.
+    score (int): Player score.
+    lines_cleared (int): Lines cleared.
+    level (int): Current level.
+    piece_count (int): Number of pieces spawned.
+    seed (int): Seed of the game's piece sequence.
+    is_game_over (bool): Whether the game is over.
+    pieces (tuple): The piece source's state from PieceSource.getstate().
+"""
+
+CODE_BITS = 3
+COLORS = (None,) + tuple(piece_type().color for piece_type in PIECE_TYPES)  # Color of each cell code
+CODES = {color: code for code, color in enumerate(COLORS)}
+
+_SCALARS = struct.Struct('<HHbBhhQQIQQ?')
+_RANDOM_STATE = struct.Struct('<625I')
+_MAX_CACHED_ROWS = 65536
+_encoded_rows = {}  # tuple of cell colors -> row code
+_decoded_rows = {}  # (row code, board width) -> (tuple of cell colors, occupancy mask)
+
+
+def row_bytes(board_width):
+    """
+    Returns the number of bytes one packed row takes.
+    :param board_width: (int) Width of the board in cells.
+    :return: (int) Bytes per row.
+    """
+    return (CODE_BITS * board_width + 7) // 8
+
+
+def encode_row(row):
+    """
+    Packs a row of cell colors into an int of 3-bit codes, column 0 in the lowest bits.
+    :param row: (tuple) Cell colors, None for empty cells, as stored in GameEngine.grid.
+    :return: (int) The packed row.
+    """
+    code = _encoded_rows.get(row)
+    if code is None:
+        code = 0
+        for col, color in enumerate(row):
+            if color is not None:
+                code |= CODES[color] << (CODE_BITS * col)
+        if len(_encoded_rows) >= _MAX_CACHED_ROWS:
+            _encoded_rows.clear()
+        _encoded_rows[row] = code
+    return code
+
+
+def decode_row(code, board_width):
+    """
+    Unpacks a row packed by encode_row().
+    :param code: (int) The packed row.
+    :param board_width: (int) Width of the board in cells.
+    :return: (tuple) The cell colors and the row's occupancy mask.
+    """
+    key = (code, board_width)
+    decoded = _decoded_rows.get(key)
+    if decoded is None:
+        colors = []
+        mask = 0
+        for col in range(board_width):
+            cell = (code >> (CODE_BITS * col)) & 7
+            colors.append(COLORS[cell])
+            if cell:
+                mask |= 1 << col
+        decoded = (tuple(colors), mask)
+        if len(_decoded_rows) >= _MAX_CACHED_ROWS:
+            _decoded_rows.clear()
+        _decoded_rows[key] = decoded
+    return decoded
+
+
+def take(engine):
+    """
+    Captures an engine's game state.
+    :param engine: (GameEngine) The engine.
+    :return: (Snapshot) The snapshot.
+    """
+    size = row_bytes(engine.board_width)
+    cells = b''.join([encode_row(row).to_bytes(size, 'little') for row in engine.grid])
+    piece = engine.active_piece
+    if piece is None:
+        piece_index, rotation, x, y = -1, 0, 0, 0
+    else:
+        piece_index = PIECE_TYPES.index(type(piece))
+        rotation = piece.rotation_state
+        x, y = piece.position
+    return Snapshot(engine.board_width, engine.board_height, cells, piece_index, rotation, x, y, engine.score,
+                    engine.lines_cleared, engine.level, engine.piece_count, engine.seed, engine.is_game_over,
+                    engine.pieces.getstate())
+
+
+def restore(engine, snapshot):
+    """
+    Replaces an engine's game state with a snapshot's.  The engine's board size must match.
+    :param engine: (GameEngine) The engine.
+    :param snapshot: (Snapshot) The snapshot.
+    :return: None
+    """
+    width = snapshot.board_width
+    if width != engine.board_width or snapshot.board_height != engine.board_height:
+        raise ValueError(f"Snapshot of a {width}x{snapshot.board_height} board does not fit a "
+                         f"{engine.board_width}x{engine.board_height} engine")
+    size = row_bytes(width)
+    cells = snapshot.cells
+    grid = []
+    rows = []
+    for offset in range(0, len(cells), size):
+        colors, mask = decode_row(int.from_bytes(cells[offset:offset + size], 'little'), width)
+        grid.append(colors)
+        rows.append(mask)
+    engine.set_rows(grid, rows)
+    engine.rebuild_heights()
+    engine.stack_version += 1
+    if snapshot.piece < 0:
+        engine.active_piece = None
+    else:
+        piece = PIECE_TYPES[snapshot.piece]()
+        piece.rotation_state = snapshot.rotation
+        piece.position = (snapshot.x, snapshot.y)
+        engine.active_piece = piece
+    engine.score = snapshot.score
+    engine.lines_cleared = snapshot.lines_cleared
+    engine.level = snapshot.level
+    engine.piece_count = snapshot.piece_count
+    engine.seed = snapshot.seed
+    engine.is_game_over = snapshot.is_game_over
+    engine.pieces.setstate(snapshot.pieces)
+
+
+def dumps(snapshot):
+    """
+    Serializes a snapshot.
+    :param snapshot: (Snapshot) The snapshot.
+    :return: (bytes) The serialized snapshot.
+    """
+    mode, (random_version, random_state, gauss), bag, queue = snapshot.pieces
+    data = bytearray(MAGIC)
+    data.append(VERSION)
+    data += _SCALARS.pack(snapshot.board_width, snapshot.board_height, snapshot.piece, snapshot.rotation, snapshot.x,
+                          snapshot.y, snapshot.score, snapshot.lines_cleared, snapshot.level, snapshot.piece_count,
+                          snapshot.seed, snapshot.is_game_over)
+    data += snapshot.cells
+    data += struct.pack('<BB', MODES.index(mode), random_version)
+    data += _RANDOM_STATE.pack(*random_state)
+    data += struct.pack('<?d', gauss is not None, gauss or 0.0)
+    data += struct.pack('<HH', len(bag), len(queue))
+    data += bytes(bag)
+    data += bytes(queue)
+    return bytes(data)
+
+
+def loads(data):
+    """
+    Reads a snapshot serialized by dumps().
+    :param data: (bytes) The serialized snapshot.
+    :return: (Snapshot) The snapshot.
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a pytetris snapshot")
+    if data[4] != VERSION:
+        raise ValueError(f"Unsupported snapshot version {data[4]}")
+    offset = 5
+    (width, height, piece, rotation, x, y, score, lines_cleared, level, piece_count, seed,
+     is_game_over) = _SCALARS.unpack_from(data, offset)
+    offset += _SCALARS.size
+    size = row_bytes(width) * height
+    cells = bytes(data[offset:offset + size])
+    offset += size
+    mode_index, random_version = struct.unpack_from('<BB', data, offset)
+    offset += 2
+    random_state = _RANDOM_STATE.unpack_from(data, offset)
+    offset += _RANDOM_STATE.size
+    has_gauss, gauss = struct.unpack_from('<?d', data, offset)
+    offset += 9
+    bag_length, queue_length = struct.unpack_from('<HH', data, offset)
+    offset += 4
+    bag = tuple(data[offset:offset + bag_length])
+    offset += bag_length
+    queue = tuple(data[offset:offset + queue_length])
+    pieces = (MODES[mode_index], (random_version, random_state, gauss if has_gauss else None), bag, queue)
+    return Snapshot(width, height, cells, piece, rotation, x, y, score, lines_cleared, level, piece_count, seed,
+                    is_game_over, pieces)
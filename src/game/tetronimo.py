@@ -1,216 +1,192 @@
 # pytetris/src/game/tetronimo.py
+from collections import namedtuple
+
+from .bitboard import shape_to_masks
+
+PieceState = namedtuple('PieceState', ['shape', 'cells', 'width', 'height', 'masks', 'bottoms', 'kicks_right',
+                                       'kicks_left'])
+PieceState.__doc__ = """
+One rotation state of a piece, built once at import and shared by every piece of that type.
+
+Attributes:
+    shape (tuple): Rows of 0/1 cells, tightly bounded.
+    cells (tuple): (dx, dy) offsets of the occupied cells from the top left corner.
+    width (int): Width of the bounding box in cells.
+    height (int): Height of the bounding box in cells.
+    masks (tuple): Occupancy row masks relative to the left edge of the bounding box.
+    bottoms (tuple): Row offset of the lowest occupied cell in each column of the bounding box.
+    kicks_right (tuple): (dx, dy) position offsets to try, in order, when rotating clockwise out of this state.  They
+        are the SRS kicks moved to the top left anchor, see _build_states().
+    kicks_left (tuple): (dx, dy) position offsets to try, in order, when rotating counterclockwise out of this state.
+"""
+
+# SRS wall kick offsets, listed as (x, y) with y pointing up, keyed by (from_state, to_state).
+_JLSTZ_KICKS = {
+    (0, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (1, 0): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (1, 2): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (2, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (2, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+    (3, 2): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (3, 0): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (0, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+}
+_I_KICKS = {
+    (0, 1): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (1, 0): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (1, 2): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    (2, 1): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (2, 3): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (3, 2): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (3, 0): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (0, 3): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+}
+_O_KICKS = {(state, (state + step) % 4): ((0, 0),) for state in range(4) for step in (1, 3)}
+
+
+def _rotate_shape_right(shape):
+    """
+    Rotates a shape 90 degrees clockwise.
+    :param shape: (tuple) Rows of 0/1 cells.
+    :return: (tuple) The rotated rows.
+    """
+    height = len(shape)
+    return tuple(tuple(shape[height - 1 - row][col] for row in range(height)) for col in range(len(shape[0])))
+
+
+def _trim(box):
+    """
+    Cuts a shape down to the bounding box of its occupied cells.
+    :param box: (tuple) Rows of 0/1 cells.
+    :return: (tuple) The tight shape and the (x, y) offset of its top left corner within the box.
+    """
+    rows = [row for row in range(len(box)) if any(box[row])]
+    cols = [col for col in range(len(box[0])) if any(box[row][col] for row in rows)]
+    shape = tuple(tuple(box[row][col] for col in cols) for row in rows)
+    return shape, (cols[0], rows[0])
+
+
+def _build_states(spawn_box, kicks):
+    """
+    Builds the four rotation states of a piece by rotating its SRS bounding box clockwise.
+
+    SRS rotates each piece about the centre of a fixed box, 3x3 for JLSTZ and 4x4 for I, and its kick offsets are
+    relative to that box.  Pieces here are positioned by the top left corner of their tightly bounded shape, which
+    sits at a different offset within the box in each state, so the difference between the two states' offsets is
+    added to every kick.  A kick of (0, 0) in the SRS tables thus becomes the shift that keeps the piece where SRS
+    rotation puts it.
+    :param spawn_box: Rows of 0/1 cells for rotation state 0, in the piece's SRS bounding box.
+    :param kicks: (dict) SRS kick offsets keyed by (from_state, to_state), y pointing up.
+    :return: (tuple) Four PieceState entries indexed by rotation state.
+    """
+    boxes = [tuple(tuple(row) for row in spawn_box)]
+    for _ in range(3):
+        boxes.append(_rotate_shape_right(boxes[-1]))
+    trimmed = [_trim(box) for box in boxes]
+
+    states = []
+    for state, (shape, (ox, oy)) in enumerate(trimmed):
+        cells = tuple((col, row) for row in range(len(shape)) for col in range(len(shape[row])) if shape[row][col])
+        kicks_by_direction = []
+        for target in ((state + 1) % 4, (state - 1) % 4):
+            tx, ty = trimmed[target][1]
+            # Board rows grow downwards, so flip the kick tables' y axis.
+            kicks_by_direction.append(tuple((dx + tx - ox, -dy + ty - oy) for dx, dy in kicks[(state, target)]))
+        bottoms = tuple(max(row for row in range(len(shape)) if shape[row][col]) for col in range(len(shape[0])))
+        states.append(PieceState(shape, cells, len(shape[0]), len(shape), shape_to_masks(shape), bottoms,
+                                 *kicks_by_direction))
+    return tuple(states)
+
+
+I_STATES = _build_states([[0, 0, 0, 0], [1, 1, 1, 1], [0, 0, 0, 0], [0, 0, 0, 0]], _I_KICKS)
+O_STATES = _build_states([[1, 1], [1, 1]], _O_KICKS)
+T_STATES = _build_states([[0, 1, 0], [1, 1, 1], [0, 0, 0]], _JLSTZ_KICKS)
+L_STATES = _build_states([[1, 0, 0], [1, 1, 1], [0, 0, 0]], _JLSTZ_KICKS)
+J_STATES = _build_states([[0, 0, 1], [1, 1, 1], [0, 0, 0]], _JLSTZ_KICKS)
+S_STATES = _build_states([[0, 1, 1], [1, 1, 0], [0, 0, 0]], _JLSTZ_KICKS)
+Z_STATES = _build_states([[1, 1, 0], [0, 1, 1], [0, 0, 0]], _JLSTZ_KICKS)
 
 
 class Tetronimo:
-    def __init__(self, shape, color):
-        self.shape = shape
+    """
+    A game piece.  Shapes, masks and kicks come from the shared rotation tables; an instance only tracks its
+    rotation state and position.
+
+    Attributes:
+        states (tuple): The four PieceState entries of this piece type.
+        rotation_state (int): Index of the current state, 0 to 3 clockwise from spawn.
+        color (str): Color used to draw the piece.
+        position (tuple): Top left (x, y) of the current state's bounding box.
+    """
+
+    def __init__(self, states, color):
+        self.states = states
         self.rotation_state = 0
         self.color = color
         self.position = None
 
-    def rotate(self):
-        self.rotation_state = (self.rotation_state + 1) % 4
+    @property
+    def state(self):
+        return self.states[self.rotation_state]
 
+    @property
+    def shape(self):
+        return self.states[self.rotation_state].shape
 
-class Itetronimo(Tetronimo):
-    def __init__(self):
-        shape = [
-            [1, 1, 1, 1]
-        ]
-        color = "cyan"  # Pick better colors later
-        super().__init__(shape, color)
+    def rotate(self, direction='right'):
+        if direction == 'right':
+            self.rotation_state = (self.rotation_state + 1) % 4
+        else:
+            self.rotation_state = (self.rotation_state - 1) % 4
 
     def rotate_right(self):
-        if self.rotation_state % 2 == 0:
-            return [
-                [1, 1, 1, 1]
-            ]
-        else:
-            return [
-                [1],
-                [1],
-                [1],
-                [1]
-            ]
+        return self.states[(self.rotation_state + 1) % 4].shape
 
     def rotate_left(self):
-        return self.rotate_right()
+        return self.states[(self.rotation_state - 1) % 4].shape
 
 
-class OTetronimo(Tetronimo):
+class Itetronimo(Tetronimo):
     def __init__(self):
-        shape = [
-            [1, 1],
-            [1, 1]
-        ]
-        color = "yellow"
-        super().__init__(shape, color)
+        color = "cyan"  # Pick better colors later
+        super().__init__(I_STATES, color)
 
-    def rotate_right(self):
-        return self.shape  # No change
 
-    def rotate_left(self):
-        return self.shape  # No change
+class OTetronimo(Tetronimo):
+    def __init__(self):
+        color = "yellow"
+        super().__init__(O_STATES, color)
 
 
 class TTetronimo(Tetronimo):
     def __init__(self):
-        shape = [
-            [0, 1, 0],
-            [1, 1, 1]
-        ]
         color = "purple"
-        super().__init__(shape, color)
-
-    def rotate_right(self):
-        if self.rotation_state == 0:
-            return [
-                [1, 0],
-                [1, 1],
-                [1, 0]
-            ]
-        elif self.rotation_state == 1:
-            return [
-                [1, 1, 1],
-                [0, 1, 0]
-            ]
-        elif self.rotation_state == 2:
-            return [
-                [0, 1],
-                [1, 1],
-                [0, 1]
-            ]
-        else:
-            return [
-                [0, 1, 0],
-                [1, 1, 1]
-            ]
-
-    def rotate_left(self):
-        return self.rotate_right()
+        super().__init__(T_STATES, color)
 
 
 class LTetronimo(Tetronimo):
     def __init__(self):
-        shape = [
-            [1, 0, 0],
-            [1, 1, 1]
-        ]
         color = "orange"
-        super().__init__(shape, color)
-
-    def rotate_right(self):
-        if self.rotation_state == 0:
-            return [
-                [1, 1],
-                [1, 0],
-                [1, 0]
-            ]
-        elif self.rotation_state == 1:
-            return [
-                [1, 1, 1],
-                [0, 0, 1]
-            ]
-        elif self.rotation_state == 2:
-            return [
-                [0, 1],
-                [0, 1],
-                [1, 1]
-            ]
-        else:
-            return [
-                [1, 0, 0],
-                [1, 1, 1]
-            ]
-
-    def rotate_left(self):
-        return self.rotate_right()
+        super().__init__(L_STATES, color)
 
 
 class JTetronimo(Tetronimo):
     def __init__(self):
-        shape = [
-            [0, 0, 1],
-            [1, 1, 1]
-        ]
         color = "blue"
-        super().__init__(shape, color)
-
-    def rotate_right(self):
-        if self.rotation_state == 0:
-            return [
-                [1, 0],
-                [1, 0],
-                [1, 1]
-            ]
-        elif self.rotation_state == 1:
-            return [
-                [1, 1, 1],
-                [1, 0, 0]
-            ]
-        elif self.rotation_state == 2:
-            return [
-                [1, 1],
-                [0, 1],
-                [0, 1]
-            ]
-        else:
-            return [
-                [0, 0, 1],
-                [1, 1, 1]
-            ]
-
-    def rotate_left(self):
-        return self.rotate_right()
+        super().__init__(J_STATES, color)
 
 
 class STetronimo(Tetronimo):
     def __init__(self):
-        shape = [
-            [0, 1, 1],
-            [1, 1, 0]
-        ]
         color = "green"
-        super().__init__(shape, color)
-
-    def rotate_right(self):
-        if self.rotation_state % 2 == 0:
-            return [
-                [1, 0],
-                [1, 1],
-                [0, 1]
-            ]
-        else:
-            return [
-                [0, 1, 1],
-                [1, 1, 0]
-            ]
-
-    def rotate_left(self):
-        return self.rotate_right()
+        super().__init__(S_STATES, color)
 
 
 class ZTetronimo(Tetronimo):
     def __init__(self):
-        shape = [
-            [1, 1, 0],
-            [0, 1, 1]
-        ]
         color = "red"
-        super().__init__(shape, color)
+        super().__init__(Z_STATES, color)
 
-    def rotate_right(self):
-        if self.rotation_state % 2 == 0:
-            return [
-                [0, 1],
-                [1, 1],
-                [1, 0]
-            ]
-        else:
-            return [
-                [1, 1, 0],
-                [0, 1, 1]
-            ]
 
-    def rotate_left(self):
-        return self.rotate_right()
+# Every piece type, in a fixed order so that seeded piece sequences are reproducible.
+PIECE_TYPES = (Itetronimo, OTetronimo, TTetronimo, LTetronimo, JTetronimo, STetronimo, ZTetronimo)
@@ -1,13 +1,89 @@
 # pytetris/main.py
+# Qt and the GUI are imported inside main() so argument handling, --help and the startup profile's first mark cost
+# no more than the standard library and the pure Python undo history defaults.
+import argparse
 import sys
-from PyQt6.QtWidgets import QApplication
-from gui.main_window import MainWindow
+import time
+
+from src.game import history
+
+
+class StartupProfile:
+    """
+    Records named phases of startup and reports how long each took.
+
+    Attributes:
+        marks (list): (name, perf_counter time) pairs, the first being the start.
+    """
+
+    def __init__(self):
+        self.marks = [('start', time.perf_counter())]
+
+    def mark(self, name):
+        """
+        Records the end of a phase.
+        :param name: (str) The phase that just finished.
+        :return: None
+        """
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self, file=sys.stderr):
+        """
+        Prints each phase's duration and the total.
+        :param file: Text file to print to.
+        :return: None
+        """
+        print("Startup profile:", file=file)
+        for (_, previous), (name, now) in zip(self.marks, self.marks[1:]):
+            print(f"  {name:<24}{(now - previous) * 1000:>9.1f} ms", file=file)
+        print(f"  {'total':<24}{(self.marks[-1][1] - self.marks[0][1]) * 1000:>9.1f} ms", file=file)
 
 
 def main():
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    parser = argparse.ArgumentParser(prog='pytetris')
+    parser.add_argument('--record-dir', metavar='DIR', help='Save a binary replay of every game to this directory.')
+    parser.add_argument('--practice', action='store_true', help='Practice mode: Backspace undoes placements.')
+    parser.add_argument('--history-depth', type=int, default=history.DEPTH, metavar='N',
+                        help=f'Placements practice mode can undo (default: {history.DEPTH}).')
+    parser.add_argument('--spectate', metavar='ADDRESS',
+                        help='Stream the game to spectators on HOST:PORT or unix:PATH; watch with '
+                             'python -m src.spectator ADDRESS.')
+    parser.add_argument('--board-width', type=int, default=10, metavar='N', help='Board width in cells (default: 10).')
+    parser.add_argument('--board-height', type=int, default=20, metavar='N',
+                        help='Board height in cells (default: 20).')
+    parser.add_argument('--cell-size', type=int, default=30, metavar='PX', help='Cell size in pixels (default: 30).')
+    parser.add_argument('--viewport-rows', type=int, default=20, metavar='N',
+                        help='Rows shown at once; taller boards scroll (default: 20).')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Report how long imports, window construction and the first paint took.')
+    args, qt_args = parser.parse_known_args()
+    profile = StartupProfile() if args.profile_startup else None
+
+    from PyQt6.QtWidgets import QApplication
+    if profile:
+        profile.mark('import PyQt6')
+    from gui.main_window import MainWindow
+    from gui.utils import on_first_paint
+    if profile:
+        profile.mark('import gui')
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if profile:
+        profile.mark('QApplication')
+    window = MainWindow(record_dir=args.record_dir, practice=args.practice, history_depth=args.history_depth,
+                        spectate=args.spectate, board_width=args.board_width, board_height=args.board_height,
+                        cell_size=args.cell_size, viewport_rows=args.viewport_rows)
+    if profile:
+        profile.mark('MainWindow')
+
+        def first_paint():
+            profile.mark('first paint')
+            profile.report()
+
+        on_first_paint(window, first_paint)
     window.show()
+    if profile:
+        profile.mark('show')
     sys.exit(app.exec())
 
 
@@ -0,0 +1,347 @@
+# pytetris/src/profiling.py
+# Frame time, logic tick and input latency histograms for diagnosing lag.
+#
+# Like tracing, call sites guard their timing with the profiler's flag, so a disabled profiler costs one attribute
+# check:
+#
+#     if profiler.enabled:
+#         start = time.perf_counter()
+#         ...
+#         profiler.record('paint', time.perf_counter() - start)
+#
+# The profiler is enabled by the GUI's overlay, or from the start when the PYTETRIS_PROFILE environment variable is
+# set.  When PYTETRIS_PROFILE_FILE is set, a snapshot is written there as JSON at exit.  Nothing here imports Qt.
+import atexit
+import json
+import os
+import time
+from collections import deque
+
+SUB_BUCKETS = 16  # Linear buckets per power of two, bounding the error of a recorded value to 1/16.
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def bucket_index(value):
+    """
+    Maps a non-negative integer to its histogram bucket.  Values below SUB_BUCKETS get a bucket each; above that,
+    every power of two is split into SUB_BUCKETS equal buckets.
+    :param value: (int) The value.
+    :return: (int) The bucket index.
+    """
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKETS.bit_length()
+    return SUB_BUCKETS * (shift + 1) + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_lower_bound(index):
+    """
+    Returns the smallest value that falls into a bucket.
+    :param index: (int) The bucket index.
+    :return: (int) The bucket's lower bound.
+    """
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+
+
+class Histogram:
+    """
+    A log-linear histogram of durations in the style of HdrHistogram: constant relative precision over any range,
+    constant time recording and a size that grows only with the range of recorded values.
+
+    Durations are recorded in seconds and stored as whole microseconds.
+
+    Attributes:
+        counts (dict): Sample count per bucket index.
+        count (int): Number of samples.
+        total (float): Sum of the samples in seconds.
+        min (float): Smallest sample in seconds, or None when empty.
+        max (float): Largest sample in seconds, or None when empty.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        """
+        Records one duration.
+        :param seconds: (float) The duration in seconds.
+        :return: None
+        """
+        index = bucket_index(max(int(seconds * 1e6), 0))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """
+        Adds another histogram's samples to this one.
+        :param other: (Histogram) The histogram to add.
+        :return: None
+        """
+        for index, count in tuple(other.counts.items()):  # A copy, as other may be recording on another thread
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, percent):
+        """
+        Returns the value below which the given percentage of samples fall, reported as the upper edge of its
+        bucket so it never understates a latency.
+        :param percent: (float) The percentile, 0 to 100.
+        :return: (float) The value in seconds, 0 when empty.
+        """
+        if not self.count:
+            return 0.0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(bucket_lower_bound(index + 1) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Summarizes the histogram in milliseconds.
+        :return: (dict) Count, mean, min, max, percentiles and the non-empty buckets as [lower bound, count] pairs.
+        """
+        if not self.count:
+            return {'count': 0}
+        result = {'count': self.count, 'mean': self.total / self.count * 1000, 'min': self.min * 1000,
+                  'max': self.max * 1000}
+        for percent in PERCENTILES:
+            result[f'p{percent:g}'] = self.percentile(percent) * 1000
+        result['buckets'] = [[bucket_lower_bound(index) / 1000, self.counts[index]] for index in sorted(self.counts)]
+        return result
+
+
+class RollingHistogram:
+    """
+    A histogram over a sliding time window, kept as a ring of per-slice histograms so old samples expire a slice at
+    a time without storing individual samples.
+
+    Attributes:
+        window (float): Length of the window in seconds.
+        slices (int): Number of slices the window is divided into.
+    """
+
+    def __init__(self, window=10.0, slices=10, time_source=time.perf_counter):
+        self.window = window
+        self.slices = slices
+        self.time_source = time_source
+        self._slice_length = window / slices
+        self._ring = deque()  # (slice start time, Histogram), oldest first
+
+    def _current(self, now):
+        """
+        Returns the histogram of the slice containing now, expiring slices that left the window.
+        """
+        ring = self._ring
+        while ring and ring[0][0] <= now - self.window:
+            ring.popleft()
+        if not ring or now - ring[-1][0] >= self._slice_length:
+            ring.append((now, Histogram()))
+        return ring[-1][1]
+
+    def record(self, seconds, now=None):
+        """
+        Records one duration.
+        :param seconds: (float) The duration in seconds.
+        :param now: (float) The current time from time_source, or None to read it.
+        :return: None
+        """
+        self._current(self.time_source() if now is None else now).record(seconds)
+
+    def merged(self, now=None):
+        """
+        Combines the slices still inside the window.
+        :param now: (float) The current time from time_source, or None to read it.
+        :return: (Histogram) The samples of the window.
+        """
+        now = self.time_source() if now is None else now
+        result = Histogram()
+        for start, histogram in tuple(self._ring):  # A copy, as samples may be recorded on another thread
+            if start > now - self.window:
+                result.merge(histogram)
+        return result
+
+    def clear(self):
+        """
+        Discards all samples.
+        :return: None
+        """
+        self._ring.clear()
+
+
+class Profiler:
+    """
+    Rolling histograms of paint time, frame interval, logic tick time and input latency, plus a frame rate.
+
+    Input latency runs from a key press to the end of the first paint that follows it.  Callers report inputs that
+    changed what is shown with begin_input(), and frame_painted() completes the measurement.
+
+    Logic ticks may be recorded from the game's worker thread while the GUI thread records paints and reads the
+    histograms.
+
+    Attributes:
+        enabled (bool): Whether call sites should record.
+        histograms (dict): RollingHistogram per metric name.
+    """
+
+    METRICS = ('paint', 'frame', 'tick', 'input_latency')
+
+    def __init__(self, window=10.0, time_source=time.perf_counter):
+        self.enabled = False
+        self.window = window
+        self.time_source = time_source
+        self.histograms = {name: RollingHistogram(window, time_source=time_source) for name in self.METRICS}
+        self._frames = deque()
+        self._last_frame = None
+        self._input_start = None
+
+    def enable(self):
+        """
+        Starts recording.
+        :return: None
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops recording, dropping any input still waiting for its paint.
+        :return: None
+        """
+        self.enabled = False
+        self._last_frame = None
+        self._input_start = None
+
+    def record(self, name, seconds):
+        """
+        Records a duration for one of the METRICS.
+        :param name: (str) The metric.
+        :param seconds: (float) The duration.
+        :return: None
+        """
+        self.histograms[name].record(seconds)
+
+    def begin_input(self, start=None):
+        """
+        Marks a key press that changed what is shown.  An earlier input still waiting for a paint keeps its start
+        time, since that paint shows both.
+        :param start: (float) When the key press was received, from time_source, or None for now.
+        :return: None
+        """
+        if self._input_start is None:
+            self._input_start = self.time_source() if start is None else start
+
+    def frame_painted(self, paint_start):
+        """
+        Records a finished paint: its duration, the interval since the previous one and any pending input latency.
+        :param paint_start: (float) When the paint began, from time_source.
+        :return: None
+        """
+        now = self.time_source()
+        histograms = self.histograms
+        histograms['paint'].record(now - paint_start, now)
+        if self._last_frame is not None:
+            histograms['frame'].record(paint_start - self._last_frame, now)
+        self._last_frame = paint_start
+        if self._input_start is not None:
+            histograms['input_latency'].record(now - self._input_start, now)
+            self._input_start = None
+        frames = self._frames
+        frames.append(now)
+        while frames[0] <= now - 1.0:
+            frames.popleft()
+
+    def fps(self):
+        """
+        Returns the number of frames painted in the last second.
+        :return: (int) Frames per second.
+        """
+        now = self.time_source()
+        return sum(1 for frame in self._frames if frame > now - 1.0)
+
+    def percentile(self, name, percent):
+        """
+        Returns a percentile of one metric over the window.
+        :param name: (str) The metric.
+        :param percent: (float) The percentile.
+        :return: (float) The value in seconds.
+        """
+        return self.histograms[name].merged().percentile(percent)
+
+    def snapshot(self):
+        """
+        Summarizes every metric over the window, in milliseconds.
+        :return: (dict) JSON serializable snapshot.
+        """
+        return {
+            'time': time.time(),
+            'window': self.window,
+            'fps': self.fps(),
+            'histograms': {name: histogram.merged().summary() for name, histogram in self.histograms.items()},
+        }
+
+    def export_json(self, destination, extra=None):
+        """
+        Writes a snapshot as JSON.
+        :param destination: A file path or a writable text file object.
+        :param extra: (dict) Additional values to include in the snapshot.
+        :return: (dict) The snapshot written.
+        """
+        snapshot = self.snapshot()
+        if extra:
+            snapshot.update(extra)
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, 'w') as file:
+                json.dump(snapshot, file, indent=2)
+        else:
+            json.dump(snapshot, destination, indent=2)
+        return snapshot
+
+    def clear(self):
+        """
+        Discards all samples.
+        :return: None
+        """
+        for histogram in self.histograms.values():
+            histogram.clear()
+        self._frames.clear()
+        self._last_frame = None
+        self._input_start = None
+
+
+profiler = Profiler()
+
+
+def configure_from_environment(environ=os.environ):
+    """
+    Enables the profiler when PYTETRIS_PROFILE is set and schedules a snapshot to PYTETRIS_PROFILE_FILE at exit.
+    :param environ: (dict) The environment to read.
+    :return: None
+    """
+    if environ.get('PYTETRIS_PROFILE', '').strip() not in ('', '0'):
+        profiler.enable()
+    path = environ.get('PYTETRIS_PROFILE_FILE')
+    if path:
+        profiler.enable()
+        atexit.register(profiler.export_json, path)
+
+
+configure_from_environment()
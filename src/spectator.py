@@ -0,0 +1,371 @@
+# pytetris/src/spectator.py
+# Streams a running game to local spectators over TCP or a Unix socket.
+#
+# The game thread calls SpectatorServer.publish(engine, tick) once per frame.  It diffs the engine against what it
+# last published and hands a small delta to an asyncio loop running in a background thread, which batches whatever
+# has queued up and writes it to every client.  Messages are JSON lines:
+#
+#     {"type": "full", "tick": 0, "width": 10, "height": 20, "rows": [0, ...], "piece": [kind, rotation, x, y],
+#      "score": 0, "lines": 0, "level": 1, "game_over": false}
+#     {"type": "delta", "tick": 5, "rows": [[19, 1755]], "piece": [kind, rotation, x, y], "score": 100}
+#
+# Rows are packed 3-bit cell codes as in src.game.snapshot, and a delta only carries the rows and fields that
+# changed.  A client first receives a full message, then deltas.  A client whose bounded queue overflows has its
+# backlog dropped and is sent a fresh full message instead, so a slow reader never delays the game or other clients.
+#
+# Usage: python -m src.spectator ADDRESS   (ADDRESS is HOST:PORT or unix:PATH)
+import asyncio
+import json
+import sys
+import threading
+
+from src.game.snapshot import decode_row, encode_row
+from src.game.tetronimo import PIECE_TYPES
+
+FIELDS = ('piece', 'score', 'lines', 'level', 'game_over')
+
+
+def parse_address(address):
+    """
+    Parses a spectator address.
+    :param address: (str) HOST:PORT, :PORT or unix:PATH.
+    :return: (tuple) ('unix', path) or ('tcp', host, port).
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return 'tcp', host or '127.0.0.1', int(port)
+
+
+class DeltaEncoder:
+    """
+    Turns successive engine states into a full message followed by deltas of what changed.
+
+    Engine rows are immutable tuples that are only replaced when they change, so unchanged rows are skipped with an
+    identity check and only replaced rows are packed and compared.
+    """
+
+    def __init__(self):
+        self._grid = None
+        self._codes = None
+        self._fields = None
+
+    def reset(self):
+        """
+        Forgets the published state, so the next encode() returns a full message.
+        :return: None
+        """
+        self._grid = None
+
+    @staticmethod
+    def fields(engine):
+        """
+        Returns the non-cell values a spectator is sent.
+        :param engine: (GameEngine) The engine.
+        :return: (dict) Values keyed by FIELDS.
+        """
+        piece = engine.active_piece
+        return {
+            'piece': None if piece is None else [PIECE_TYPES.index(type(piece)), piece.rotation_state,
+                                                 piece.position[0], piece.position[1]],
+            'score': engine.score,
+            'lines': engine.lines_cleared,
+            'level': engine.level,
+            'game_over': engine.is_game_over,
+        }
+
+    def encode(self, engine, tick):
+        """
+        Encodes the engine's state relative to the previously encoded one.
+        :param engine: (GameEngine) The engine.
+        :param tick: (int) The game's logic tick.
+        :return: (dict) A full or delta message, or None when nothing changed.
+        """
+        grid = engine.grid
+        fields = self.fields(engine)
+        if self._grid is None or len(grid) != len(self._grid):
+            self._grid = list(grid)
+            self._codes = [encode_row(row) for row in grid]
+            self._fields = fields
+            message = {'type': 'full', 'tick': tick, 'width': engine.board_width, 'height': engine.board_height,
+                       'rows': list(self._codes)}
+            message.update(fields)
+            return message
+        changed_rows = []
+        previous = self._grid
+        codes = self._codes
+        for y, row in enumerate(grid):
+            if row is not previous[y]:
+                previous[y] = row
+                code = encode_row(row)
+                if code != codes[y]:
+                    codes[y] = code
+                    changed_rows.append([y, code])
+        message = {}
+        for key, value in fields.items():
+            if self._fields[key] != value:
+                message[key] = value
+        self._fields = fields
+        if changed_rows:
+            message['rows'] = changed_rows
+        if not message:
+            return None
+        message['type'] = 'delta'
+        message['tick'] = tick
+        return message
+
+
+def apply_message(state, message):
+    """
+    Applies a full or delta message to a spectator's copy of the game.
+    :param state: (dict) The copy, empty before the first full message.  Updated in place.
+    :param message: (dict) The message.
+    :return: (dict) The updated copy.
+    """
+    if message['type'] == 'full':
+        state.clear()
+        state.update(message)
+        state['rows'] = list(message['rows'])
+    elif state:
+        for y, code in message.get('rows', ()):
+            state['rows'][y] = code
+        for key in FIELDS + ('tick',):
+            if key in message:
+                state[key] = message[key]
+    return state
+
+
+class _Client:
+    """
+    One connected spectator: its writer, its bounded queue of batches and whether it still waits for its first full
+    message.
+    """
+
+    def __init__(self, writer, max_queue):
+        self.writer = writer
+        self.queue = asyncio.Queue(max_queue)
+        self.waiting = False
+
+
+class SpectatorServer:
+    """
+    An asyncio server in a background thread that broadcasts a game to spectator clients.
+
+    publish() is called from the game thread.  Messages are collected in a pending list and flushed by a single
+    scheduled callback, so a burst of frames is written to each client as one batch.  The server keeps its own copy
+    of the game, updated from the published messages, to greet new clients and resynchronize slow ones with a full
+    message without touching the engine from its thread.
+
+    Attributes:
+        address (str): HOST:PORT or unix:PATH to listen on.  A port of 0 picks a free port.
+        max_queue (int): Batches a client may have waiting before it is resynchronized.
+        bound (str): The address actually listened on, once started.
+        clients (int): Number of connected clients.
+    """
+
+    def __init__(self, address='127.0.0.1:0', max_queue=64):
+        self.address = address
+        self.max_queue = max_queue
+        self.bound = None
+        self.encoder = DeltaEncoder()
+        self._state = {}
+        self._clients = set()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def start(self):
+        """
+        Starts listening in a daemon thread.
+        :return: (str) The bound address.
+        """
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._listen())
+            except OSError as error:
+                errors.append(error)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='spectator-server', daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self.bound
+
+    async def _listen(self):
+        kind = parse_address(self.address)
+        if kind[0] == 'unix':
+            self._server = await asyncio.start_unix_server(self._connected, path=kind[1])
+            self.bound = self.address
+        else:
+            self._server = await asyncio.start_server(self._connected, kind[1], kind[2])
+            host, port = self._server.sockets[0].getsockname()[:2]
+            self.bound = f"{host}:{port}"
+
+    def stop(self):
+        """
+        Closes every connection and stops the server thread.
+        :return: None
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+
+        async def shutdown():
+            self._server.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop)
+        self._thread.join(timeout=2)
+
+    def publish(self, engine, tick):
+        """
+        Sends the engine's changes since the last call to every client.  Call from the game thread once started.
+        :param engine: (GameEngine) The engine.
+        :param tick: (int) The game's logic tick.
+        :return: (bool) True if anything changed.
+        """
+        if self._loop is None:
+            return False
+        message = self.encoder.encode(engine, tick)
+        if message is None:
+            return False
+        with self._lock:
+            self._pending.append(message)
+            if self._flush_scheduled:
+                return True
+            self._flush_scheduled = True
+        self._loop.call_soon_threadsafe(self._flush)
+        return True
+
+    def _full_message(self):
+        return (json.dumps(self._state, separators=(',', ':')) + '\n').encode()
+
+    def _flush(self):
+        """
+        Writes the pending messages to every client as one batch, resynchronizing clients whose queue is full.
+        """
+        with self._lock:
+            messages = self._pending
+            self._pending = []
+            self._flush_scheduled = False
+        for message in messages:
+            apply_message(self._state, message)
+        if not self._clients:
+            return
+        batch = ''.join(json.dumps(message, separators=(',', ':')) + '\n' for message in messages).encode()
+        full = None
+        for client in self._clients:
+            if client.waiting:
+                client.waiting = False
+                if full is None:
+                    full = self._full_message()
+                client.queue.put_nowait(full)
+                continue
+            try:
+                client.queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop its backlog and send it the current state instead.
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                if full is None:
+                    full = self._full_message()
+                client.queue.put_nowait(full)
+
+    async def _connected(self, reader, writer):
+        client = _Client(writer, self.max_queue)
+        if self._state:
+            client.queue.put_nowait(self._full_message())
+        else:
+            client.waiting = True  # Nothing published yet; the first flush sends the full state.
+        self._clients.add(client)
+        try:
+            while True:
+                data = await client.queue.get()
+                writer.write(data)
+                await writer.drain()
+        except (OSError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+
+def render(state):
+    """
+    Renders a spectator's copy of the game as text.
+    :param state: (dict) The copy built by apply_message().
+    :return: (str) The board, one line per row, followed by the score line.
+    """
+    width = state['width']
+    cells = [[' ' if color is None else '#' for color in decode_row(code, width)[0]] for code in state['rows']]
+    piece = state.get('piece')
+    if piece is not None:
+        kind, rotation, x, y = piece
+        for dx, dy in PIECE_TYPES[kind]().states[rotation].cells:
+            if 0 <= y + dy < len(cells) and 0 <= x + dx < width:
+                cells[y + dy][x + dx] = '@'
+    lines = ['|' + ''.join(row) + '|' for row in cells]
+    lines.append('+' + '-' * width + '+')
+    lines.append(f"score {state['score']}  lines {state['lines']}  level {state['level']}  tick {state['tick']}"
+                 + ("  GAME OVER" if state['game_over'] else ''))
+    return '\n'.join(lines)
+
+
+async def watch(address, output=sys.stdout):
+    """
+    Connects to a spectator server and redraws the board on every message.
+    :param address: (str) HOST:PORT or unix:PATH.
+    :param output: Text file to draw to.
+    :return: None
+    """
+    kind = parse_address(address)
+    if kind[0] == 'unix':
+        reader, writer = await asyncio.open_unix_connection(kind[1])
+    else:
+        reader, writer = await asyncio.open_connection(kind[1], kind[2])
+    state = {}
+    try:
+        while line := await reader.readline():
+            apply_message(state, json.loads(line))
+            if state:
+                output.write('\x1b[H\x1b[2J' + render(state) + '\n')
+                output.flush()
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: python -m src.spectator ADDRESS", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(watch(args[0]))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+# pytetris/src/tournament.py
+# Runs many independent seeded bot games across worker processes and reports score, line and duration statistics.
+#
+# Usage: python -m src.tournament [--games N] [--workers N] [--config FILE] [--json FILE]
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.game import replay
+from src.game.bot import DEFAULT_WEIGHTS, PlacementSearch, Weights, placement_inputs
+from src.game.engine import GameEngine
+
+Config = namedtuple('Config', ['name', 'board_width', 'board_height', 'gravity', 'depth', 'weights', 'max_pieces',
+                               'piece_mode'])
+Config.__doc__ = """
+One tournament configuration.
+
+Attributes:
+    name (str): Label used in the report.
+    board_width (int): Width of the board in cells.
+    board_height (int): Height of the board in cells.
+    gravity (float): Rows the piece falls per bot input.  0 lets the bot move freely before its hard drop.
+    depth (int): Bot search depth, the current piece included.
+    weights (Weights): Bot heuristic weights.
+    max_pieces (int): Pieces after which a game is stopped, or None for no limit.
+    piece_mode (str): Piece source mode, 'bag' or 'random'.
+"""
+DEFAULT_CONFIG = Config('default', 10, 20, 0.0, 1, DEFAULT_WEIGHTS, 1000, 'bag')
+
+METRICS = ('score', 'lines', 'pieces', 'duration')
+
+
+def config_from_dict(values):
+    """
+    Builds a Config from a JSON object, using the defaults for missing keys.
+    :param values: (dict) Configuration values; 'weights' may be a partial dict of Weights fields.
+    :return: (Config) The configuration.
+    """
+    values = dict(values)
+    weights = DEFAULT_WEIGHTS._replace(**values.pop('weights', {}))
+    unknown = set(values) - set(Config._fields)
+    if unknown:
+        raise ValueError(f"Unknown configuration keys: {', '.join(sorted(unknown))}")
+    return DEFAULT_CONFIG._replace(weights=weights, **values)
+
+
+def play_game(config, seed):
+    """
+    Plays one bot game to top-out or the piece limit.
+    :param config: (Config) The configuration.
+    :param seed: (int) Seed of the game's piece sequence.
+    :return: (dict) The game's seed, score, lines, pieces, duration and whether it topped out.
+    """
+    start = time.perf_counter()
+    engine = GameEngine(config.board_width, config.board_height, config.piece_mode)
+    engine.reset_game(seed)
+    search = PlacementSearch(Weights(*config.weights), depth=config.depth, time_budget=float('inf'))
+    gravity = 0.0
+    while not engine.is_game_over and (config.max_pieces is None or engine.piece_count <= config.max_pieces):
+        placement = search.choose(engine)
+        if placement is None:
+            break
+        piece_count = engine.piece_count
+        for code in placement_inputs(engine, placement):
+            replay.apply_input(engine, code)
+            gravity += config.gravity
+            cells = int(gravity)
+            gravity -= cells
+            if engine.piece_count == piece_count:
+                engine.fall(cells)
+            if engine.piece_count != piece_count:
+                # The piece locked early under gravity; the rest of the plan no longer applies.
+                break
+    return {
+        'seed': seed,
+        'score': engine.score,
+        'lines': engine.lines_cleared,
+        'pieces': engine.piece_count - 1,  # The last spawned piece was never placed.
+        'duration': time.perf_counter() - start,
+        'topped_out': engine.is_game_over,
+    }
+
+
+def run_chunk(config, seeds):
+    """
+    Plays a chunk of games in a worker process.
+    :param config: (Config) The configuration.
+    :param seeds: (range) Seeds of the games to play.
+    :return: (tuple) The configuration name and a list of per-game results.
+    """
+    return config.name, [play_game(config, seed) for seed in seeds]
+
+
+def summarize(values):
+    """
+    Summarizes a distribution.
+    :param values: (list) The samples.
+    :return: (dict) Count, mean, standard deviation, min, p50, p90, p99 and max.
+    """
+    ordered = sorted(values)
+    count = len(ordered)
+    if count == 0:
+        return {'count': 0}
+    mean = sum(ordered) / count
+    variance = sum((value - mean) ** 2 for value in ordered) / count
+
+    def rank(fraction):
+        return ordered[min(count - 1, max(0, math.ceil(fraction * count) - 1))]
+
+    return {'count': count, 'mean': mean, 'stdev': math.sqrt(variance), 'min': ordered[0], 'p50': rank(0.50),
+            'p90': rank(0.90), 'p99': rank(0.99), 'max': ordered[-1]}
+
+
+def run_tournament(configs, games, workers=None, chunk_size=25, base_seed=0, progress=None):
+    """
+    Plays games for every configuration across a process pool.  Game i of every configuration uses seed
+    base_seed + i, so configurations are compared on the same piece sequences.
+    :param configs: (list) Config entries.
+    :param games: (int) Games per configuration.
+    :param workers: (int) Worker processes, or None for one per core.
+    :param chunk_size: (int) Games per task sent to a worker.
+    :param base_seed: (int) Seed of the first game.
+    :param progress: Callable receiving (games finished, games total) as chunks complete, or None.
+    :return: (dict) Per-game results keyed by configuration name.
+    """
+    results = {config.name: [] for config in configs}
+    total = games * len(configs)
+    finished = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_chunk, config, range(start, min(start + chunk_size, base_seed + games)))
+                   for config in configs
+                   for start in range(base_seed, base_seed + games, chunk_size)]
+        for future in as_completed(futures):
+            name, chunk = future.result()
+            results[name].extend(chunk)
+            finished += len(chunk)
+            if progress is not None:
+                progress(finished, total)
+    return results
+
+
+def build_report(results, elapsed):
+    """
+    Aggregates per-game results into distributions.
+    :param results: (dict) Per-game results keyed by configuration name.
+    :param elapsed: (float) Wall clock seconds the tournament took.
+    :return: (dict) The report.
+    """
+    report = {'elapsed': elapsed, 'games': sum(len(games) for games in results.values()), 'configs': {}}
+    for name, games in results.items():
+        entry = {metric: summarize([game[metric] for game in games]) for metric in METRICS}
+        entry['topped_out'] = sum(game['topped_out'] for game in games)
+        report['configs'][name] = entry
+    return report
+
+
+def format_report(report):
+    """
+    Formats a report as text.
+    :param report: (dict) The report from build_report.
+    :return: (str) The formatted report.
+    """
+    rate = report['games'] / report['elapsed'] if report['elapsed'] else float('inf')
+    lines = [f"{report['games']} games in {report['elapsed']:.1f}s ({rate:.1f} games/sec)"]
+    for name, entry in report['configs'].items():
+        lines.append('')
+        lines.append(f"{name}: {entry['score']['count']} games, {entry['topped_out']} topped out")
+        lines.append(f"  {'metric':<10}{'mean':>12}{'stdev':>12}{'min':>12}{'p50':>12}{'p90':>12}{'p99':>12}"
+                     f"{'max':>12}")
+        for metric in METRICS:
+            stats = entry[metric]
+            lines.append(f"  {metric:<10}" + ''.join(f"{stats[key]:>12.4g}" for key in
+                                                    ('mean', 'stdev', 'min', 'p50', 'p90', 'p99', 'max')))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.tournament',
+                                     description='Play many seeded bot games across all cores and report statistics.')
+    parser.add_argument('--games', type=int, default=1000, help='Games per configuration (default: 1000).')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per core).')
+    parser.add_argument('--chunk-size', type=int, default=25, help='Games per worker task (default: 25).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first game (default: 0).')
+    parser.add_argument('--config', metavar='FILE',
+                        help='JSON file with a list of configurations, e.g. [{"name": "deep", "depth": 2}]. '
+                             f'Keys: {", ".join(Config._fields)}.')
+    parser.add_argument('--json', metavar='FILE', help='Also write the report as JSON.')
+    parser.add_argument('--quiet', action='store_true', help='Do not report progress.')
+    args = parser.parse_args(argv)
+
+    if args.config:
+        with open(args.config) as file:
+            configs = [config_from_dict(values) for values in json.load(file)]
+    else:
+        configs = [DEFAULT_CONFIG]
+    if len({config.name for config in configs}) != len(configs):
+        parser.error("configuration names must be unique")
+
+    def progress(finished, total):
+        print(f"\r{finished}/{total} games", end='', file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    results = run_tournament(configs, args.games, args.workers or os.cpu_count(), args.chunk_size, args.seed,
+                             None if args.quiet else progress)
+    if not args.quiet:
+        print(file=sys.stderr)
+    report = build_report(results, time.perf_counter() - start)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# pytetris/src/tracing.py
+# Lightweight structured tracing for diagnostics.
+#
+# Call sites guard every event with the category flag, so a disabled category costs one attribute check and no
+# formatting or allocation:
+#
+#     if tracer.collision:
+#         tracer.emit('collision', 'boundary', x=x, y=y)
+#
+# Categories are enabled from the PYTETRIS_TRACE environment variable (a comma separated list, or "all") or with
+# tracer.enable().  Events are kept in a bounded in-memory ring buffer and can be exported as JSON lines, either on
+# demand or at exit when PYTETRIS_TRACE_FILE is set.
+import atexit
+import json
+import os
+import time
+from collections import deque
+
+CATEGORIES = ('render', 'collision', 'lock', 'layout', 'game')
+
+
+class Tracer:
+    """
+    Records structured trace events for enabled categories into a ring buffer.
+
+    Attributes:
+        events (deque): The most recent events, oldest first.  Each event is a dict with the time in seconds since
+            the tracer was created ('t'), its category ('cat'), its name ('event') and any extra fields.
+        render, collision, lock, layout, game (bool): Whether each category is enabled.
+    """
+
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+        self._start = time.perf_counter()
+        for category in CATEGORIES:
+            setattr(self, category, False)
+
+    def enable(self, *categories):
+        """
+        Enables the given categories, or every category when none are given.
+        :param categories: (str) Category names.
+        :return: None
+        """
+        for category in categories or CATEGORIES:
+            if category not in CATEGORIES:
+                raise ValueError(f"Unknown trace category: {category}")
+            setattr(self, category, True)
+
+    def disable(self, *categories):
+        """
+        Disables the given categories, or every category when none are given.
+        :param categories: (str) Category names.
+        :return: None
+        """
+        for category in categories or CATEGORIES:
+            if category not in CATEGORIES:
+                raise ValueError(f"Unknown trace category: {category}")
+            setattr(self, category, False)
+
+    @property
+    def enabled(self):
+        """
+        Returns whether any category is enabled.
+        """
+        return any(getattr(self, category) for category in CATEGORIES)
+
+    def emit(self, category, event, **fields):
+        """
+        Records an event.  Callers should check the category flag first.
+        :param category: (str) The event's category.
+        :param event: (str) The event name.
+        :param fields: Extra JSON serializable values describing the event.
+        :return: None
+        """
+        fields['t'] = time.perf_counter() - self._start
+        fields['cat'] = category
+        fields['event'] = event
+        self.events.append(fields)
+
+    def clear(self):
+        """
+        Discards all recorded events.
+        :return: None
+        """
+        self.events.clear()
+
+    def export_jsonl(self, destination):
+        """
+        Writes the recorded events as JSON lines.
+        :param destination: A file path or a writable text file object.
+        :return: (int) The number of events written.
+        """
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, 'w') as file:
+                return self.export_jsonl(file)
+        for event in self.events:
+            destination.write(json.dumps(event, default=str))
+            destination.write('\n')
+        return len(self.events)
+
+
+tracer = Tracer()
+
+
+def configure_from_environment(environ=os.environ):
+    """
+    Enables categories listed in PYTETRIS_TRACE and schedules an export to PYTETRIS_TRACE_FILE at exit.
+    :param environ: (dict) The environment to read.
+    :return: None
+    """
+    categories = environ.get('PYTETRIS_TRACE', '').strip()
+    if categories:
+        if categories == 'all':
+            tracer.enable()
+        else:
+            tracer.enable(*(name.strip() for name in categories.split(',') if name.strip()))
+    path = environ.get('PYTETRIS_TRACE_FILE')
+    if path:
+        atexit.register(tracer.export_jsonl, path)
+
+
+configure_from_environment()
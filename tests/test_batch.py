@@ -0,0 +1,92 @@
+# pytetris/tests/test_batch.py
+import unittest
+from collections import deque
+
+import numpy as np
+
+from src.game import batch, replay
+from src.game.batch import BatchEngine, PIECE_COLORS, PIECE_TYPES
+from src.game.engine import GameEngine
+
+# The GameEngine input matching each batch action, which the batch follows with a row of gravity unless it drops.
+_INPUTS = {batch.LEFT: replay.LEFT, batch.RIGHT: replay.RIGHT, batch.ROTATE_RIGHT: replay.ROTATE_RIGHT,
+           batch.ROTATE_LEFT: replay.ROTATE_LEFT, batch.DOWN: replay.DOWN, batch.DROP: replay.HARD_DROP}
+_CODES = {None: 0, **{color: code + 1 for code, color in enumerate(PIECE_COLORS)}}
+
+
+class _RecordingBatch(BatchEngine):
+    """
+    A BatchEngine that keeps every piece it deals, per board, for a GameEngine to play in the same order.
+    """
+
+    def __init__(self, num_boards, *args, **kwargs):
+        self.dealt = [deque() for _ in range(num_boards)]
+        super().__init__(num_boards, *args, **kwargs)
+
+    def _deal(self, idx):
+        kinds = super()._deal(idx)
+        for board, kind in zip(idx, kinds):
+            self.dealt[board].append(int(kind))
+        return kinds
+
+
+class _BatchPieces:
+    """
+    A GameEngine piece source dealing the pieces one board of a _RecordingBatch dealt.  The batch is stepped first,
+    so it has always dealt the pieces the engine asks for.
+    """
+
+    def __init__(self, batch_engine, board):
+        self.dealt = batch_engine.dealt[board]
+
+    def seed(self, seed):
+        pass
+
+    def next(self):
+        return self.dealt.popleft()
+
+
+class BatchEngineTest(unittest.TestCase):
+
+    def assert_same(self, batch_engine, engines, step):
+        for board, engine in enumerate(engines):
+            where = 'board %d, step %d' % (board, step)
+            grid = np.array([[_CODES[color] for color in row] for row in engine.grid], dtype=np.uint8)
+            np.testing.assert_array_equal(batch_engine.boards[board], grid, err_msg=where)
+            self.assertEqual(batch_engine.score[board], engine.score, where)
+            self.assertEqual(batch_engine.lines_cleared[board], engine.lines_cleared, where)
+            self.assertEqual(batch_engine.done[board], engine.is_game_over, where)
+            if not engine.is_game_over:
+                piece = engine.active_piece
+                self.assertEqual(tuple(batch_engine.pieces[board]),
+                                 (PIECE_TYPES.index(type(piece)), piece.rotation_state) + piece.position, where)
+
+    def test_follows_game_engine_rules(self):
+        # A four column board fills rows often and tops out within a few hundred steps.
+        seeds = 30
+        batch_engine = _RecordingBatch(seeds, board_width=4, board_height=12, seed=0)
+        engines = []
+        for board in range(seeds):
+            engine = GameEngine(4, 12)
+            engine.pieces = _BatchPieces(batch_engine, board)
+            engine.reset_game(board)
+            engines.append(engine)
+        rng = np.random.default_rng(0)
+        self.assert_same(batch_engine, engines, 0)
+        for step in range(1, 400):
+            actions = rng.choice(7, size=seeds, p=(0.1, 0.15, 0.15, 0.15, 0.1, 0.15, 0.2))
+            batch_engine.step(actions)
+            for engine, action in zip(engines, actions):
+                if engine.is_game_over:
+                    continue
+                if action in _INPUTS:
+                    replay.apply_input(engine, _INPUTS[action])
+                if action != batch.DROP:
+                    engine.move_piece_down()
+            self.assert_same(batch_engine, engines, step)
+        self.assertGreater(batch_engine.lines_cleared.sum(), 0)
+        self.assertTrue(batch_engine.done.any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# pytetris/tests/test_bot.py
+import random
+import time
+import unittest
+
+from src.game import replay
+from src.game.bot import PlacementSearch, placement_inputs
+from src.game.engine import GameEngine
+
+
+class PlacementSearchTest(unittest.TestCase):
+
+    def play(self, seed, moves):
+        """
+        Plays bot placements after first moving each piece with random inputs, checking that every placement
+        leaves the board the search predicted.
+        """
+        rng = random.Random(seed)
+        engine = GameEngine()
+        engine.reset_game(seed)
+        search = PlacementSearch(depth=1)
+        while not engine.is_game_over and engine.piece_count < 60:
+            piece_count = engine.piece_count
+            for _ in range(moves):
+                replay.apply_input(engine, rng.choice((replay.LEFT, replay.RIGHT, replay.ROTATE_RIGHT,
+                                                       replay.ROTATE_LEFT, replay.GRAVITY)))
+            if engine.piece_count != piece_count:
+                continue
+            placement = search.choose(engine)
+            if placement is None:
+                break
+            for code in placement_inputs(engine, placement):
+                replay.apply_input(engine, code)
+            self.assertEqual(tuple(engine.rows), placement.rows)
+
+    def test_placements_from_spawn_land_where_predicted(self):
+        for seed in range(5):
+            self.play(seed, 0)
+
+    def test_placements_after_gravity_land_where_predicted(self):
+        for seed in range(5):
+            self.play(seed, 6)
+
+    def test_lookahead_stops_at_the_time_budget(self):
+        engine = GameEngine()
+        engine.reset_game(1)
+        search = PlacementSearch(depth=4, time_budget=0.005)
+        start = time.perf_counter()
+        self.assertIsNotNone(search.choose(engine))
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
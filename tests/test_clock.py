@@ -0,0 +1,92 @@
+# pytetris/tests/test_clock.py
+import unittest
+
+from src.game.clock import GameClock, MAX_GRAVITY, gravity_for_level
+
+
+class FakeTime:
+    """
+    A time source that only moves when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _clock(**kwargs):
+    # A step of a quarter second keeps the arithmetic exact.
+    time_source = FakeTime()
+    return GameClock(step=0.25, time_source=time_source, **kwargs), time_source
+
+
+class GameClockTest(unittest.TestCase):
+
+    def test_stopped_clock_runs_no_ticks(self):
+        clock, time_source = _clock()
+        time_source.now = 5.0
+        self.assertEqual(clock.advance(), 0)
+
+    def test_remainder_carries_over(self):
+        clock, time_source = _clock()
+        clock.start()
+        time_source.now = 0.375
+        self.assertEqual(clock.advance(), 1)
+        time_source.now = 0.5
+        self.assertEqual(clock.advance(), 1)  # The leftover eighth plus this eighth make a whole step.
+        self.assertEqual(clock.ticks, 2)
+
+    def test_catch_up_runs_late_ticks_up_to_the_limit(self):
+        clock, time_source = _clock(max_catch_up=4)
+        clock.start()
+        time_source.now = 0.75
+        self.assertEqual(clock.advance(), 3)
+        self.assertEqual(clock.dropped_ticks, 0)
+
+    def test_catch_up_drops_ticks_beyond_the_limit(self):
+        clock, time_source = _clock(max_catch_up=4)
+        clock.start()
+        time_source.now = 10.0
+        self.assertEqual(clock.advance(), 4)
+        self.assertEqual(clock.dropped_ticks, 36)
+        self.assertEqual(clock.ticks, 4)
+        time_source.now = 10.25
+        self.assertEqual(clock.advance(), 1)  # The dropped time is not replayed later.
+
+    def test_pause_credits_due_ticks_and_skips_paused_time(self):
+        clock, time_source = _clock()
+        clock.start()
+        time_source.now = 0.625
+        self.assertEqual(clock.pause(), 2)
+        time_source.now = 100.0
+        self.assertEqual(clock.advance(), 0)
+        clock.start()
+        time_source.now = 100.125
+        self.assertEqual(clock.advance(), 1)  # The eighth kept through the pause completes a step.
+        self.assertEqual(clock.elapsed, 0.75)
+
+    def test_gravity_accumulates_whole_cells(self):
+        clock, _ = _clock(gravity=0.5)
+        self.assertEqual([clock.tick() for _ in range(4)], [0, 1, 0, 1])
+        clock.gravity = 2.5
+        self.assertEqual([clock.tick() for _ in range(2)], [2, 3])
+
+    def test_reset_clears_counts(self):
+        clock, time_source = _clock(max_catch_up=1)
+        clock.start()
+        time_source.now = 1.0
+        clock.advance()
+        clock.reset()
+        self.assertEqual((clock.ticks, clock.dropped_ticks, clock.is_running), (0, 0, False))
+        self.assertEqual(clock.jitter()['count'], 0)
+
+    def test_gravity_for_level(self):
+        self.assertLess(gravity_for_level(1), gravity_for_level(2))
+        self.assertEqual(gravity_for_level(100), MAX_GRAVITY)
+        self.assertAlmostEqual(gravity_for_level(1, step=2 / 60), 2 * gravity_for_level(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# pytetris/tests/test_env.py
+import unittest
+
+import numpy as np
+
+from src.game.batch import PIECE_TYPES
+from src.game.env import DROP, NOOP, PLACE, TetrisEnv, VectorEnv
+from src.game.tetronimo import Itetronimo
+
+I_PIECE = PIECE_TYPES.index(Itetronimo)
+
+
+def _leave_a_gap_for_i(batch, board):
+    """
+    Fills the bottom row of a board except four cells, and makes the active piece a flat I.
+    """
+    batch.boards[board, -1] = 1
+    batch.boards[board, -1, 2:6] = 0
+    batch.kind[board] = I_PIECE
+    batch.rotation[board] = 0
+
+
+class TetrisEnvTest(unittest.TestCase):
+
+    def test_reset_and_step_shapes_and_types(self):
+        env = TetrisEnv(board_width=8, board_height=12)
+        observation = env.reset(3)
+        self.assertEqual((observation.board.shape, observation.board.dtype), ((12, 8), np.uint8))
+        self.assertEqual((observation.piece.shape, observation.piece.dtype), ((4,), np.int64))
+        self.assertFalse(observation.board.any())
+        self.assertEqual(env.num_actions, PLACE + 4 * 8)
+        observation, reward, done, info = env.step(NOOP)
+        self.assertEqual(observation.board.shape, (12, 8))
+        self.assertEqual((type(reward), type(done)), (int, bool))
+        self.assertEqual(info, {'score': 0, 'lines_cleared': 0})
+
+    def test_observation_is_a_view_of_the_batch(self):
+        env = TetrisEnv()
+        observation = env.reset(0)
+        self.assertTrue(np.shares_memory(observation.board, env.batch.boards))
+        self.assertTrue(np.shares_memory(observation.piece, env.batch.pieces))
+        step_observation = env.step(DROP)[0]
+        self.assertIs(step_observation.board, observation.board)
+        self.assertTrue(observation.board.any())  # The view already shows the dropped piece.
+
+    def test_reward_is_the_lines_cleared(self):
+        env = TetrisEnv()
+        env.reset(0)
+        _leave_a_gap_for_i(env.batch, 0)
+        _, reward, done, info = env.step(env.placement_action(0, 2))
+        self.assertEqual((reward, done), (1, False))
+        self.assertEqual(info, {'score': 100, 'lines_cleared': 1})
+        self.assertFalse(env.observation.board[-1].any())
+
+    def test_step_batch_stops_when_the_game_ends(self):
+        env = TetrisEnv(board_width=4, board_height=6)
+        env.reset(0)
+        _, _, done, info = env.step_batch([DROP] * 100)
+        self.assertTrue(done)
+        self.assertLess(info['steps'], 100)
+        board = env.observation.board.copy()
+        _, reward, done, info = env.step_batch([DROP] * 10)
+        self.assertEqual((reward, done, info['steps']), (0, True, 0))
+        np.testing.assert_array_equal(env.observation.board, board)
+
+    def test_actions_out_of_range_are_rejected(self):
+        env = TetrisEnv()
+        with self.assertRaises(ValueError):
+            env.step(env.num_actions)
+
+
+class VectorEnvTest(unittest.TestCase):
+
+    def test_reset_and_step_shapes_and_types(self):
+        env = VectorEnv(5, board_width=6, board_height=10)
+        observation = env.reset(0)
+        self.assertEqual((observation.board.shape, observation.board.dtype), ((5, 10, 6), np.uint8))
+        self.assertEqual((observation.piece.shape, observation.piece.dtype), ((5, 4), np.int64))
+        observation, rewards, dones, info = env.step(np.full(5, NOOP))
+        self.assertEqual((rewards.shape, rewards.dtype), ((5,), np.int64))
+        self.assertEqual((dones.shape, dones.dtype), ((5,), bool))
+        self.assertEqual(info['score'].shape, (5,))
+
+    def test_observation_is_a_view_of_the_batch(self):
+        env = VectorEnv(3)
+        observation = env.reset(0)
+        self.assertIs(observation.board, env.batch.boards)
+        self.assertIs(observation.piece, env.batch.pieces)
+        self.assertIs(env.step(np.full(3, DROP))[0], observation)
+
+    def test_rewards_per_environment(self):
+        env = VectorEnv(3)
+        env.reset(0)
+        _leave_a_gap_for_i(env.batch, 1)
+        actions = np.full(3, env.placement_action(0, 2))
+        _, rewards, dones, info = env.step(actions)
+        np.testing.assert_array_equal(rewards, [0, 1, 0])
+        self.assertFalse(dones.any())
+        np.testing.assert_array_equal(info['score'], [0, 100, 0])
+
+    def test_finished_games_reset_and_report_their_final_state(self):
+        env = VectorEnv(4, board_width=4, board_height=6)
+        env.reset(0)
+        drops = np.full(4, DROP)
+        for _ in range(100):
+            scores = env.batch.score.copy()
+            _, rewards, dones, info = env.step(drops)
+            if dones.any():
+                break
+        else:
+            self.fail("No game ended")
+        self.assertEqual(info['final_board'].shape, (dones.sum(), 6, 4))
+        self.assertFalse(np.shares_memory(info['final_board'], env.batch.boards))
+        self.assertTrue(info['final_board'].any(axis=(1, 2)).all())
+        np.testing.assert_array_equal(info['final_score'], scores[dones] + 100 * rewards[dones])
+        np.testing.assert_array_equal(info['final_lines_cleared'] * 100, info['final_score'])
+        # The ended games already show a new game, and the others carry on.
+        self.assertFalse(env.batch.done.any())
+        self.assertFalse(env.observation.board[dones].any())
+        self.assertFalse(env.batch.score[dones].any())
+        self.assertTrue(env.observation.board[~dones].any())
+        self.assertNotIn('final_board', env.step(np.full(4, NOOP))[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# pytetris/tests/test_history.py
+import random
+import unittest
+
+from src.game import replay
+from src.game.engine import GameEngine, LIST_ROWS, RING_ROWS
+from src.game.tetronimo import Itetronimo
+
+
+def _state(engine):
+    """
+    Returns what an undo must bring back: the board, the active piece and the scores.
+    """
+    return (tuple(engine.grid), tuple(engine.rows), tuple(engine.heights), type(engine.active_piece),
+            engine.active_piece.position, engine.score, engine.lines_cleared, engine.piece_count)
+
+
+class HistoryTest(unittest.TestCase):
+
+    def play(self, row_storage, board_height, seed):
+        """
+        Drops pieces at random columns, undoing now and then and after every game over, and checks each undo against
+        the state saved at the same spawn.
+        """
+        rng = random.Random(seed)
+        engine = GameEngine(10, board_height, row_storage=row_storage)
+        engine.reset_game(seed)
+        engine.enable_history(None)
+        saved = [_state(engine)]
+        for _ in range(400):
+            if engine.is_game_over:
+                # The placement that ended the game has no spawn of its own, so undoing it returns to the last one.
+                self.assertTrue(engine.undo())
+                self.assertFalse(engine.is_game_over)
+            elif len(saved) > 1 and rng.random() < 0.1:
+                placements = rng.randint(1, min(3, len(saved) - 1))
+                self.assertTrue(engine.undo(placements))
+                del saved[-placements:]
+            else:
+                for _ in range(rng.randint(0, 5)):
+                    replay.apply_input(engine, rng.choice((replay.LEFT, replay.RIGHT, replay.ROTATE_RIGHT)))
+                replay.apply_input(engine, replay.HARD_DROP)
+                if not engine.is_game_over:
+                    saved.append(_state(engine))
+                continue
+            self.assertEqual(_state(engine), saved[-1])
+        return engine
+
+    def test_undo_restores_list_rows(self):
+        for seed in range(4):
+            self.play(LIST_ROWS, 20, seed)
+
+    def test_undo_restores_ring_rows(self):
+        for seed in range(4):
+            self.play(RING_ROWS, 20, seed)
+
+    def test_undo_restores_cleared_lines(self):
+        engine = GameEngine(4, 6)
+        engine.reset_game(0)
+        engine.enable_history()
+        engine.set_rows([engine.empty_row] * 4 + [('red',) * 3 + (None,)] * 2, [0] * 4 + [0b0111] * 2)
+        engine.rebuild_heights()
+        engine.start_new_piece(Itetronimo())
+        engine.history.clear()
+        engine.history.record(engine)
+        before = _state(engine)
+        self.assertTrue(engine.rotate_piece('right'))
+        while engine.move_piece('right'):
+            pass
+        engine.hard_drop()  # The upright I fills the gap in both bottom rows.
+        self.assertEqual(engine.lines_cleared, 2)
+        self.assertTrue(engine.undo())
+        self.assertEqual(_state(engine), before)
+
+    def test_depth_limits_undo(self):
+        engine = GameEngine()
+        engine.reset_game(0)
+        engine.enable_history(2)
+        for _ in range(4):
+            engine.hard_drop()
+        self.assertEqual(engine.history.available, 2)
+        self.assertFalse(engine.undo(3))
+        self.assertTrue(engine.undo(2))
+        self.assertEqual(engine.piece_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
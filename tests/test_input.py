@@ -0,0 +1,80 @@
+# pytetris/tests/test_input.py
+import unittest
+
+from src.game import replay
+from src.game.input import InputQueue
+
+
+def _ticks(queue, count):
+    """
+    Runs ticks and returns the codes each returned.
+    """
+    return [queue.tick() for _ in range(count)]
+
+
+class InputQueueTest(unittest.TestCase):
+
+    def test_press_applies_once_on_the_next_tick(self):
+        queue = InputQueue(das=3, arr=2)
+        queue.press(replay.ROTATE_RIGHT)
+        self.assertEqual(_ticks(queue, 3), [[replay.ROTATE_RIGHT], [], []])
+        self.assertTrue(queue.is_idle)
+
+    def test_held_direction_repeats_after_das_then_every_arr(self):
+        queue = InputQueue(das=3, arr=2)
+        queue.press(replay.LEFT)
+        repeats = [index for index, codes in enumerate(_ticks(queue, 10)) if codes == [replay.LEFT]]
+        # The press on tick 0, the first repeat das ticks later, then one every arr ticks.
+        self.assertEqual(repeats, [0, 3, 5, 7, 9])
+
+    def test_release_stops_repeats(self):
+        queue = InputQueue(das=3, arr=1)
+        queue.press(replay.RIGHT)
+        _ticks(queue, 4)
+        queue.release(replay.RIGHT)
+        self.assertEqual(_ticks(queue, 4), [[], [], [], []])
+        self.assertTrue(queue.is_idle)
+
+    def test_latest_direction_wins_and_falls_back_with_a_new_delay(self):
+        queue = InputQueue(das=3, arr=1)
+        queue.press(replay.LEFT)
+        _ticks(queue, 5)
+        queue.press(replay.RIGHT)
+        self.assertEqual(_ticks(queue, 4), [[replay.RIGHT], [], [], [replay.RIGHT]])
+        queue.release(replay.RIGHT)
+        # Left is still held, so it repeats again once its delay has passed from the release.
+        self.assertEqual(_ticks(queue, 4), [[], [], [replay.LEFT], [replay.LEFT]])
+
+    def test_soft_drop_repeats_every_soft_drop_arr(self):
+        queue = InputQueue(das=10, arr=2, soft_drop_arr=2)
+        queue.press(replay.DOWN)
+        self.assertEqual(_ticks(queue, 5), [[replay.DOWN], [], [replay.DOWN], [], [replay.DOWN]])
+
+    def test_os_repeats_of_a_held_key_are_ignored(self):
+        queue = InputQueue(das=3, arr=2)
+        queue.press(replay.LEFT)
+        queue.tick()
+        queue.press(replay.LEFT)
+        self.assertEqual(queue.tick(), [])
+
+    def test_rotation_and_hard_drop_never_repeat(self):
+        queue = InputQueue(das=1, arr=1)
+        queue.press(replay.ROTATE_LEFT)
+        queue.press(replay.HARD_DROP)
+        self.assertEqual(_ticks(queue, 3), [[replay.ROTATE_LEFT, replay.HARD_DROP], [], []])
+
+    def test_clear_forgets_held_keys(self):
+        queue = InputQueue(das=1, arr=1)
+        queue.press(replay.LEFT)
+        queue.tick()
+        queue.clear()
+        self.assertTrue(queue.is_idle)
+        self.assertEqual(queue.tick(), [])
+
+    def test_repeat_intervals_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            InputQueue(arr=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
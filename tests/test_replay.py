@@ -0,0 +1,88 @@
+# pytetris/tests/test_replay.py
+import random
+import unittest
+
+from src.game import replay
+from src.game.clock import LOGIC_RATE
+from src.game.engine import GameEngine
+from src.game.pieces import RANDOM
+
+
+def _record(seed, inputs, board_width=10, board_height=20, piece_mode=RANDOM):
+    """
+    Plays random inputs on a live engine while recording them, the way the GUI does, on every other tick.
+    :return: (tuple) The live engine and the encoded replay.
+    """
+    rng = random.Random(seed)
+    engine = GameEngine(board_width, board_height, piece_mode)
+    engine.reset_game(seed)
+    engine.is_paused = False
+    recorder = replay.ReplayRecorder(seed, board_width, board_height, piece_mode)
+    codes = (replay.LEFT, replay.RIGHT, replay.ROTATE_RIGHT, replay.ROTATE_LEFT, replay.DOWN, replay.GRAVITY,
+             replay.HARD_DROP)
+    for tick in range(0, 2 * inputs, 2):
+        if engine.is_game_over:
+            break
+        code = rng.choice(codes)
+        replay.apply_input(engine, code)
+        recorder.record(code, tick)
+    return engine, recorder.to_bytes()
+
+
+class ReplayTest(unittest.TestCase):
+
+    def test_replay_round_trip_reaches_the_live_state(self):
+        for seed in (0, 9, 2 ** 40 + 3):
+            with self.subTest(seed=seed):
+                live, data = _record(seed, 2000, board_width=8, board_height=16)
+                board_width, board_height, read_seed, piece_mode, tick_rate, offset = replay.read_header(data)
+                self.assertEqual((board_width, board_height, read_seed, piece_mode, tick_rate),
+                                 (8, 16, seed, RANDOM, LOGIC_RATE))
+                inputs = list(replay.iter_inputs(data, offset))
+                self.assertEqual([delta for delta, _ in inputs], [0] + [2] * (len(inputs) - 1))
+                engine = GameEngine(board_width, board_height, piece_mode)
+                engine.reset_game(read_seed)
+                for _, code in inputs:
+                    replay.apply_input(engine, code)
+                self.assertEqual(engine.snapshot(), live.snapshot())
+                self.assertEqual(list(engine.grid), list(live.grid))
+                self.assertEqual((engine.score, engine.lines_cleared, engine.is_game_over),
+                                 (live.score, live.lines_cleared, live.is_game_over))
+                self.assertEqual(replay.play_replay(data).snapshot(), live.snapshot())
+
+    def test_round_trip_covers_line_clears_and_game_over(self):
+        live, data = _record(2, 5000, board_width=4, board_height=10)  # Narrow enough for random play to clear rows.
+        self.assertGreater(live.lines_cleared, 0)
+        self.assertTrue(live.is_game_over)
+        self.assertEqual(replay.play_replay(data).snapshot(), live.snapshot())
+
+    def test_records_ticks_in_order(self):
+        recorder = replay.ReplayRecorder(0, start_tick=10)
+        recorder.record(replay.LEFT, 12)
+        with self.assertRaises(ValueError):
+            recorder.record(replay.LEFT, 11)
+
+    def test_read_header_rejects_other_data(self):
+        data = bytearray(_record(1, 10)[1])
+        data[len(replay.MAGIC)] = replay.VERSION - 1
+        with self.assertRaises(ValueError):
+            replay.read_header(bytes(data))
+        with self.assertRaises(ValueError):
+            replay.read_header(b'PTRX' + bytes(data[4:]))
+        with self.assertRaises(ValueError):
+            replay.read_header(bytes(data[:len(replay.MAGIC) + 3]))
+
+    def test_varints_round_trip(self):
+        buffer = bytearray()
+        values = (0, 1, 0x7F, 0x80, 300, 2 ** 64 - 1)
+        for value in values:
+            replay.write_varint(buffer, value)
+        offset = 0
+        for value in values:
+            read, offset = replay.read_varint(buffer, offset)
+            self.assertEqual(read, value)
+        self.assertEqual(offset, len(buffer))
+
+
+if __name__ == '__main__':
+    unittest.main()
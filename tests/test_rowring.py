@@ -0,0 +1,79 @@
+# pytetris/tests/test_rowring.py
+import random
+import unittest
+
+from src.game.rowring import RowRing
+
+
+def _list_remove(rows, indexes, fill):
+    """
+    Removes rows from a list the way GameEngine does with list storage.
+    """
+    rows = list(rows)
+    for index in reversed(indexes):
+        del rows[index]
+    return [fill] * len(indexes) + rows
+
+
+class RowRingTest(unittest.TestCase):
+
+    def test_reads_and_writes_like_a_list(self):
+        ring = RowRing(range(5))
+        ring[1] = 10
+        ring[-1] = 40
+        self.assertEqual(list(ring), [0, 10, 2, 3, 40])
+        self.assertEqual(ring[1:4], [10, 2, 3])
+        self.assertEqual(len(ring), 5)
+        with self.assertRaises(IndexError):
+            ring[5]
+
+    def test_remove_near_the_bottom_rotates_the_ring(self):
+        ring = RowRing([0, 0, 0, 0, 0, 5, 6, 7])
+        ring.remove([6], 0, 5)
+        self.assertEqual(ring, [0, 0, 0, 0, 0, 0, 5, 7])
+        ring[0] = 9  # The new top row is written through the rotated start.
+        self.assertEqual(ring, [9, 0, 0, 0, 0, 0, 5, 7])
+
+    def test_remove_near_the_top_shifts_the_rows_above(self):
+        ring = RowRing([0, 1, 2, 3, 4, 5, 6, 7])
+        ring.remove([2], 0, 1)
+        self.assertEqual(ring, [0, 0, 1, 3, 4, 5, 6, 7])
+
+    def test_remove_several_rows(self):
+        rows = [0, 0, 3, 4, 5, 6, 7, 8]
+        ring = RowRing(rows)
+        ring.remove([3, 5, 7], 0, 2)
+        self.assertEqual(ring, _list_remove(rows, [3, 5, 7], 0))
+
+    def test_remove_wraps_around_the_end(self):
+        rows = [0, 0, 2, 3, 4, 5]
+        ring = RowRing(rows)
+        for row in range(6, 15):  # Each bottom removal moves the start back one slot, wrapping past slot 0.
+            rows[5] = row
+            ring[5] = row
+            rows = _list_remove(rows, [5], 0)
+            ring.remove([5], 0, 2)
+            self.assertEqual(ring, rows)
+        self.assertEqual(ring[0:6], rows)
+
+    def test_matches_list_removal(self):
+        rng = random.Random(0)
+        for length in (1, 2, 7, 40):
+            rows = [0] * (length // 2) + list(range(1, length - length // 2 + 1))
+            ring = RowRing(rows)
+            for _ in range(200):
+                top = next((index for index, row in enumerate(rows) if row), length)
+                indexes = sorted(rng.sample(range(length), rng.randint(0, min(4, length))))
+                rows = _list_remove(rows, indexes, 0)
+                ring.remove(indexes, 0, top)
+                with self.subTest(length=length):
+                    self.assertEqual(list(ring), rows)
+                    self.assertEqual([ring[index] for index in range(length)], rows)
+                for index in rng.sample(range(length), min(2, length)):
+                    row = rng.randint(1, 99)
+                    rows[index] = row
+                    ring[index] = row
+
+
+if __name__ == '__main__':
+    unittest.main()
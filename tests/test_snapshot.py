@@ -0,0 +1,83 @@
+# pytetris/tests/test_snapshot.py
+import unittest
+
+from src.game import snapshot
+from src.game.engine import GameEngine, LIST_ROWS, RING_ROWS, SEED_MODULUS
+from src.game.pieces import RANDOM
+
+
+def _played(seed, pieces=30, **kwargs):
+    """
+    Returns an engine that has hard dropped some pieces at spread out columns.
+    """
+    engine = GameEngine(**kwargs)
+    engine.reset_game(seed)
+    for index in range(pieces):
+        if engine.is_game_over:
+            break
+        for _ in range(index % 5):
+            engine.move_piece('left' if index % 2 else 'right')
+        engine.hard_drop()
+    return engine
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_dumps_loads_round_trip(self):
+        for seed in (0, 7, 2 ** 63 + 5):
+            with self.subTest(seed=seed):
+                saved = _played(seed).snapshot()
+                self.assertEqual(snapshot.loads(snapshot.dumps(saved)), saved)
+
+    def test_round_trip_of_random_mode_and_game_over(self):
+        engine = _played(3, 200, piece_mode=RANDOM)
+        self.assertTrue(engine.is_game_over)
+        saved = engine.snapshot()
+        self.assertEqual(snapshot.loads(snapshot.dumps(saved)), saved)
+
+    def test_out_of_range_seeds_are_normalised(self):
+        for seed in (-1, SEED_MODULUS, 3 * SEED_MODULUS + 9):
+            with self.subTest(seed=seed):
+                engine = GameEngine()
+                engine.reset_game(seed)
+                self.assertEqual(engine.seed, seed % SEED_MODULUS)
+                saved = engine.snapshot()
+                self.assertEqual(snapshot.loads(snapshot.dumps(saved)), saved)
+
+    def test_restore_continues_the_same_game(self):
+        engine = _played(11, 10)
+        saved = snapshot.loads(snapshot.dumps(engine.snapshot()))
+        other = GameEngine()
+        other.reset_game(0)
+        other.restore(saved)
+        self.assertEqual(other.snapshot(), saved)
+        self.assertEqual(list(other.grid), list(engine.grid))
+        self.assertEqual(list(other.rows), list(engine.rows))
+        self.assertEqual(other.heights, engine.heights)
+        self.assertEqual(list(other.next_pieces(10)), list(engine.next_pieces(10)))
+
+    def test_restore_from_ring_rows_into_list_rows(self):
+        engine = _played(5, 40, board_height=80, row_storage=RING_ROWS)
+        other = GameEngine(board_height=80, row_storage=LIST_ROWS)
+        other.restore(engine.snapshot())
+        self.assertEqual(list(other.grid), list(engine.grid))
+
+    def test_restore_rejects_other_board_sizes(self):
+        with self.assertRaises(ValueError):
+            GameEngine(12, 20).restore(_played(1, 1).snapshot())
+
+    def test_loads_rejects_other_data(self):
+        with self.assertRaises(ValueError):
+            snapshot.loads(b'nope' + bytes(100))
+        data = bytearray(snapshot.dumps(_played(1, 1).snapshot()))
+        data[4] = snapshot.VERSION + 1
+        with self.assertRaises(ValueError):
+            snapshot.loads(bytes(data))
+
+    def test_rows_encode_and_decode(self):
+        row = (None, 'cyan', 'purple', None, 'yellow')
+        self.assertEqual(snapshot.decode_row(snapshot.encode_row(row), len(row)), (row, 0b10110))
+
+
+if __name__ == '__main__':
+    unittest.main()
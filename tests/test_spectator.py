@@ -0,0 +1,155 @@
+# pytetris/tests/test_spectator.py
+import asyncio
+import json
+import unittest
+
+from src.game.engine import GameEngine
+from src.game.snapshot import COLORS, encode_row
+from src.spectator import DeltaEncoder, SpectatorServer, _Client, apply_message
+
+
+class FakeEngine:
+    """
+    A tall board whose rows are all replaced on every step, so every delta carries every row.
+    """
+
+    def __init__(self, board_width=10, board_height=2000):
+        self.board_width = board_width
+        self.board_height = board_height
+        self.active_piece = None
+        self.score = 0
+        self.lines_cleared = 0
+        self.level = 1
+        self.is_game_over = False
+        self.grid = [(None,) * board_width] * board_height
+        self.steps = 0
+
+    def step(self):
+        self.steps += 1
+        self.score = self.steps
+        self.grid = [tuple(COLORS[(self.steps + y + x) % len(COLORS)] for x in range(self.board_width))
+                     for y in range(self.board_height)]
+
+
+def _engine():
+    engine = GameEngine()
+    engine.reset_game(3)
+    return engine
+
+
+def _expected(engine, tick):
+    """
+    The state a spectator should hold for an engine: a fresh encoder's full message.
+    """
+    return apply_message({}, DeltaEncoder().encode(engine, tick))
+
+
+class DeltaEncoderTest(unittest.TestCase):
+
+    def test_first_message_is_full_then_nothing_until_a_change(self):
+        engine = _engine()
+        encoder = DeltaEncoder()
+        message = encoder.encode(engine, 0)
+        self.assertEqual(message['type'], 'full')
+        self.assertEqual((message['width'], message['height']), (10, 20))
+        self.assertEqual(message['rows'], [0] * 20)
+        self.assertIsNone(encoder.encode(engine, 1))
+
+    def test_delta_carries_only_what_changed(self):
+        engine = _engine()
+        encoder = DeltaEncoder()
+        encoder.encode(engine, 0)
+        engine.move_piece('left')
+        self.assertEqual(encoder.encode(engine, 1), {'type': 'delta', 'tick': 1,
+                                                     'piece': DeltaEncoder.fields(engine)['piece']})
+        engine.hard_drop()
+        message = encoder.encode(engine, 2)
+        self.assertEqual(message['type'], 'delta')
+        self.assertNotIn('score', message)
+        # The only rows that changed are the ones the dropped piece now fills.
+        self.assertEqual([y for y, _ in message['rows']], [y for y, row in enumerate(engine.grid) if any(row)])
+        for y, code in message['rows']:
+            self.assertEqual(code, encode_row(engine.grid[y]))
+
+    def test_reset_sends_a_full_message_again(self):
+        engine = _engine()
+        encoder = DeltaEncoder()
+        encoder.encode(engine, 0)
+        encoder.reset()
+        self.assertEqual(encoder.encode(engine, 1)['type'], 'full')
+
+    def test_applied_deltas_follow_the_game(self):
+        engine = _engine()
+        encoder = DeltaEncoder()
+        state = {}
+        for tick in range(300):
+            if engine.is_game_over:
+                break
+            if tick % 3:
+                engine.move_piece('left' if tick % 2 else 'right')
+            else:
+                engine.hard_drop()
+            message = encoder.encode(engine, tick)
+            if message is not None:
+                apply_message(state, message)
+            self.assertEqual(state['rows'], _expected(engine, tick)['rows'])
+            self.assertEqual({key: state[key] for key in ('piece', 'score', 'lines', 'game_over')},
+                             {key: _expected(engine, tick)[key] for key in ('piece', 'score', 'lines', 'game_over')})
+
+    def test_deltas_before_a_full_message_are_ignored(self):
+        self.assertEqual(apply_message({}, {'type': 'delta', 'tick': 1, 'score': 5}), {})
+
+
+class SpectatorServerTest(unittest.TestCase):
+
+    def test_overflowing_client_gets_a_full_message_instead_of_its_backlog(self):
+        server = SpectatorServer(max_queue=2)
+        client = _Client(None, server.max_queue)
+        server._clients.add(client)
+        engine = FakeEngine(board_height=4)
+        for tick in range(3):  # Nothing reads the queue, so the third batch does not fit.
+            engine.step()
+            server._pending.append(server.encoder.encode(engine, tick))
+            server._flush()
+        self.assertEqual(client.queue.qsize(), 1)
+        message = json.loads(client.queue.get_nowait())
+        self.assertEqual(message['type'], 'full')
+        self.assertEqual(message['tick'], 2)
+        self.assertEqual(apply_message({}, message), _expected(engine, 2))
+
+    def test_slow_reader_is_resynchronized(self):
+        engine = FakeEngine()
+        server = SpectatorServer(max_queue=2)
+        host, _, port = server.start().rpartition(':')
+        try:
+            messages = asyncio.run(asyncio.wait_for(self._read_slowly(server, engine, host, int(port)), 20))
+        finally:
+            server.stop()
+        self.assertGreater(sum(message['type'] == 'full' for message in messages), 1)
+        self.assertLess(len(messages), engine.steps)
+        state = {}
+        for message in messages:
+            apply_message(state, message)
+        self.assertEqual(state, _expected(engine, engine.steps - 1))
+
+    @staticmethod
+    async def _read_slowly(server, engine, host, port):
+        """
+        Publishes a few megabytes without reading them, then reads until the last published tick.
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        while not server.clients:
+            await asyncio.sleep(0.001)
+        for tick in range(200):
+            engine.step()
+            server.publish(engine, tick)
+            await asyncio.sleep(0.001)
+        messages = []
+        while not messages or messages[-1]['tick'] != tick:
+            messages.append(json.loads(await reader.readline()))
+        writer.close()
+        return messages
+
+
+if __name__ == '__main__':
+    unittest.main()
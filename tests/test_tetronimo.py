@@ -0,0 +1,84 @@
+# pytetris/tests/test_tetronimo.py
+import unittest
+
+from src.game.engine import GameEngine
+from src.game.tetronimo import PIECE_TYPES, Itetronimo, OTetronimo, TTetronimo
+
+# Cells of each rotation state in the piece's SRS bounding box, (x, y) with y pointing down, from the SRS guideline.
+SRS_CELLS = {
+    TTetronimo: (((1, 0), (0, 1), (1, 1), (2, 1)), ((1, 0), (1, 1), (2, 1), (1, 2)),
+                 ((0, 1), (1, 1), (2, 1), (1, 2)), ((1, 0), (0, 1), (1, 1), (1, 2))),
+    Itetronimo: (((0, 1), (1, 1), (2, 1), (3, 1)), ((2, 0), (2, 1), (2, 2), (2, 3)),
+                 ((0, 2), (1, 2), (2, 2), (3, 2)), ((1, 0), (1, 1), (1, 2), (1, 3))),
+}
+
+
+def _engine_with(piece_type, x, y, rotation=0):
+    """
+    Returns an empty 10x20 engine whose active piece is a new piece of the given type at a position.
+    """
+    engine = GameEngine()
+    engine.reset_game(0)
+    piece = piece_type()
+    piece.rotation_state = rotation
+    piece.position = (x, y)
+    engine.active_piece = piece
+    return engine
+
+
+def _cells(engine):
+    return sorted(engine.get_active_piece_coordinates())
+
+
+def _box_cells(piece_type, rotation, box_x, box_y):
+    return sorted((box_x + dx, box_y + dy) for dx, dy in SRS_CELLS[piece_type][rotation])
+
+
+class SrsRotationTest(unittest.TestCase):
+
+    def test_unobstructed_rotation_turns_about_the_srs_centre(self):
+        for piece_type in SRS_CELLS:
+            for direction, step in (('right', 1), ('left', -1)):
+                for rotation in range(4):
+                    with self.subTest(piece=piece_type.__name__, direction=direction, rotation=rotation):
+                        box_x, box_y = 3, 8
+                        start = _box_cells(piece_type, rotation, box_x, box_y)
+                        engine = _engine_with(piece_type, min(x for x, _ in start), min(y for _, y in start),
+                                              rotation)
+                        self.assertEqual(_cells(engine), start)
+                        self.assertTrue(engine.rotate_piece(direction))
+                        self.assertEqual(_cells(engine), _box_cells(piece_type, (rotation + step) % 4, box_x, box_y))
+
+    def test_t_kicks_up_and_left_off_the_floor(self):
+        # Lying flat on the floor, SRS test 3 (-1, +1) is the first position of the clockwise kick that fits.
+        box_x, box_y = 4, 18
+        engine = _engine_with(TTetronimo, box_x, box_y)
+        self.assertTrue(engine.rotate_piece('right'))
+        self.assertEqual(_cells(engine), _box_cells(TTetronimo, 1, box_x - 1, box_y - 1))
+
+    def test_i_kicks_two_rows_up_off_the_floor(self):
+        # Flat on the floor, only SRS test 5 (+1, +2) of the clockwise I kick fits.
+        box_x, box_y = 3, 18
+        engine = _engine_with(Itetronimo, box_x, box_y + 1)
+        self.assertTrue(engine.rotate_piece('right'))
+        self.assertEqual(_cells(engine), _box_cells(Itetronimo, 1, box_x + 1, box_y - 2))
+
+    def test_rotations_return_to_the_same_cells(self):
+        for piece_type in PIECE_TYPES:
+            for direction in ('right', 'left'):
+                with self.subTest(piece=piece_type.__name__, direction=direction):
+                    engine = _engine_with(piece_type, 4, 8)
+                    start = _cells(engine)
+                    for _ in range(4):
+                        self.assertTrue(engine.rotate_piece(direction))
+                    self.assertEqual(_cells(engine), start)
+
+    def test_o_does_not_move(self):
+        engine = _engine_with(OTetronimo, 4, 8)
+        start = _cells(engine)
+        self.assertTrue(engine.rotate_piece('right'))
+        self.assertEqual(_cells(engine), start)
+
+
+if __name__ == '__main__':
+    unittest.main()